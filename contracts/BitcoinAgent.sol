@@ -2,6 +2,7 @@
 pragma solidity 0.8.4;
 
 import "./interface/IAgent.sol";
+import "./interface/IBitcoinAgent.sol";
 import "./interface/IBitcoinStake.sol";
 import "./interface/IParamSubscriber.sol";
 import "./lib/Memory.sol";
@@ -14,7 +15,7 @@ import "./lib/SafeCast.sol";
 /// This contract handles BTC staking. 
 /// It interacts with BitcoinStake.sol and BitcoinLSTStake.sol for
 /// non-custodial BTC staking and LST BTC staking correspondingly. 
-contract BitcoinAgent is IAgent, System, IParamSubscriber {
+contract BitcoinAgent is IAgent, IBitcoinAgent, System, IParamSubscriber {
   using BytesLib for *;
   using SafeCast for *;
   using RLPDecode for bytes;
@@ -129,14 +130,7 @@ contract BitcoinAgent is IAgent, System, IParamSubscriber {
     uint256 gradeLength = grades.length;
     uint256 p = SatoshiPlusHelper.DENOMINATOR;
     if (gradeActive && gradeLength != 0 && btcAccStakedAmount != 0) {
-      uint256 stakeRate = coreAmount / btcAccStakedAmount / assetWeight;
-      p = grades[0].percentage;
-      for (uint256 j = gradeLength - 1; j != 0; j--) {
-        if (stakeRate >= grades[j].stakeRate) {
-          p = grades[j].percentage;
-          break;
-        }
-      }
+      p = _getGradePercentage(coreAmount / btcAccStakedAmount / assetWeight);
       uint256 pReward = btcReward * p / SatoshiPlusHelper.DENOMINATOR;
       floatReward = pReward.toInt256() - btcReward.toInt256();
       btcReward = pReward;
@@ -172,6 +166,35 @@ contract BitcoinAgent is IAgent, System, IParamSubscriber {
     return grades;
   }
 
+  /// Get the highest percentage dual staking grading applies to BTC rewards
+  /// @return percentage The highest grade percentage, measured in SatoshiPlusHelper.DENOMINATOR
+  function getMaxGradePercentage() external view override returns (uint256 percentage) {
+    percentage = lstGradePercentage;
+    uint256 gradeLength = grades.length;
+    if (gradeActive && gradeLength != 0 && grades[gradeLength - 1].percentage > percentage) {
+      percentage = grades[gradeLength - 1].percentage;
+    }
+  }
+
+  /*********************** Internal methods ********************************/
+  /// Binary search the grade of a stake rate
+  /// @dev grades are sorted by stakeRate, rates below all of them fall in the lowest grade
+  /// @param stakeRate The CORE/BTC stake rate
+  /// @return percentage The percentage of the highest grade whose stakeRate is not above the given one
+  function _getGradePercentage(uint256 stakeRate) internal view returns (uint256 percentage) {
+    uint256 low = 0;
+    uint256 high = grades.length - 1;
+    while (low < high) {
+      uint256 mid = (low + high + 1) / 2;
+      if (stakeRate >= grades[mid].stakeRate) {
+        low = mid;
+      } else {
+        high = mid - 1;
+      }
+    }
+    return grades[low].percentage;
+  }
+
   /*********************** Governance ********************************/
   /// Update parameters through governance vote
   /// @param key The name of the parameter
@@ -98,6 +98,10 @@ contract BitcoinLSTStake is IBitcoinStake, System, IParamSubscriber, ReentrancyG
   // Fee paid in BTC to burn lst tokens
   uint64 public utxoFee;
 
+  // end rounds of continuous ranges of rounds written in accruedRewardPerBTCMap, in ascending order
+  // it is used to find the closest accrued reward of a round by binary search
+  uint256[] continuousRewardEndRounds;
+
   struct BtcTx {
     uint64 amount;
     uint32 outputIndex;
@@ -272,6 +276,7 @@ contract BitcoinLSTStake is IBitcoinStake, System, IParamSubscriber, ReentrancyG
     } else {
       accruedRewardPerBTCMap[roundTag] = _getRoundRewardPerBTC(roundTag-1) + reward * SatoshiPlusHelper.BTC_DECIMAL / stakedAmount;
     }
+    _addRewardRound(roundTag);
     emit rewardUpdated(roundTag, accruedRewardPerBTCMap[roundTag]);
   }
 
@@ -384,6 +389,10 @@ contract BitcoinLSTStake is IBitcoinStake, System, IParamSubscriber, ReentrancyG
     return wallets;
   }
 
+  function getContinuousRewardEndRounds() external view returns (uint256[] memory) {
+    return continuousRewardEndRounds;
+  }
+
   /*********************** Governance ********************************/
   /// Update parameters through governance vote
   /// @param key The name of the parameter
@@ -559,13 +568,57 @@ contract BitcoinLSTStake is IBitcoinStake, System, IParamSubscriber, ReentrancyG
     }
   }
 
+  /// record a round written in accruedRewardPerBTCMap to the continuous reward ranges
+  /// @param round the round written, rounds not after the last indexed round are ignored
+  function _addRewardRound(uint256 round) internal {
+    uint256 l = continuousRewardEndRounds.length;
+    if (l == 0 || continuousRewardEndRounds[l - 1] + 1 < round) {
+      continuousRewardEndRounds.push(round);
+    } else if (continuousRewardEndRounds[l - 1] < round) {
+      continuousRewardEndRounds[l - 1] = round;
+    }
+  }
+
   /// get accrued reward for each unit of BTC of a given round
   /// @param round the round to retrieve reward value
   function _getRoundRewardPerBTC(uint256 round) internal view returns (uint256 reward) {
     if (round <= initRound) {
       return 0;
     }
-    for (;round != initRound; --round) {
+    reward = accruedRewardPerBTCMap[round];
+    if (reward != 0) {
+      return reward;
+    }
+
+    // rounds without reward distribution are not written in the accrued reward map, in that case
+    // the accrued reward for round N == a round smaller but also closest to N
+    // here we use binary search to get that round efficiently
+    uint256 b = continuousRewardEndRounds.length;
+    uint256 targetRound;
+    if (b != 0) {
+      b -= 1;
+      uint256 a;
+      uint256 m;
+      uint256 t;
+      while (a <= b) {
+        m = (a + b) / 2;
+        t = continuousRewardEndRounds[m];
+        if (t < round) {
+          targetRound = t;
+          a = m + 1;
+        } else if (m == 0) {
+          break;
+        } else {
+          b = m - 1;
+        }
+      }
+    }
+    if (targetRound != 0) {
+      return targetRound <= initRound ? 0 : accruedRewardPerBTCMap[targetRound];
+    }
+
+    // rounds before the first indexed range, which are written before the index is introduced
+    for (--round; round > initRound; --round) {
       reward = accruedRewardPerBTCMap[round];
       if (reward != 0) {
         return reward;
@@ -39,10 +39,10 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
   // It is initialized to 1.
   uint256 public roundTag;
 
-  // receiptMap keeps all deposite receipts of BTC on Core
+  // depositReceiptMap keeps all deposite receipts of BTC on Core
   // key: txid of bitcoin
   // value: DepositReceipt
-  mapping(bytes32 => DepositReceipt) public receiptMap;
+  mapping(bytes32 => DepositReceipt) depositReceiptMap;
 
   // key: delegator address
   // Value: Delegator infomation
@@ -83,10 +83,12 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
     bytes32[] txids;
   }
 
+  // candidate and round share a slot so that collecting rewards of a receipt reads a single word
   struct DepositReceipt {
     address candidate;
+    uint64 round; // delegator can claim reward after this round
     address delegator;
-    uint256 round; // delegator can claim reward after this round
+    uint256 legacyRound; // round of receipts stored before packing, superseded once round is set
   }
 
   struct Candidate {
@@ -170,7 +172,7 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
       require(endRound > roundTag + 1, "insufficient locking rounds");
     }
 
-    DepositReceipt storage dr = receiptMap[txid];
+    DepositReceipt storage dr = depositReceiptMap[txid];
     address delegator;
     address candidate;
     uint64 btcAmount;
@@ -190,9 +192,9 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
     delegatorMap[delegator].txids.push(txid);
     candidateMap[candidate].realtimeAmount += btcAmount;
 
-    dr.delegator = delegator;
     dr.candidate = candidate;
-    dr.round = roundTag;
+    dr.round = uint64(roundTag);
+    dr.delegator = delegator;
 
     _addExpire(dr, lockTime, btcAmount);
   }
@@ -292,16 +294,18 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
     uint256 rewardPerTx;
     uint256 rewardUnclaimedPerTx;
     uint256 accStakedAmountPerTx;
+    bytes32 txid;
     bytes32[] storage txids = delegatorMap[delegator].txids;
     for (uint256 i = txids.length; i != 0; i--) {
-      (rewardPerTx, expired, rewardUnclaimedPerTx, accStakedAmountPerTx) = _collectReward(txids[i - 1], settleRound);
+      txid = txids[i - 1];
+      (rewardPerTx, expired, rewardUnclaimedPerTx, accStakedAmountPerTx) = _collectReward(txid, settleRound);
       reward += rewardPerTx;
       rewardUnclaimed += rewardUnclaimedPerTx;
       accStakedAmount += accStakedAmountPerTx;
       if (claim) {
-        emit claimedRewardPerTx(txids[i - 1], rewardPerTx, expired, accStakedAmountPerTx, rewardUnclaimedPerTx);
+        emit claimedRewardPerTx(txid, rewardPerTx, expired, accStakedAmountPerTx, rewardUnclaimedPerTx);
       } else {
-        emit storedRewardPerTx(txids[i - 1], rewardPerTx, expired, accStakedAmountPerTx, rewardUnclaimedPerTx);
+        emit storedRewardPerTx(txid, rewardPerTx, expired, accStakedAmountPerTx, rewardUnclaimedPerTx);
       }
 
       if (expired) {
@@ -351,35 +355,28 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
   /// @param txid the staked BTC transaction to transfer
   /// @param targetCandidate the new validator to stake to
   function transfer(bytes32 txid, address targetCandidate) external nonReentrant {
-    BtcTx storage bt = btcTxMap[txid];
-    DepositReceipt storage dr = receiptMap[txid];
-    uint64 amount = bt.amount;
-    require(amount != 0, "btc tx not found");
-    require(dr.delegator == msg.sender, "not the delegator of this btc receipt");
-
-    address candidate = dr.candidate;
-    require(candidate != targetCandidate, "can not transfer to the same validator");
-    uint256 endRound = bt.lockTime / SatoshiPlusHelper.ROUND_INTERVAL;
-    require(endRound > roundTag + 1, "insufficient locking rounds");
-
-    if (!ICandidateHub(CANDIDATE_HUB_ADDR).canDelegate(targetCandidate)) {
-      revert InactiveCandidate(targetCandidate);
-    }
-    IStakeHub(STAKE_HUB_ADDR).onStakeChange(dr.delegator);
-
-    Candidate storage c = candidateMap[candidate];
-    c.realtimeAmount -= amount;
-    round2expireInfoMap[endRound].amountMap[candidate] -= amount;
-
-    // Set candidate to targetCandidate
-    dr.candidate = targetCandidate;
-    dr.round = roundTag;
-    _addExpire(dr, bt.lockTime, amount);
+    bytes32[] memory txids = new bytes32[](1);
+    txids[0] = txid;
+    _transfer(txids, targetCandidate);
+  }
 
-    Candidate storage tc = candidateMap[targetCandidate];
-    tc.realtimeAmount += amount;
+  /// transfer BTC delegates to a new validator in one call
+  /// @dev the delegator is settled once for all of them
+  /// @param txids the staked BTC transactions to transfer
+  /// @param targetCandidate the new validator to stake to
+  function transferBatch(bytes32[] calldata txids, address targetCandidate) external nonReentrant {
+    require(txids.length != 0, "empty txids");
+    _transfer(txids, targetCandidate);
+  }
 
-    emit transferredBtc(txid, candidate, targetCandidate, msg.sender, bt.amount);
+  /// Get the deposit receipt of a BTC stake transaction
+  /// @param txid the BTC stake transaction id
+  /// @return candidate the validator the BTC is staked to
+  /// @return delegator the delegator of the BTC stake
+  /// @return round the round rewards of the receipt are settled to
+  function receiptMap(bytes32 txid) external view returns (address candidate, address delegator, uint256 round) {
+    DepositReceipt storage dr = depositReceiptMap[txid];
+    return (dr.candidate, dr.delegator, _getReceiptRound(dr));
   }
 
   function getGrades() external view returns (LockLengthGrade[] memory) {
@@ -470,6 +467,46 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
     return uint32(t.reverseUint256() & 0xFFFFFFFF);
   }
 
+  /// transfer BTC delegates of the sender to a new validator
+  /// @param txids the staked BTC transactions to transfer
+  /// @param targetCandidate the new validator to stake to
+  function _transfer(bytes32[] memory txids, address targetCandidate) internal {
+    if (!ICandidateHub(CANDIDATE_HUB_ADDR).canDelegate(targetCandidate)) {
+      revert InactiveCandidate(targetCandidate);
+    }
+    // rewards of all receipts are settled before any of them moves
+    IStakeHub(STAKE_HUB_ADDR).onStakeChange(msg.sender);
+
+    uint256 totalAmount;
+    uint256 length = txids.length;
+    for (uint256 i = 0; i < length; ++i) {
+      bytes32 txid = txids[i];
+      BtcTx storage bt = btcTxMap[txid];
+      DepositReceipt storage dr = depositReceiptMap[txid];
+      uint64 amount = bt.amount;
+      require(amount != 0, "btc tx not found");
+      require(dr.delegator == msg.sender, "not the delegator of this btc receipt");
+
+      address candidate = dr.candidate;
+      require(candidate != targetCandidate, "can not transfer to the same validator");
+      uint32 lockTime = bt.lockTime;
+      uint256 endRound = lockTime / SatoshiPlusHelper.ROUND_INTERVAL;
+      require(endRound > roundTag + 1, "insufficient locking rounds");
+
+      candidateMap[candidate].realtimeAmount -= amount;
+      round2expireInfoMap[endRound].amountMap[candidate] -= amount;
+
+      // Set candidate to targetCandidate
+      dr.candidate = targetCandidate;
+      dr.round = uint64(roundTag);
+      _addExpire(dr, lockTime, amount);
+      totalAmount += amount;
+
+      emit transferredBtc(txid, candidate, targetCandidate, msg.sender, amount);
+    }
+    candidateMap[targetCandidate].realtimeAmount += totalAmount;
+  }
+
   /// add BTC stake transaction expiration record
   /// @param receipt the receipt object parsed from the BTC stake transaction
   /// @param lockTime the CLTV locktime of the BTC stake transaction
@@ -609,8 +646,7 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
   }
 
   function _collectReward(bytes32 txid, uint256 settleRound) internal returns (uint256 reward, bool expired, uint256 rewardUnclaimed, uint256 accStakedAmount) {
-    DepositReceipt storage dr = receiptMap[txid];
-    return _collectReward(txid, dr.round, settleRound);
+    return _collectReward(txid, _getReceiptRound(depositReceiptMap[txid]), settleRound);
   }
 
   /// collect rewards for a given BTC stake transaction & time grading is applied
@@ -623,39 +659,65 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
   /// @return accStakedAmount accumulated stake amount (multiplied by days), used for grading calculation
   function _collectReward(bytes32 txid, uint256 drRound, uint256 settleRound) internal returns (uint256 reward, bool expired, uint256 rewardUnclaimed, uint256 accStakedAmount) {
     BtcTx storage bt = btcTxMap[txid];
-    DepositReceipt storage dr = receiptMap[txid];
+    DepositReceipt storage dr = depositReceiptMap[txid];
     require(drRound != 0, "invalid deposit receipt");
     require(settleRound < roundTag, "invalid settle round");
     uint256 unlockRound1 = bt.lockTime / SatoshiPlusHelper.ROUND_INTERVAL - 1;
     if (drRound < settleRound && drRound < unlockRound1) {
       uint256 minRound = settleRound < unlockRound1 ? settleRound : unlockRound1;
       // full reward
-      reward = (_getRoundAccruedReward(dr.candidate, minRound) - _getRoundAccruedReward(dr.candidate, drRound)) * bt.amount / SatoshiPlusHelper.BTC_DECIMAL;
-      accStakedAmount = bt.amount * (minRound - drRound);
+      {
+        address candidate = dr.candidate;
+        uint64 amount = bt.amount;
+        reward = (_getRoundAccruedReward(candidate, minRound) - _getRoundAccruedReward(candidate, drRound)) * amount / SatoshiPlusHelper.BTC_DECIMAL;
+        accStakedAmount = amount * (minRound - drRound);
+      }
 
       // apply time grading to BTC rewards
       if (gradeActive && grades.length != 0) {
-        uint64 lockDuration = bt.lockTime - bt.blockTimestamp;
-        uint256 p = grades[0].percentage;
-        for (uint256 j = grades.length - 1; j != 0; j--) {
-          if (lockDuration >= grades[j].lockDuration) {
-            p = grades[j].percentage;
-            break;
-          }
-        }
+        uint256 p = _getGradePercentage(bt.lockTime - bt.blockTimestamp);
         uint256 rewardClaimed = reward * p / SatoshiPlusHelper.DENOMINATOR;
         rewardUnclaimed = reward - rewardClaimed;
         reward = rewardClaimed;
       }
 
-      dr.round = minRound;
+      dr.round = uint64(minRound);
     }
 
     if (unlockRound1 <= settleRound) {
       emit btcExpired(txid, dr.delegator);
-      delete receiptMap[txid];
+      delete depositReceiptMap[txid];
       return (reward, true, rewardUnclaimed, accStakedAmount);
     }
     return (reward, false, rewardUnclaimed, accStakedAmount);
   }
+
+  /// Get the round a deposit receipt is settled to
+  /// @dev receipts stored before packing keep it in legacyRound until round is set
+  /// @param dr the deposit receipt
+  /// @return round the settled round, zero if the receipt does not exist
+  function _getReceiptRound(DepositReceipt storage dr) internal view returns (uint256 round) {
+    round = dr.round;
+    if (round == 0) {
+      round = dr.legacyRound;
+    }
+  }
+
+  /// Binary search the grade of a lock duration
+  /// @dev grades are sorted by lockDuration, the lowest one is always zero
+  /// @param lockDuration The lock duration of a BTC stake transaction in seconds
+  /// @return percentage The percentage of the highest grade whose lockDuration is not above the given one
+  function _getGradePercentage(uint256 lockDuration) internal view returns (uint256 percentage) {
+    uint256 low = 0;
+    uint256 high = grades.length - 1;
+    while (low < high) {
+      uint256 mid = (low + high + 1) / 2;
+      if (lockDuration >= grades[mid].lockDuration) {
+        low = mid;
+      } else {
+        high = mid - 1;
+      }
+    }
+    return grades[low].percentage;
+  }
 }
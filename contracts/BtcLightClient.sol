@@ -62,6 +62,12 @@ contract BtcLightClient is ILightClient, System, IParamSubscriber{
     // miner is the reward address of BTC miner
     address[] miners;
     bytes32[] btcBlocks;
+    // distinct miners in the order of their first block and the number of blocks of each,
+    // maintained as blocks are added so that reward distribution reads one entry per miner
+    address[] minerSet;
+    uint256[] minerBlockCounts;
+    // 1-based index of a miner in minerSet
+    mapping(address => uint256) minerIndexes;
   }
 
   struct RoundPower {
@@ -223,12 +229,57 @@ contract BtcLightClient is ILightClient, System, IParamSubscriber{
       if (power == 0) {
         r.candidates.push(candidate);
       }
-      r.powerMap[candidate].miners.push(miner);
-      r.powerMap[candidate].btcBlocks.push(blockHash);
+      addCandidatePower(r.powerMap[candidate], miner, blockHash);
       emit AddMinerPower(blockHash, candidate, miner);
     }
   }
 
+  function addCandidatePower(CandidatePower storage p, address miner, bytes32 blockHash) internal {
+    uint256 blockSize = p.miners.length;
+    if (blockSize != 0 && p.minerSet.length == 0) {
+      // power stored before the distinct miner index was introduced is indexed along with the first new block,
+      // so that minerSet always covers every block of the entry
+      for (uint256 i = 0; i < blockSize; ++i) {
+        indexMiner(p, p.miners[i]);
+      }
+    }
+    p.miners.push(miner);
+    p.btcBlocks.push(blockHash);
+    indexMiner(p, miner);
+  }
+
+  function indexMiner(CandidatePower storage p, address miner) internal {
+    uint256 index = p.minerIndexes[miner];
+    if (index == 0) {
+      p.minerSet.push(miner);
+      p.minerBlockCounts.push(1);
+      p.minerIndexes[miner] = p.minerSet.length;
+    } else {
+      ++p.minerBlockCounts[index - 1];
+    }
+  }
+
+  function aggregateMiners(address[] memory blockMiners) internal pure returns (address[] memory miners, uint256[] memory counts) {
+    uint256 blockSize = blockMiners.length;
+    miners = new address[](blockSize);
+    counts = new uint256[](blockSize);
+    uint256 minerSize;
+    for (uint256 i = 0; i < blockSize; ++i) {
+      uint256 j = 0;
+      while (j < minerSize && miners[j] != blockMiners[i]) {
+        ++j;
+      }
+      if (j == minerSize) {
+        miners[minerSize++] = blockMiners[i];
+      }
+      ++counts[j];
+    }
+    assembly {
+      mstore(miners, minerSize)
+      mstore(counts, minerSize)
+    }
+  }
+
   /// Claim relayer rewards
   /// @param relayerAddr The relayer address
   function claimRelayerReward(address relayerAddr) external onlyInit {
@@ -684,6 +735,21 @@ contract BtcLightClient is ILightClient, System, IParamSubscriber{
     return roundPowerMap[roundTimeTag].powerMap[candidate].miners;
   }
 
+  /// Get distinct miners (in the form of reward addresses) who delegated to a given candidate in a specific round
+  /// and the number of BTC blocks each of them delegated
+  /// @param roundTimeTag The specific round time
+  /// @param candidate The given candidate to get its miners
+  /// @return miners The distinct miners who delegated to the candidate in the round
+  /// @return counts The number of BTC blocks of each miner
+  function getRoundMinerPowers(uint256 roundTimeTag, address candidate) external override view returns (address[] memory miners, uint256[] memory counts) {
+    CandidatePower storage p = roundPowerMap[roundTimeTag].powerMap[candidate];
+    if (p.minerSet.length != 0 || p.miners.length == 0) {
+      return (p.minerSet, p.minerBlockCounts);
+    }
+    // power stored before the distinct miner index was introduced
+    return aggregateMiners(p.miners);
+  }
+
   /// Get BTC blocks delegated to a given candidate in a specific round
   /// @param roundTimeTag The specific round time
   /// @param candidate The given candidate to get its blocks
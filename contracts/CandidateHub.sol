@@ -57,7 +57,13 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
   mapping(address => uint256) public jailMap;
 
   uint256 public roundTag;
-  
+
+  // operator addresses which have a record in jailMap,
+  // only these are checked for release on turn round
+  address[] public jailedCandidates;
+  // whether jailedCandidates is built from the records in jailMap
+  bool public jailedCandidatesInit;
+
 
   struct Candidate {
     address operateAddr;
@@ -143,6 +149,9 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
         jailMap[operateAddress] = jailMap[operateAddress] + round;
       } else {
         jailMap[operateAddress] = roundTag + round;
+        if (jailedCandidatesInit) {
+          jailedCandidates.push(operateAddress);
+        }
       }
       // deduct margin
       uint256 totalMargin = margin - fine;
@@ -182,17 +191,21 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
     // reset validator flags for all candidates.
     uint256 candidateSize = candidateSet.length;
     uint256 validCount = 0;
+    uint256[] memory oldStatusList = new uint256[](candidateSize);
     uint256[] memory statusList = new uint256[](candidateSize);
+    address[] memory candidates = new address[](candidateSize);
     for (uint256 i = 0; i < candidateSize; i++) {
-      statusList[i] = candidateSet[i].status & DEL_VALIDATOR;
-      if (statusList[i] == SET_CANDIDATE) validCount++;
-    }
-
-    address[] memory candidates = new address[](validCount);
-    uint256 j = 0;
-    for (uint256 i = 0; i < candidateSize; i++) {
+      Candidate storage c = candidateSet[i];
+      oldStatusList[i] = c.status;
+      statusList[i] = oldStatusList[i] & DEL_VALIDATOR;
       if (statusList[i] == SET_CANDIDATE) {
-        candidates[j++] = candidateSet[i].operateAddr;
+        candidates[validCount++] = c.operateAddr;
+      }
+    }
+    uint256 invalidCount = candidateSize - validCount;
+    if (invalidCount != 0) {
+      assembly {
+        mstore(candidates, sub(mload(candidates), invalidCount))
       }
     }
 
@@ -230,17 +243,15 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
     IStakeHub(STAKE_HUB_ADDR).setNewRound(validatorList, roundTag);
 
     // update validator jail status
-    for (uint256 i = 0; i < candidateSize; i++) {
-      address opAddr = candidateSet[i].operateAddr;
-      uint256 jailedRound = jailMap[opAddr];
-      if (jailedRound != 0 && jailedRound <= roundTag) {
-        statusList[i] = statusList[i] & DEL_JAIL;
-        delete jailMap[opAddr];
-      }
-    }
+    releaseJailedCandidates(statusList);
 
+    // only candidates whose status changed are written
     for (uint256 i = 0; i < candidateSize; i++) {
-      changeStatus(candidateSet[i], statusList[i]);
+      if (statusList[i] != oldStatusList[i]) {
+        Candidate storage c = candidateSet[i];
+        c.status = statusList[i];
+        emit statusChanged(c.operateAddr, oldStatusList[i], statusList[i]);
+      }
     }
     emit turnedRound(roundTag);
   }
@@ -262,7 +273,12 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
     require(consensusAddr != address(0), "consensus address should not be zero");
     require(feeAddr != address(0), "fee address should not be zero");
     // check jail status
-    require(jailMap[msg.sender] < roundTag, "it is in jail");
+    uint256 jailedRound = jailMap[msg.sender];
+    require(jailedRound < roundTag, "it is in jail");
+    // the released record of a removed candidate is cleaned on next turn round
+    if (jailedRound != 0 && jailedCandidatesInit) {
+      jailedCandidates.push(msg.sender);
+    }
 
     uint256 status = SET_CANDIDATE;
     candidateSet.push(Candidate(msg.sender, consensusAddr, feeAddr, commissionThousandths, msg.value, status, roundTag, commissionThousandths));
@@ -366,6 +382,41 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
     }
   }
 
+  /// Release candidates whose jail ends by the current round
+  /// @param statusList The status list of candidates to clear jail flags on
+  function releaseJailedCandidates(uint256[] memory statusList) internal {
+    if (!jailedCandidatesInit) {
+      uint256 candidateSize = candidateSet.length;
+      for (uint256 i = 0; i < candidateSize; i++) {
+        address opAddr = candidateSet[i].operateAddr;
+        if (jailMap[opAddr] != 0) {
+          jailedCandidates.push(opAddr);
+        }
+      }
+      jailedCandidatesInit = true;
+    }
+
+    uint256 i = jailedCandidates.length;
+    while (i != 0) {
+      i--;
+      address opAddr = jailedCandidates[i];
+      if (jailMap[opAddr] > roundTag) {
+        continue;
+      }
+      // records of removed candidates are kept in jailMap to block registering until released
+      uint256 index = operateMap[opAddr];
+      if (index != 0) {
+        statusList[index - 1] = statusList[index - 1] & DEL_JAIL;
+        delete jailMap[opAddr];
+      }
+      uint256 lastIndex = jailedCandidates.length - 1;
+      if (i != lastIndex) {
+        jailedCandidates[i] = jailedCandidates[lastIndex];
+      }
+      jailedCandidates.pop();
+    }
+  }
+
   function removeCandidate(uint256 index) internal {
     Candidate storage c = candidateSet[index - 1];
 
@@ -61,6 +61,9 @@ contract CoreAgent is IAgent, System, IParamSubscriber {
   struct Delegator {
     address[] candidates;
     uint256 amount;
+    // key: candidate address
+    // value: index+1 of candidates
+    mapping(address => uint256) candidateIndexes;
   }
 
   struct Reward {
@@ -219,6 +222,10 @@ contract CoreAgent is IAgent, System, IParamSubscriber {
     for (uint256 i = candidateSize; i != 0; --i) {
       candidate = candidates[i - 1];
       CoinDelegator storage cd = candidateMap[candidate].cDelegatorMap[delegator];
+      // nothing to settle on positions changed after the settlement round
+      if (cd.changeRound > settleRound && cd.transferredAmount == 0 && cd.realtimeAmount != 0) {
+        continue;
+      }
       (reward, accStakedAmount) = _collectRewardFromCandidate(candidate, cd, settleRound);
       rewardSum += reward;
       accStakedAmountSum += accStakedAmount;
@@ -262,7 +269,7 @@ contract CoreAgent is IAgent, System, IParamSubscriber {
     uint256 changeRound = cd.changeRound;
     if (changeRound == 0) {
       cd.changeRound = roundTag;
-      delegatorMap[delegator].candidates.push(candidate);
+      _addDelegation(delegator, candidate);
     } else if (changeRound != roundTag) {
       uint256 lastRoundTag = roundTag - 1;
       (uint256 reward, uint256 accStakedAmount) = _collectRewardFromCandidate(candidate, cd, lastRoundTag);
@@ -349,7 +356,7 @@ contract CoreAgent is IAgent, System, IParamSubscriber {
     uint256 changeRound = cd.changeRound;
     if (changeRound == 0) {
       cd.changeRound = roundTag;
-      delegatorMap[delegator].candidates.push(candidate);
+      _addDelegation(delegator, candidate);
     }
     a.realtimeAmount += amount;
     cd.realtimeAmount += amount;
@@ -418,11 +425,7 @@ contract CoreAgent is IAgent, System, IParamSubscriber {
           amount -= transferredAmount;
           cd.transferredAmount = 0;
           if (cd.realtimeAmount == 0) {
-            delete candidateMap[candidate].cDelegatorMap[delegator];
-            if (i < candidates.length) {
-              d.candidates[i-1] = d.candidates[candidates.length-1];
-            }
-            d.candidates.pop();
+            _removeDelegation(delegator, candidate);
           }
         } else {
           cd.transferredAmount -= amount;
@@ -513,18 +516,37 @@ contract CoreAgent is IAgent, System, IParamSubscriber {
   function _removeDelegation(address delegator, address candidate) internal {
     Delegator storage d = delegatorMap[delegator];
     uint256 l = d.candidates.length;
-    for (uint256 i = 0; i < l; ++i) {
-      if (d.candidates[i] == candidate) {
-        if (i + 1 < l) {
-          d.candidates[i] = d.candidates[l-1];
+    uint256 index = d.candidateIndexes[candidate];
+    if (index == 0) {
+      // delegations added before the candidate index was introduced
+      for (uint256 i = 0; i < l; ++i) {
+        if (d.candidates[i] == candidate) {
+          index = i + 1;
+          break;
         }
-        d.candidates.pop();
-        break;
       }
     }
+    if (index != 0) {
+      if (index < l) {
+        address lastCandidate = d.candidates[l-1];
+        d.candidates[index-1] = lastCandidate;
+        d.candidateIndexes[lastCandidate] = index;
+      }
+      d.candidates.pop();
+      delete d.candidateIndexes[candidate];
+    }
     delete candidateMap[candidate].cDelegatorMap[delegator];
   }
 
+  /// add delegate record of a candidate/delegator pair
+  /// @param delegator the delegator address
+  /// @param candidate the validator candidate address
+  function _addDelegation(address delegator, address candidate) internal {
+    Delegator storage d = delegatorMap[delegator];
+    d.candidates.push(candidate);
+    d.candidateIndexes[candidate] = d.candidates.length;
+  }
+
   /// get accrued rewards of a validator candidate on a given round
   /// @param candidate validator candidate address
   /// @param round the round to calculate rewards
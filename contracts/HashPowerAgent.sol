@@ -42,19 +42,24 @@ contract HashPowerAgent is IAgent, System, IParamSubscriber {
     // fetch BTC miners who delegated hash power in the about to end round; 
     // and distribute rewards to them
     uint256 minerSize;
+    uint256 blockSize;
     uint256 avgReward;
     for (uint256 i = 0; i < validatorSize; ++i) {
       if (rewardList[i] == 0) {
         continue;
       }
-      address[] memory miners = ILightClient(LIGHT_CLIENT_ADDR).getRoundMiners(round-7, validators[i]);
-      // distribute rewards to every miner
+      (address[] memory miners, uint256[] memory counts) = ILightClient(LIGHT_CLIENT_ADDR).getRoundMinerPowers(round-7, validators[i]);
+      // distribute rewards to every miner, in proportion to the number of BTC blocks it delegated
       minerSize = miners.length;
       if (minerSize != 0) {
-        avgReward = rewardList[i] / minerSize;
+        blockSize = 0;
         for (uint256 j = 0; j < minerSize; ++j) {
-          rewardMap[miners[j]].reward += avgReward;
-          rewardMap[miners[j]].accStakedAmount += 1;
+          blockSize += counts[j];
+        }
+        avgReward = rewardList[i] / blockSize;
+        for (uint256 j = 0; j < minerSize; ++j) {
+          rewardMap[miners[j]].reward += avgReward * counts[j];
+          rewardMap[miners[j]].accStakedAmount += counts[j];
         }
         emit validatorAvgReward(validators[i], avgReward);
       }
@@ -143,6 +143,7 @@ contract PledgeAgent is IPledgeAgent, System, IParamSubscriber {
   /*********************** events **************************/
   event claimedReward(address indexed delegator, address indexed operator, uint256 amount, bool success);
   event received(address indexed from, uint256 amount);
+  event movedCOREDataBatch(uint256 next, uint256 size);
 
   function init() external onlyNotInit {
     roundTag = block.timestamp / SatoshiPlusHelper.ROUND_INTERVAL;
@@ -255,6 +256,26 @@ contract PledgeAgent is IPledgeAgent, System, IParamSubscriber {
     _moveCOREData(candidate, delegator);
   }
 
+  /// move delegator data of a list of candidate/delegator pairs to new contracts
+  /// pairs are moved in order until the gas budget is used up, pairs which have been moved are skipped
+  /// @param candidates the validator candidate addresses
+  /// @param delegators the delegator addresses, paired with candidates by index
+  /// @param gasBudget the amount of gas to spend on moving, the pair which exhausts it is still moved
+  /// @return next the index of the first pair not moved, which is the cursor to resume from
+  function moveCOREDataBatch(address[] calldata candidates, address[] calldata delegators, uint256 gasBudget) external returns (uint256 next) {
+    uint256 pairSize = candidates.length;
+    require(pairSize == delegators.length, "the length of candidates and delegators should be equal");
+    uint256 startGas = gasleft();
+    while (next < pairSize) {
+      _moveCOREData(candidates[next], delegators[next]);
+      ++next;
+      if (startGas - gasleft() >= gasBudget) {
+        break;
+      }
+    }
+    emit movedCOREDataBatch(next, pairSize);
+  }
+
   /*********************** Internal methods ***************************/
   /// send rewards to delegator and clear the record in rewardMap
   /// @param delegator the delegator address
@@ -4,6 +4,7 @@ pragma solidity 0.8.4;
 import "./interface/IParamSubscriber.sol";
 import "./interface/IStakeHub.sol";
 import "./interface/IAgent.sol";
+import "./interface/IBitcoinAgent.sol";
 import "./interface/ISystemReward.sol";
 import "./interface/IBitcoinStake.sol";
 import "./interface/IValidatorSet.sol";
@@ -23,6 +24,12 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
   using BytesLib for *;
   using SafeCast for *;
 
+  // index of hash power in assets, its rewards neither depend on nor affect other assets
+  // so they are left in the agent on stake changes and settled when claiming
+  uint256 public constant HASH_ASSET_INDEX = 1;
+  // index of BTC in assets, the only asset dual staking grading applies to
+  uint256 public constant BTC_ASSET_INDEX = 2;
+
   // Supported asset types
   //  - CORE
   //  - Hash power (measured in BTC blocks)
@@ -53,6 +60,10 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
   // value:  delegator's reward based on assert
   mapping(address => Delegator) public delegatorMap;
 
+  // extra rewards of dual staking grading pre-funded from system reward contract on each round
+  // claims pay extra rewards beyond surplus from it, and only call system reward contract if it runs short
+  uint256 public floatReserve;
+
   struct Asset {
     string  name;
     address agent;
@@ -139,6 +150,7 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
     uint256[] memory rewards = new uint256[](validatorSize);
 
     uint256 burnReward;
+    uint256 btcReward;
     uint256 assetSize = assets.length;
     for (uint256 i = 0; i < assetSize; ++i) {
       for (uint256 j = 0; j < validatorSize; ++ j) {
@@ -153,6 +165,9 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
           continue;
         }
         rewards[j] = rewardList[j] * candidateScoresMap[validator][i+1] / totalScore;
+        if (i == BTC_ASSET_INDEX) {
+          btcReward += rewards[j];
+        }
       }
       emit roundReward(assets[i].name, roundTag, validators, rewards);
       IAgent(assets[i].agent).distributeReward(validators, rewards, roundTag);
@@ -161,6 +176,8 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
     if (burnReward != 0) {
       ISystemReward(SYSTEM_REWARD_ADDR).receiveRewards{ value: burnReward }();
     }
+
+    _refillFloatReserve(btcReward);
   }
 
   /// Calculate hybrid score for all candidates
@@ -227,7 +244,7 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
   /// @return rewards Amounts claimed
   function claimReward() external returns (uint256[] memory rewards) {
     address delegator = msg.sender;
-    rewards = _calculateReward(delegator, true);
+    rewards = _calculateReward(delegator, true, true);
 
     Delegator storage d  = delegatorMap[delegator];
     for (uint256 i = 0; i < d.rewards.length; i++) {
@@ -253,7 +270,7 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
   /// @param delegator delegator address
   /// @return reward Amounts claimed
   function proxyClaimReward(address delegator) external onlyPledgeAgent returns (uint256 reward) {
-    uint256[] memory rewards = _calculateReward(delegator, true);
+    uint256[] memory rewards = _calculateReward(delegator, true, true);
 
     Delegator storage d  = delegatorMap[delegator];
     for (uint256 i = 0; i < d.rewards.length; i++) {
@@ -286,11 +303,11 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
     Delegator storage d = delegatorMap[delegator];
     uint256 currentRound = ICandidateHub(CANDIDATE_HUB_ADDR).getRoundTag();
     if (d.changeRound != currentRound) {
-      uint256[] memory rewards = _calculateReward(delegator, false);
+      uint256[] memory rewards = _calculateReward(delegator, false, false);
       for (uint256 i = 0; i < rewards.length; i++) {
         if (d.rewards.length == i) {
           d.rewards.push(rewards[i]);
-        } else {
+        } else if (rewards[i] != 0) {
           d.rewards[i] += rewards[i];
         }
       }
@@ -301,8 +318,9 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
   /// Calculate reward for delegator
   /// @param delegator delegator address
   /// @param claim claim or store claim
+  /// @param settleAll settle all assets or only those coupled by dual staking grading
   /// @return rewards Amounts claimed
-  function _calculateReward(address delegator, bool claim) internal returns (uint256[] memory rewards) {
+  function _calculateReward(address delegator, bool claim, bool settleAll) internal returns (uint256[] memory rewards) {
     uint256 lastRound = ICandidateHub(CANDIDATE_HUB_ADDR).getRoundTag() - 1;
     Delegator storage d = delegatorMap[delegator];
 
@@ -325,6 +343,9 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
 
     uint256 totalReward = rewards[0];
     for (uint256 i = 1; i < assetSize; ++i) {
+      if (!settleAll && i == HASH_ASSET_INDEX) {
+        continue;
+      }
       (tempReward, floatReward,) = IAgent(assets[i].agent).claimReward(delegator, accStakedCoreAmount, lastRound, claim);
       rewards[i] += tempReward;
       totalReward += rewards[i];
@@ -332,11 +353,30 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
     }
 
     if (totalFloatReward > surplus.toInt256()) {
-      uint256 claimAmount = totalFloatReward.toUint256() - surplus;
-      uint256 actualAmount = ISystemReward(SYSTEM_REWARD_ADDR).claimRewards(payable(STAKE_HUB_ADDR), claimAmount);
-      surplus += actualAmount;
+      uint256 extraReward = totalFloatReward.toUint256() - surplus;
+      surplus = 0;
+      if (extraReward > floatReserve) {
+        uint256 actualAmount = ISystemReward(SYSTEM_REWARD_ADDR).claimRewards(payable(STAKE_HUB_ADDR), extraReward - floatReserve);
+        floatReserve += actualAmount;
+      }
+      floatReserve -= extraReward;
+    } else {
+      surplus = (surplus.toInt256() - totalFloatReward).toUint256();
+    }
+  }
+
+  /// Refill the reserve for extra rewards to the most dual staking grading can pay on the round rewards
+  /// @param btcReward The BTC rewards of the round
+  function _refillFloatReserve(uint256 btcReward) internal {
+    uint256 percentage = IBitcoinAgent(assets[BTC_ASSET_INDEX].agent).getMaxGradePercentage();
+    if (percentage <= SatoshiPlusHelper.DENOMINATOR) {
+      return;
+    }
+    uint256 maxFloatReward = btcReward * (percentage - SatoshiPlusHelper.DENOMINATOR) / SatoshiPlusHelper.DENOMINATOR;
+    if (maxFloatReward > floatReserve) {
+      uint256 actualAmount = ISystemReward(SYSTEM_REWARD_ADDR).claimRewards(payable(STAKE_HUB_ADDR), maxFloatReward - floatReserve);
+      floatReserve += actualAmount;
     }
-    surplus = (surplus.toInt256() - totalFloatReward).toUint256();
   }
 
   /*********************** Governance ********************************/
@@ -190,6 +190,8 @@ contract ValidatorSet is IValidatorSet, System, IParamSubscriber {
     }
 
     for (i = 0; i < currentLength; ++i) {
+      // entries of the last set are deleted above, so a set entry means a duplicate in this one
+      require(currentValidatorSetMap[consensusAddrList[i]] == 0, "duplicate consensus address");
       if (i >= lastLength) {
         currentValidatorSet.push(Validator(operateAddrList[i], consensusAddrList[i], feeAddrList[i],commissionThousandthsList[i], 0));
       } else {
@@ -323,11 +325,13 @@ contract ValidatorSet is IValidatorSet, System, IParamSubscriber {
   }
 
   /*********************** Internal Functions **************************/
+  /// Check the lengths and commissions of an update payload in place
+  /// @dev duplicate consensus addresses are rejected while the set is written in updateValidatorSet
   function checkValidatorSet(
-    address[] memory operateAddrList,
-    address[] memory consensusAddrList,
-    address payable[] memory feeAddrList,
-    uint256[] memory commissionThousandthsList
+    address[] calldata operateAddrList,
+    address[] calldata consensusAddrList,
+    address payable[] calldata feeAddrList,
+    uint256[] calldata commissionThousandthsList
   ) private pure {
     require(
       consensusAddrList.length == operateAddrList.length,
@@ -341,10 +345,8 @@ contract ValidatorSet is IValidatorSet, System, IParamSubscriber {
       consensusAddrList.length == commissionThousandthsList.length,
       "the numbers of consensusAddresses and commissionThousandthss should be equal"
     );
-    for (uint256 i = 0; i < consensusAddrList.length; i++) {
-      for (uint256 j = 0; j < i; j++) {
-        require(consensusAddrList[i] != consensusAddrList[j], "duplicate consensus address");
-      }
+    uint256 length = commissionThousandthsList.length;
+    for (uint256 i = 0; i < length; i++) {
       require(commissionThousandthsList[i] <= 1000, "commissionThousandths out of bound");
     }
   }
@@ -0,0 +1,8 @@
+// SPDX-License-Identifier: Apache2.0
+pragma solidity 0.8.4;
+
+interface IBitcoinAgent {
+  /// Get the highest percentage dual staking grading applies to BTC rewards
+  /// @return percentage The highest grade percentage, measured in SatoshiPlusHelper.DENOMINATOR
+  function getMaxGradePercentage() external view returns (uint256 percentage);
+}
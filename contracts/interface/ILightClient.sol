@@ -8,6 +8,8 @@ interface ILightClient {
   
   function getRoundMiners(uint256 roundTimeTag, address candidate) external view returns (address[] memory miners);
 
+  function getRoundMinerPowers(uint256 roundTimeTag, address candidate) external view returns (address[] memory miners, uint256[] memory counts);
+
   function checkTxProof(bytes32 txid, uint32 blockHeight, uint32 confirmBlock, bytes32[] calldata nodes, uint256 index) external view returns (bool);
 
   function checkTxProofAndGetTime(bytes32 txid, uint32 blockHeight, uint32 confirmBlock, bytes32[] calldata nodes, uint256 index) external view returns (bool, uint64);
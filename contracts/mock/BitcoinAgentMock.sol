@@ -50,5 +50,9 @@ contract BitcoinAgentMock is BitcoinAgent {
         gradeActive = value;
     }
 
+    function getGradePercentageMock(uint256 stakeRate) external view returns (uint256) {
+        return _getGradePercentage(stakeRate);
+    }
+
 
 }
@@ -55,6 +55,7 @@ contract BitcoinLSTStakeMock is BitcoinLSTStake {
 
     function setAccruedRewardPerBTCMap(uint256 round, uint256 value) external {
         accruedRewardPerBTCMap[round] = value;
+        _addRewardRound(round);
     }
 
 
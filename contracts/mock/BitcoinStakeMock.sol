@@ -59,6 +59,16 @@ contract BitcoinStakeMock is BitcoinStake {
         return grades.length;
     }
 
+    function getGradePercentageMock(uint256 lockDuration) external view returns (uint256) {
+        return _getGradePercentage(lockDuration);
+    }
+
+    function setLegacyReceipt(bytes32 txid) external {
+        DepositReceipt storage dr = depositReceiptMap[txid];
+        dr.legacyRound = dr.round;
+        dr.round = 0;
+    }
+
     function setBtcRewardMap(address delegator, uint256 reward, uint256 unclaimed, uint256 accStakedAmount) external {
         rewardMap[delegator] = Reward(reward, unclaimed, accStakedAmount);
     }
@@ -146,11 +156,11 @@ contract BitcoinStakeMock is BitcoinStake {
                 continue;
             }
 
-            // Set receiptMap
-            DepositReceipt storage dr = receiptMap[txids[i]];
+            // Set depositReceiptMap
+            DepositReceipt storage dr = depositReceiptMap[txids[i]];
             dr.candidate = candidate;
+            dr.round = uint64(round);
             dr.delegator = delegator;
-            dr.round = round;
             bt.amount = uint64(amount);
             bt.lockTime = uint32(lockTime);
 
@@ -173,7 +183,7 @@ contract BitcoinStakeMock is BitcoinStake {
             bt.lockTime = lockTime;
             bt.blockTimestamp = blockTimestamp;
         }
-        DepositReceipt storage dr = receiptMap[txid];
+        DepositReceipt storage dr = depositReceiptMap[txid];
         uint64 btcAmount;
         {
             (btcAmount, outputIndex, delegator, candidate) = (btcValue, outputIndex, delegator, candidate);
@@ -183,16 +193,16 @@ contract BitcoinStakeMock is BitcoinStake {
         }
         delegatorMap[delegator].txids.push(txid);
         candidateMap[candidate].realtimeAmount += btcAmount;
-        dr.delegator = delegator;
         dr.candidate = candidate;
-        dr.round = roundTag;
+        dr.round = uint64(roundTag);
+        dr.delegator = delegator;
         _addExpire(dr, lockTime, btcAmount);
     }
 
     function _mockCollectReward(bytes32 txid) internal returns (uint256 reward, bool expired, uint256 accStakedAmount) {
         BtcTx storage bt = btcTxMap[txid];
-        DepositReceipt storage dr = receiptMap[txid];
-        uint256 drRound = dr.round;
+        DepositReceipt storage dr = depositReceiptMap[txid];
+        uint256 drRound = _getReceiptRound(dr);
         require(drRound != 0, "invalid deposit receipt");
         uint256 lastRound = roundTag - 1;
         uint256 unlockRound1 = bt.lockTime / SatoshiPlusHelper.ROUND_INTERVAL - 1;
@@ -218,7 +228,7 @@ contract BitcoinStakeMock is BitcoinStake {
                 reward = rewardClaimed;
             }
 
-            dr.round = minRound;
+            dr.round = uint64(minRound);
             if (reward != 0) {
                 rewardMap[dr.delegator].reward += reward;
             }
@@ -232,7 +242,7 @@ contract BitcoinStakeMock is BitcoinStake {
 
         if (unlockRound1 < roundTag) {
             emit btcExpired(txid, dr.delegator);
-            delete receiptMap[txid];
+            delete depositReceiptMap[txid];
             return (reward, true, accStakedAmount);
         }
         return (reward, false, accStakedAmount);
@@ -242,7 +252,7 @@ contract BitcoinStakeMock is BitcoinStake {
 /// @param targetCandidate the new validator to stake to
     function mockTransferBtc(bytes32 txid, address targetCandidate) external nonReentrant {
         BtcTx storage bt = btcTxMap[txid];
-        DepositReceipt storage dr = receiptMap[txid];
+        DepositReceipt storage dr = depositReceiptMap[txid];
         uint64 amount = bt.amount;
         require(amount != 0, "btc tx not found");
         require(dr.delegator == msg.sender, "not the delegator of this btc receipt");
@@ -263,7 +273,7 @@ contract BitcoinStakeMock is BitcoinStake {
 
         // Set candidate to targetCandidate
         dr.candidate = targetCandidate;
-        dr.round = roundTag;
+        dr.round = uint64(roundTag);
         _addExpire(dr, bt.lockTime, amount);
 
         Candidate storage tc = candidateMap[targetCandidate];
@@ -17,6 +17,46 @@ contract BtcLightClientMock is BtcLightClient {
         rewardForSyncHeader = rewardForSyncHeader / 1e16;
     }
 
+    /// Restart the chain from a regtest style header with an easy target
+    /// @dev Targets are not retargeted at adjustment boundaries and block scores are
+    /// measured against REGTEST_POW_LIMIT, see tests/btc_header_chain.py
+    /// @param headerBytes The 80 bytes header of the new initial block
+    /// @param blockHeight The height of the new initial block
+    function developmentInitRegtest(bytes calldata headerBytes, uint32 blockHeight) external {
+        bytes memory initBytes = headerBytes;
+        bytes32 blockHash = doubleShaFlip(initBytes);
+        uint32 adjustment = blockHeight / DIFFICULTY_ADJUSTMENT_INTERVAL;
+
+        regtest = true;
+        highScore = 1;
+        heaviestBlock = blockHash;
+        initBlockHash = blockHash;
+        adjustmentHashes[adjustment] = blockHash;
+        height2HashMap[blockHeight] = blockHash;
+        blockChain[blockHash] = encode(initBytes, address(0), 1, blockHeight, adjustment, address(0));
+    }
+
+    /// Bind BTC blocks to candidates and miners before they are stored
+    /// @dev Replaces the binding the light client precompile extracts from the coinbase tx
+    function setBlockBindings(bytes32[] calldata blockHashes, address[] calldata candidates, address[] calldata rewardAddrs) external {
+        require(blockHashes.length == candidates.length && blockHashes.length == rewardAddrs.length, "length mismatch");
+        for (uint256 i = 0; i < blockHashes.length; i++) {
+            mockCandidates[blockHashes[i]] = candidates[i];
+            mockRewardAddrs[blockHashes[i]] = rewardAddrs[i];
+        }
+    }
+
+    /// Confirm BTC transactions in bulk
+    /// @dev checkTxProof/checkTxProofAndGetTime accept the txids without a merkle proof
+    /// @param txids The BTC txids to confirm
+    /// @param timestamps The block timestamp of every txid, 0 revokes the confirmation
+    function setTxConfirmations(bytes32[] calldata txids, uint64[] calldata timestamps) external {
+        require(txids.length == timestamps.length, "length mismatch");
+        for (uint256 i = 0; i < txids.length; i++) {
+            mockTxTimes[txids[i]] = timestamps[i];
+        }
+    }
+
     function setBlock(bytes32 hash, bytes32 prevHash, address rewardAddr, address candidateAddr) public {
         mockBlockHeight = mockBlockHeight + 1;
         bytes memory headerBytes = new bytes(4);
@@ -49,13 +89,29 @@ contract BtcLightClientMock is BtcLightClient {
         if (exist == false) {
             r.candidates.push(candidate);
         }
+        CandidatePower storage p = r.powerMap[candidate];
+        for (uint i = 0; i < p.minerSet.length; i++) {
+            delete p.minerIndexes[p.minerSet[i]];
+        }
         delete r.powerMap[candidate];
         for (uint i = 0; i < rewardAddrs.length; i++) {
-            r.powerMap[candidate].miners.push(rewardAddrs[i]);
-            r.powerMap[candidate].btcBlocks.push(bytes32(0));
+            addCandidatePower(p, rewardAddrs[i], bytes32(0));
+        }
+    }
+
+    function setLegacyMiners(uint roundTimeTag, address candidate, address[] memory rewardAddrs) external {
+        setMiners(roundTimeTag, candidate, new address[](0));
+        CandidatePower storage p = roundPowerMap[roundTimeTag].powerMap[candidate];
+        for (uint i = 0; i < rewardAddrs.length; i++) {
+            p.miners.push(rewardAddrs[i]);
+            p.btcBlocks.push(bytes32(0));
         }
     }
 
+    function addCandidatePowerMock(uint roundTimeTag, address candidate, address rewardAddr) external {
+        addCandidatePower(roundPowerMap[roundTimeTag].powerMap[candidate], rewardAddr, bytes32(0));
+    }
+
     function addMinerPowerMock(bytes32 blockHash) external {
         addMinerPower(blockHash);
     }
@@ -81,9 +81,16 @@ contract CandidateHubMock is CandidateHub {
     }
 
     function setJailMap(address k, uint256 v) public {
+        if (jailMap[k] == 0 && v != 0 && jailedCandidatesInit) {
+            jailedCandidates.push(k);
+        }
         jailMap[k] = v;
     }
 
+    function getJailedCandidates() external view returns (address[] memory) {
+        return jailedCandidates;
+    }
+
     function setCandidateMargin(address k, uint256 v) public {
         candidateSet[operateMap[k] - 1].margin = v;
     }
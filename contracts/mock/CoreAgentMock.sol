@@ -140,7 +140,7 @@ contract CoreAgentMock is CoreAgent {
         uint256 changeRound = cd.changeRound;
         if (changeRound == 0) {
             cd.changeRound = roundTag;
-            delegatorMap[delegator].candidates.push(candidate);
+            _addDelegation(delegator, candidate);
         } else if (changeRound != roundTag) {
             (uint256 reward, uint256 accStakedAmount) = _mockCollectRewardFromCandidate(candidate, cd);
             rewardMap[delegator].reward += reward;
@@ -76,6 +76,21 @@ contract PledgeAgentMock is PledgeAgent {
 
     function setCoinDelegator(address agent) external {}
 
+    // seeds legacy delegations of `deposit` each, staked in the current round
+    function setCoinDelegators(address agent, address[] calldata delegators, uint256 deposit) external payable {
+        require(msg.value == deposit * delegators.length, "deposit mismatch");
+        Agent storage a = agentsMap[agent];
+        uint256 rewardIndex = a.rewardSet.length;
+        for (uint256 i = 0; i < delegators.length; i++) {
+            CoinDelegator storage d = a.cDelegatorMap[delegators[i]];
+            d.deposit = deposit;
+            d.newDeposit = deposit;
+            d.changeRound = roundTag;
+            d.rewardIndex = rewardIndex;
+        }
+        a.totalDeposit += msg.value;
+    }
+
     function setBtcDelegator(address agent) external {}
 
     function getRewardLength(address agent) external view returns (uint) {
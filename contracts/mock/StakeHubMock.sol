@@ -51,12 +51,16 @@ contract StakeHubMock is StakeHub {
         surplus = value;
     }
 
+    function setFloatReserve(uint256 value) external {
+        floatReserve = value;
+    }
+
     function initHybridScoreMock() external {
         _initializeFromPledgeAgent();
     }
 
     function calculateRewardMock(address delegator) external returns (uint256[] memory rewards) {
-        (rewards) = _calculateReward(delegator, false);
+        (rewards) = _calculateReward(delegator, false, true);
     }
 
     function coreAgentDistributeReward(address[] calldata validators, uint256[] calldata rewardList, uint256 round) external {
@@ -0,0 +1,142 @@
+import json
+from .btc_header_chain import BlockHeader
+from .btc_header_verifier import HeaderVerifier, CONFIRM_BLOCK
+
+# storeBlockHeader paths, a stored header takes exactly one of the base paths
+PATH_FAILED = 'failed'
+PATH_FORK = 'fork'
+PATH_TIP = 'tip'
+PATH_REORG = 'reorg'
+# extra work on top of a base path
+FLAG_POWER = 'power'
+FLAG_REWARD = 'reward'
+
+PERCENTILES = (50, 90, 99)
+WORST_COUNT = 10
+
+
+def percentile(sorted_values: list, p: int) -> int:
+    # nearest rank percentile of an ascending list
+    rank = max((p * len(sorted_values) + 99) // 100, 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(values: list) -> dict:
+    values = sorted(values)
+    summary = {'count': len(values), 'min': values[0], 'max': values[-1], 'mean': sum(values) // len(values)}
+    for p in PERCENTILES:
+        summary[f'p{p}'] = percentile(values, p)
+    return summary
+
+
+class HeaderGasRecord:
+    def __init__(self, height, block_hash, gas_used, path, flags, reorg_depth=0, return_code=0):
+        self.height = height
+        self.block_hash = block_hash
+        self.gas_used = gas_used
+        self.path = path
+        self.flags = flags
+        self.reorg_depth = reorg_depth
+        self.return_code = return_code
+
+    @property
+    def label(self):
+        return '+'.join([self.path] + self.flags)
+
+    def to_dict(self):
+        return {
+            'height': self.height,
+            'block_hash': self.block_hash,
+            'gas_used': self.gas_used,
+            'path': self.label,
+            'reorg_depth': self.reorg_depth,
+            'return_code': self.return_code
+        }
+
+
+class HeaderGasBenchmark:
+    # submits headers to BtcLightClient and records the gas of every storeBlockHeader,
+    # classified by the path it took. tip moves and reorg walks are predicted with a
+    # HeaderVerifier seeded from the light client, relayer reward rounds by counting
+    # stored headers against roundSize
+    def __init__(self, btc_light_client, relayers: list, gas_price: int):
+        self.btc_light_client = btc_light_client
+        self.relayers = relayers
+        self.gas_price = gas_price
+        self.verifier = HeaderVerifier.from_light_client(btc_light_client)
+        self.count_in_round = btc_light_client.countInRound()
+        self.round_size = btc_light_client.roundSize()
+        self.records = []
+
+    def store(self, header_hex: str) -> HeaderGasRecord:
+        header_bytes = bytes.fromhex(header_hex.replace('0x', ''))
+        header = BlockHeader.deserialize(header_bytes[:80])
+        prev_block = self.verifier.get_block(header.prev_hash[::-1])
+        height = 0 if prev_block is None else prev_block.height + 1
+        reorg_depth = self.__reorg_depth(header, height)
+        old_tip = self.verifier.get_chain_tip()
+
+        relayer = self.relayers[len(self.records) % len(self.relayers)]
+        tx = self.btc_light_client.storeBlockHeader(header_hex, {'from': relayer, 'gas_price': self.gas_price})
+        return_code = self.verifier.store_header(header_bytes)
+
+        flags = []
+        if 'StoreHeaderFailed' in tx.events:
+            path = PATH_FAILED
+            reorg_depth = 0
+            return_code = tx.events['StoreHeaderFailed']['returnCode']
+        else:
+            self.count_in_round += 1
+            if self.count_in_round >= self.round_size:
+                flags.append(FLAG_REWARD)
+                self.count_in_round = 0
+            if 'AddMinerPower' in tx.events:
+                flags.append(FLAG_POWER)
+
+            if self.verifier.get_chain_tip() == old_tip:
+                path = PATH_FORK
+                reorg_depth = 0
+            else:
+                path = PATH_REORG if reorg_depth > 0 else PATH_TIP
+
+        record = HeaderGasRecord(height, header.block_hash, tx.gas_used, path, flags, reorg_depth, return_code)
+        self.records.append(record)
+        return record
+
+    def store_all(self, headers: list) -> list:
+        return [self.store(header_hex) for header_hex in headers]
+
+    def report(self) -> dict:
+        by_label = {}
+        for record in self.records:
+            by_label.setdefault(record.label, []).append(record.gas_used)
+        overall = summarize([record.gas_used for record in self.records])
+        worst = sorted(self.records, key=lambda r: r.gas_used, reverse=True)[:WORST_COUNT]
+        return {
+            'gas_price': self.gas_price,
+            'max_fee': overall['max'] * self.gas_price,
+            'overall': overall,
+            'paths': {label: summarize(values) for label, values in sorted(by_label.items())},
+            'worst': [record.to_dict() for record in worst],
+            'records': [record.to_dict() for record in self.records]
+        }
+
+    def write_report(self, file_path: str) -> dict:
+        report = self.report()
+        with open(file_path, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+        return report
+
+    def __reorg_depth(self, header: BlockHeader, height: int) -> int:
+        # height2HashMap entries below the header that a new tip through it rewrites
+        depth = 0
+        prev_height = height - 1
+        prev_hash = header.prev_hash[::-1]
+        while self.verifier.height2hash.get(prev_height) != prev_hash and prev_height + CONFIRM_BLOCK >= height:
+            depth += 1
+            prev_block = self.verifier.get_block(prev_hash)
+            if prev_block is None:
+                break
+            prev_height -= 1
+            prev_hash = prev_block.header.prev_hash[::-1]
+        return depth
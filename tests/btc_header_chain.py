@@ -0,0 +1,182 @@
+import os
+import struct
+from .btc_merkle import double_sha256, MerkleTree
+
+HEADER_SIZE = 80
+DIFFICULTY_ADJUSTMENT_INTERVAL = 2016
+TARGET_TIMESPAN = 14 * 24 * 60 * 60
+TARGET_TIMESPAN_DIV_4 = TARGET_TIMESPAN // 4
+TARGET_TIMESPAN_MUL_4 = TARGET_TIMESPAN * 4
+TARGET_SPACING = 600
+UINT256_MOD = 2 ** 256
+
+MAINNET_MAX_TARGET = 0xFFFF << 208
+REGTEST_POW_LIMIT = 0x7fffff << 232
+# regtest pow limit, half of the hashes are valid
+REGTEST_BITS = 0x207fffff
+
+
+# mirror of BtcLightClient.targetFromBits
+def target_from_bits(bits: int) -> int:
+    size = bits >> 24
+    word = bits & 0x00ffffff
+    if size <= 3:
+        return word >> (8 * (3 - size))
+    return word << (8 * (size - 3))
+
+
+# mirror of BtcLightClient.toCompactBits
+def compact_bits_from_target(target: int) -> int:
+    nbytes = (target.bit_length() + 7) >> 3
+    if nbytes <= 3:
+        compact = (target & 0xFFFFFF) << (8 * (3 - nbytes))
+    else:
+        compact = (target >> (8 * (nbytes - 3))) & 0xFFFFFF
+    if compact & 0x00800000:
+        compact >>= 8
+        nbytes += 1
+    return (compact | (nbytes << 24)) & 0xFFFFFFFF
+
+
+# mirror of the retarget in BtcLightClient.checkProofOfWork, including the
+# unchecked 256 bits multiplication done in assembly
+def retarget_bits(prev_bits: int, prev_time: int, start_time: int) -> int:
+    actual_timespan = (prev_time - start_time) % 2 ** 64
+    actual_timespan = max(actual_timespan, TARGET_TIMESPAN_DIV_4)
+    actual_timespan = min(actual_timespan, TARGET_TIMESPAN_MUL_4)
+    new_target = (actual_timespan * target_from_bits(prev_bits)) % UINT256_MOD // TARGET_TIMESPAN
+    return compact_bits_from_target(new_target)
+
+
+def block_difficulty(target: int, regtest=False) -> int:
+    max_target = REGTEST_POW_LIMIT if regtest else MAINNET_MAX_TARGET
+    return max_target // target
+
+
+class BlockHeader:
+    def __init__(self, version, prev_hash: bytes, merkle_root: bytes, time, bits, nonce=0):
+        # prev_hash and merkle_root are in internal byte order
+        self.version = version
+        self.prev_hash = prev_hash
+        self.merkle_root = merkle_root
+        self.time = time
+        self.bits = bits
+        self.nonce = nonce
+
+    @classmethod
+    def deserialize(cls, header_bytes: bytes):
+        assert len(header_bytes) >= HEADER_SIZE
+        version, prev_hash, merkle_root, time, bits, nonce = struct.unpack_from('<I32s32sIII', header_bytes)
+        return cls(version, prev_hash, merkle_root, time, bits, nonce)
+
+    def serialize(self) -> bytes:
+        return struct.pack('<I32s32sIII', self.version, self.prev_hash, self.merkle_root,
+                           self.time, self.bits, self.nonce)
+
+    @property
+    def hash(self) -> bytes:
+        # internal byte order, the contract keys blocks by the reversed (display) order
+        return double_sha256(self.serialize())
+
+    @property
+    def block_hash(self) -> str:
+        return '0x' + self.hash[::-1].hex()
+
+    def to_hex(self) -> str:
+        return '0x' + self.serialize().hex()
+
+    def mine(self):
+        # grind the nonce until the header hash meets its own target
+        target = target_from_bits(self.bits)
+        prefix = bytearray(self.serialize())
+        for nonce in range(2 ** 32):
+            struct.pack_into('<I', prefix, 76, nonce)
+            if int.from_bytes(double_sha256(prefix), 'little') <= target:
+                self.nonce = nonce
+                return self
+        raise ValueError("no valid nonce for the header")
+
+
+class ChainBlock:
+    def __init__(self, header: BlockHeader, height: int, score: int, candidate=None, reward_addr=None):
+        self.header = header
+        self.height = height
+        self.score = score
+        self.candidate = candidate
+        self.reward_addr = reward_addr
+
+    @property
+    def hash(self) -> bytes:
+        return self.header.hash
+
+
+# generates valid BTC header chains of any length on top of an initial header, with forks
+# from any stored block and miner/candidate bindings per block. in regtest mode (see
+# BtcLightClientMock.developmentInitRegtest) every block keeps the initial easy target,
+# otherwise targets are retargeted at DIFFICULTY_ADJUSTMENT_INTERVAL boundaries exactly
+# as BtcLightClient.checkProofOfWork expects them
+class HeaderChainGenerator:
+    def __init__(self, init_height: int, init_time: int, bits=REGTEST_BITS, regtest=True, version=0x20000000):
+        self.regtest = regtest
+        self.version = version
+        init_header = BlockHeader(version, b'\x00' * 32, os.urandom(32), init_time, bits).mine()
+        init_block = ChainBlock(init_header, init_height, 1)
+
+        # block hash in internal byte order => ChainBlock
+        self.blocks = {init_block.hash: init_block}
+        self.init_block = init_block
+        self.tip = init_block
+
+    def get_block(self, block_hash: bytes) -> ChainBlock:
+        return self.blocks[block_hash]
+
+    def get_init_header_hex(self) -> str:
+        return self.init_block.header.to_hex()
+
+    def get_ancestor(self, block: ChainBlock, height: int) -> ChainBlock:
+        while block.height > height:
+            block = self.blocks[block.header.prev_hash]
+        return block
+
+    def next_bits(self, parent: ChainBlock) -> int:
+        height = parent.height + 1
+        if self.regtest or height % DIFFICULTY_ADJUSTMENT_INTERVAL != 0:
+            return parent.header.bits
+
+        # the light client starts the first period at its initial block
+        start_height = max(height - DIFFICULTY_ADJUSTMENT_INTERVAL, self.init_block.height)
+        start = self.get_ancestor(parent, start_height)
+        return retarget_bits(parent.header.bits, parent.header.time, start.header.time)
+
+    def new_block(self, parent: ChainBlock, time=None, candidate=None, reward_addr=None, txids=None) -> ChainBlock:
+        if time is None:
+            time = parent.header.time + TARGET_SPACING
+        merkle_root = MerkleTree(txids).root if txids else os.urandom(32)
+        bits = self.next_bits(parent)
+
+        header = BlockHeader(self.version, parent.hash, merkle_root, time, bits).mine()
+        score = parent.score + block_difficulty(target_from_bits(bits), self.regtest)
+        block = ChainBlock(header, parent.height + 1, score, candidate, reward_addr)
+        self.blocks[block.hash] = block
+        if block.score >= self.tip.score:
+            self.tip = block
+        return block
+
+    # appends count blocks on top of parent (the current tip by default), a parent that is
+    # not the tip starts a fork. bindings is an optional callable height => (candidate, reward_addr)
+    def extend(self, count: int, parent: ChainBlock = None, time_spacing=TARGET_SPACING, bindings=None) -> list:
+        if parent is None:
+            parent = self.tip
+
+        blocks = []
+        for _ in range(count):
+            candidate, reward_addr = (None, None) if bindings is None else bindings(parent.height + 1)
+            parent = self.new_block(parent, parent.header.time + time_spacing, candidate, reward_addr)
+            blocks.append(parent)
+        return blocks
+
+    @staticmethod
+    def get_bindings(blocks: list):
+        # arguments of BtcLightClientMock.setBlockBindings for the bound blocks
+        bound = [b for b in blocks if b.candidate is not None]
+        return [b.header.block_hash for b in bound], [b.candidate for b in bound], [b.reward_addr for b in bound]
@@ -0,0 +1,269 @@
+from brownie import multicall
+from hexbytes import HexBytes
+from .btc_header_chain import BlockHeader, HEADER_SIZE, DIFFICULTY_ADJUSTMENT_INTERVAL, TARGET_TIMESPAN, \
+    TARGET_TIMESPAN_DIV_4, TARGET_TIMESPAN_MUL_4, UINT256_MOD, target_from_bits, compact_bits_from_target, \
+    block_difficulty
+
+# return codes of BtcLightClient.StoreHeaderFailed
+ERR_DIFFICULTY = 10010
+ERR_RETARGET = 10020
+ERR_NO_PREV_BLOCK = 10030
+ERR_BLOCK_ALREADY_EXISTS = 10040
+ERR_PROOF_OF_WORK = 10090
+
+# revert reasons of BtcLightClient.storeBlockHeader
+REVERT_DUPLICATED_HEADER = "can't sync duplicated header"
+REVERT_STALE_HEADER = "can't sync header 5 days ago"
+REVERT_UNDERFLOW = "arithmetic underflow"
+
+STALE_HEIGHT_GAP = 720
+CONFIRM_BLOCK = 6
+NODE_SIZE = 160
+
+
+class HeaderRevert(Exception):
+    pass
+
+
+class IndexedBlock:
+    def __init__(self, header: BlockHeader, height: int, score: int, adjustment: int):
+        self.header = header
+        self.height = height
+        self.score = score
+        self.adjustment = adjustment
+
+    @classmethod
+    def decode(cls, node_bytes: bytes):
+        # mirror of BtcLightClient.encode: header, reward address, score, height,
+        # adjustment index and candidate packed in 160 bytes
+        assert len(node_bytes) == NODE_SIZE
+        header = BlockHeader.deserialize(node_bytes[:HEADER_SIZE])
+        score = int.from_bytes(node_bytes[104:120], 'big')
+        height = int.from_bytes(node_bytes[120:124], 'big')
+        adjustment = int.from_bytes(node_bytes[124:128], 'big')
+        return cls(header, height, score, adjustment)
+
+
+def header_block_hash(header_bytes: bytes) -> bytes:
+    # display byte order, the order BtcLightClient keys its blocks with
+    return BlockHeader.deserialize(header_bytes).hash[::-1]
+
+
+# pure python mirror of BtcLightClient.storeBlockHeader/checkProofOfWork over an
+# in-memory header index, so that relayed headers can be checked and ordered before
+# any gas is spent. block hashes are 32 bytes in display byte order
+class HeaderVerifier:
+    def __init__(self, regtest=False):
+        # regtest mirrors the mock-only mode of BtcLightClientMock.developmentInitRegtest
+        self.regtest = regtest
+
+        # block hash => IndexedBlock
+        self.blocks = {}
+        self.adjustment_hashes = {}
+        self.height2hash = {}
+        self.heaviest_block = None
+        self.high_score = 0
+
+        # the initial block has no submitter, so it is not rejected as duplicated
+        self.init_block = None
+
+    @classmethod
+    def from_light_client(cls, btc_light_client, depth=STALE_HEIGHT_GAP, regtest=None):
+        # seeds the index with the main chain blocks of the last `depth` heights in two
+        # batched reads. blocks of stale forks are not indexed, headers extending
+        # them are reported as ERR_NO_PREV_BLOCK
+        if regtest is None:
+            regtest = hasattr(btc_light_client, 'regtest') and btc_light_client.regtest()
+        verifier = cls(regtest)
+
+        tip_height = btc_light_client.getChainTipHeight()
+        heights = list(range(max(tip_height - depth + 1, 0), tip_height + 1))
+        adjustments = list(range(heights[0] // DIFFICULTY_ADJUSTMENT_INTERVAL,
+                                 tip_height // DIFFICULTY_ADJUSTMENT_INTERVAL + 1))
+        with multicall:
+            heaviest_block = btc_light_client.heaviestBlock()
+            high_score = btc_light_client.highScore()
+            init_block = btc_light_client.initBlockHash()
+            height_hashes = [btc_light_client.height2HashMap(height) for height in heights]
+            adjustment_hashes = [btc_light_client.adjustmentHashes(index) for index in adjustments]
+
+        verifier.heaviest_block = bytes(heaviest_block)
+        verifier.high_score = int(high_score)
+        for height, block_hash in zip(heights, height_hashes):
+            if int.from_bytes(bytes(block_hash), 'big') != 0:
+                verifier.height2hash[height] = bytes(block_hash)
+        for index, block_hash in zip(adjustments, adjustment_hashes):
+            if int.from_bytes(bytes(block_hash), 'big') != 0:
+                verifier.adjustment_hashes[index] = bytes(block_hash)
+
+        block_hashes = set(verifier.height2hash.values()) | set(verifier.adjustment_hashes.values())
+        block_hashes |= {verifier.heaviest_block, bytes(init_block)}
+        block_hashes = sorted(block_hashes)
+        with multicall:
+            nodes = [btc_light_client.blockChain(block_hash) for block_hash in block_hashes]
+
+        for block_hash, node in zip(block_hashes, nodes):
+            if len(bytes(node)) == NODE_SIZE:
+                verifier.blocks[block_hash] = IndexedBlock.decode(bytes(node))
+        verifier.init_block = bytes(init_block)
+        return verifier
+
+    def init(self, header_bytes: bytes, height: int):
+        # mirror of BtcLightClient.init with an arbitrary initial header
+        block_hash = header_block_hash(header_bytes)
+        adjustment = height // DIFFICULTY_ADJUSTMENT_INTERVAL
+        self.blocks[block_hash] = IndexedBlock(BlockHeader.deserialize(header_bytes), height, 1, adjustment)
+        self.adjustment_hashes[adjustment] = block_hash
+        self.heaviest_block = block_hash
+        self.init_block = block_hash
+        self.high_score = 1
+
+    def get_block(self, block_hash: bytes):
+        return self.blocks.get(block_hash)
+
+    def get_chain_tip(self) -> bytes:
+        return self.heaviest_block
+
+    def get_chain_tip_height(self) -> int:
+        return self.blocks[self.heaviest_block].height
+
+    def check_proof_of_work(self, header_bytes: bytes):
+        # mirror of BtcLightClient.checkProofOfWork, returns (height, score, error code)
+        header = BlockHeader.deserialize(header_bytes)
+        block_hash = header.hash[::-1]
+
+        prev_block = self.blocks.get(header.prev_hash[::-1])
+        if prev_block is None or prev_block.score == 0:
+            return 0, 0, ERR_NO_PREV_BLOCK
+        if block_hash in self.blocks:
+            return 0, self.blocks[block_hash].score, ERR_BLOCK_ALREADY_EXISTS
+
+        target = target_from_bits(header.bits)
+        block_value = int.from_bytes(block_hash, 'big')
+        if block_value == 0 or block_value > target:
+            return 0, 0, ERR_PROOF_OF_WORK
+
+        height = prev_block.height + 1
+        prev_bits = prev_block.header.bits
+        if height % DIFFICULTY_ADJUSTMENT_INTERVAL != 0:
+            if header.bits != prev_bits and prev_bits != 0:
+                return height, 0, ERR_DIFFICULTY
+        elif self.regtest:
+            if header.bits != prev_bits:
+                return height, 0, ERR_RETARGET
+        else:
+            new_bits = self.__retarget_bits(prev_block)
+            if header.bits != new_bits and new_bits != 0:
+                return height, 0, ERR_RETARGET
+
+        score = prev_block.score + block_difficulty(target, self.regtest)
+        return height, score, 0
+
+    def verify_header(self, block_bytes: bytes):
+        # error code of storeBlockHeader for the block, 0 when it is stored.
+        # raises HeaderRevert when the transaction would revert instead
+        _, _, _, err_code = self.__verify(block_bytes)
+        return err_code
+
+    def store_header(self, block_bytes: bytes):
+        # verify_header followed by the index/tip update of a successful storeBlockHeader
+        header, height, score, err_code = self.__verify(block_bytes)
+        if err_code != 0:
+            return err_code
+
+        block_hash = header.hash[::-1]
+        adjustment = height // DIFFICULTY_ADJUSTMENT_INTERVAL
+        self.blocks[block_hash] = IndexedBlock(header, height, score, adjustment)
+
+        if score >= self.high_score:
+            prev_height = height - 1
+            prev_hash = header.prev_hash[::-1]
+            while self.height2hash.get(prev_height) != prev_hash and prev_height + CONFIRM_BLOCK >= height:
+                self.height2hash[prev_height] = prev_hash
+                if prev_height % DIFFICULTY_ADJUSTMENT_INTERVAL == 0:
+                    # the contract records the boundary under the new block's index
+                    self.adjustment_hashes[adjustment] = prev_hash
+                prev_block = self.blocks.get(prev_hash)
+                if prev_block is None:
+                    # below the indexed window
+                    break
+                prev_height -= 1
+                prev_hash = prev_block.header.prev_hash[::-1]
+
+            if height % DIFFICULTY_ADJUSTMENT_INTERVAL == 0:
+                self.adjustment_hashes[adjustment] = block_hash
+
+            self.heaviest_block = block_hash
+            self.high_score = score
+            self.height2hash[height] = block_hash
+        return 0
+
+    def store_headers(self, blocks: list):
+        # simulates submitting the blocks in order, returns an error code or revert
+        # reason per block
+        results = []
+        for block_bytes in blocks:
+            try:
+                results.append(self.store_header(block_bytes))
+            except HeaderRevert as e:
+                results.append(str(e))
+        return results
+
+    def sort_headers(self, blocks: list) -> list:
+        # orders the blocks so that every block follows its parent, blocks whose
+        # ancestry cannot be resolved keep their relative order at the end
+        by_hash = {}
+        children = {}
+        for block_bytes in blocks:
+            header = BlockHeader.deserialize(self.__header_bytes(block_bytes))
+            by_hash[header.hash[::-1]] = block_bytes
+            children.setdefault(header.prev_hash[::-1], []).append(header.hash[::-1])
+
+        ordered = []
+        pending = [h for h in reversed(list(children.keys())) if h in self.blocks and h not in by_hash]
+        while len(pending) > 0:
+            parent = pending.pop()
+            for block_hash in reversed(children.pop(parent, [])):
+                ordered.append(block_hash)
+                pending.append(block_hash)
+
+        ordered_set = set(ordered)
+        unresolved = [h for h in by_hash if h not in ordered_set]
+        return [by_hash[block_hash] for block_hash in ordered + unresolved]
+
+    def __verify(self, block_bytes):
+        header_bytes = self.__header_bytes(block_bytes)
+        header = BlockHeader.deserialize(header_bytes)
+        block_hash = header.hash[::-1]
+        if block_hash in self.blocks and block_hash != self.init_block:
+            raise HeaderRevert(REVERT_DUPLICATED_HEADER)
+
+        height, score, err_code = self.check_proof_of_work(header_bytes)
+        if err_code == 0 and height + STALE_HEIGHT_GAP <= self.get_chain_tip_height():
+            raise HeaderRevert(REVERT_STALE_HEADER)
+        return header, height, score, err_code
+
+    def __retarget_bits(self, prev_block: IndexedBlock) -> int:
+        # mirror of the retarget branch, the adjustment hash is looked up by the
+        # adjustment index of the previous block. a missing start block reads as
+        # time 0 here while the contract reads unrelated memory
+        start_hash = self.adjustment_hashes.get(prev_block.adjustment)
+        start_block = self.blocks.get(start_hash)
+        start_time = 0 if start_block is None else start_block.header.time
+        prev_time = prev_block.header.time
+        if prev_time < start_time:
+            raise HeaderRevert(REVERT_UNDERFLOW)
+
+        actual_timespan = prev_time - start_time
+        actual_timespan = max(actual_timespan, TARGET_TIMESPAN_DIV_4)
+        actual_timespan = min(actual_timespan, TARGET_TIMESPAN_MUL_4)
+        prev_target = target_from_bits(prev_block.header.bits)
+        new_target = (actual_timespan * prev_target) % UINT256_MOD // TARGET_TIMESPAN
+        return compact_bits_from_target(new_target)
+
+    @staticmethod
+    def __header_bytes(block_bytes) -> bytes:
+        # storeBlockHeader copies 80 bytes whatever the length; a shorter input reads
+        # zeros/memory that never form a linked header with valid pow, zero padding
+        # yields the same error codes
+        return bytes(HexBytes(block_bytes)[:HEADER_SIZE]).ljust(HEADER_SIZE, b'\x00')
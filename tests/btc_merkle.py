@@ -0,0 +1,86 @@
+import hashlib
+
+HASH_SIZE = 32
+
+
+def double_sha256(data) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+# bitcoin merkle tree over txids in internal byte order. every level is hashed once
+# into a contiguous byte buffer, so the proof of any index is a log2(n) walk over the
+# stored levels instead of rebuilding the tree for each transaction
+class MerkleTree:
+    def __init__(self, txids: list):
+        assert len(txids) > 0, "empty merkle tree"
+        leaves = b''.join(txids)
+        assert len(leaves) == len(txids) * HASH_SIZE, "txid must be 32 bytes"
+
+        self.levels = [leaves]
+        while self.__level_size(self.levels[-1]) > 1:
+            self.levels.append(self.__hash_level(self.levels[-1]))
+
+    @staticmethod
+    def __level_size(level: bytes) -> int:
+        return len(level) // HASH_SIZE
+
+    @staticmethod
+    def __hash_level(level: bytes) -> bytes:
+        # a pair of siblings is contiguous in the level buffer and is hashed in place,
+        # an odd last node is paired with itself
+        view = memoryview(level)
+        size = len(level) // HASH_SIZE
+        parents = bytearray()
+        for i in range(0, size - 1, 2):
+            parents += double_sha256(view[i * HASH_SIZE:(i + 2) * HASH_SIZE])
+        if size % 2 == 1:
+            last = view[(size - 1) * HASH_SIZE:]
+            parents += double_sha256(bytes(last) * 2)
+        return bytes(parents)
+
+    def __len__(self):
+        return self.__level_size(self.levels[0])
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1]
+
+    def get_node(self, depth: int, index: int) -> bytes:
+        return self.levels[depth][index * HASH_SIZE:(index + 1) * HASH_SIZE]
+
+    def get_proof(self, index: int) -> list:
+        assert 0 <= index < len(self), f"tx index out of range: {index}"
+        nodes = []
+        for depth in range(len(self.levels) - 1):
+            size = self.__level_size(self.levels[depth])
+            sibling = index ^ 1
+            if sibling >= size:
+                sibling = index
+            nodes.append(self.get_node(depth, sibling))
+            index >>= 1
+        return nodes
+
+    # proof nodes as bytes32 arguments of BtcLightClient.checkTxProof/checkTxProofAndGetTime
+    def get_proof_hex(self, index: int) -> list:
+        return ['0x' + node.hex() for node in self.get_proof(index)]
+
+    # yields (index, txid, nodes) for every transaction in the tree
+    def iter_proofs(self, hex_nodes=True):
+        for index in range(len(self)):
+            nodes = self.get_proof_hex(index) if hex_nodes else self.get_proof(index)
+            yield index, self.get_node(0, index), nodes
+
+
+# mirror of the merkle walk in BtcLightClient.checkTxProof
+def verify_proof(txid: bytes, nodes: list, index: int, root: bytes) -> bool:
+    if len(nodes) == 0:
+        return txid == root
+
+    current = txid
+    for node in nodes:
+        if index % 2 == 1:
+            current = double_sha256(node + current)
+        else:
+            current = double_sha256(current + node)
+        index >>= 1
+    return current == root
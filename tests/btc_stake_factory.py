@@ -0,0 +1,135 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from brownie import *
+from .btc_tx import TxIn, TxOut, BtcTransaction, build_batch
+from .constant import Utils
+from .delegate import LOCK_TIME, DEFAULT_SCRIPT_SIG, build_btc_stake_opreturn, build_btc_lst_stake_opreturn, \
+    random_btc_lock_script
+
+DEFAULT_GAS_LIMIT = 2000000
+CONFIRM_BATCH_SIZE = 500
+
+
+class StakeItem:
+    def __init__(self, raw_tx, tx_id, delegator, candidate, amount, lock_script, block_timestamp, lst=False):
+        self.raw_tx = raw_tx
+        self.tx_id = tx_id
+        self.delegator = delegator
+        self.candidate = candidate
+        self.amount = amount
+        self.lock_script = lock_script
+        self.block_timestamp = block_timestamp
+        self.lst = lst
+
+    def __repr__(self):
+        return f"StakeItem({self.tx_id}, {self.delegator}, {self.amount})"
+
+
+class NonceManager:
+    # hands out consecutive nonces per sender, starting from the pending nonce on chain
+    def __init__(self):
+        self.nonces = {}
+
+    def next_nonce(self, sender):
+        if sender not in self.nonces:
+            self.nonces[sender] = web3.eth.get_transaction_count(sender, 'pending')
+        nonce = self.nonces[sender]
+        self.nonces[sender] += 1
+        return nonce
+
+
+class BtcStakeFactory:
+    # builds N BitcoinStake/BitcoinLSTStake delegations in one pass, confirms all of
+    # their txids in BtcLightClientMock with a few bulk calls and submits the delegate
+    # transactions concurrently. each delegator submits its own transactions, so senders
+    # need no relayer registration and one sender's nonces never race another's
+    def __init__(self, lock_time=LOCK_TIME, stake_duration=Utils.MONTH, fee=1, chain_id=Utils.CHAIN_ID):
+        self.lock_time = lock_time
+        self.stake_duration = stake_duration
+        self.fee = fee
+        self.chain_id = chain_id
+        self.nonce_manager = NonceManager()
+
+    def make_stakes(self, count, candidates, delegators, amount_range=(10 ** 6, 10 ** 8)) -> list:
+        block_timestamp = self.lock_time - self.stake_duration * Utils.ROUND_INTERVAL
+        stakes = []
+        transactions = []
+        for _ in range(count):
+            candidate = random.choice(candidates)
+            delegator = random.choice(delegators)
+            amount = random.randint(*amount_range)
+            lock_script, pay_address, _ = random_btc_lock_script(self.lock_time)
+
+            op_return = build_btc_stake_opreturn(candidate, delegator, lock_script, self.chain_id, self.fee)
+            transactions.append(BtcTransaction(
+                [TxIn(random.randbytes(32), 0, DEFAULT_SCRIPT_SIG)],
+                [TxOut(amount, pay_address), op_return['tx_out']]
+            ))
+            stakes.append(StakeItem(None, None, delegator, candidate, amount, lock_script, block_timestamp))
+
+        return self.__fill_raw_txs(stakes, transactions)
+
+    def make_lst_stakes(self, count, delegators, lock_scripts, amount_range=(10 ** 6, 10 ** 8)) -> list:
+        # lock_scripts are wallets already added to BitcoinLSTStake
+        stakes = []
+        transactions = []
+        for _ in range(count):
+            delegator = random.choice(delegators)
+            amount = random.randint(*amount_range)
+            lock_script = random.choice(lock_scripts)
+
+            op_return = build_btc_lst_stake_opreturn(delegator, self.fee, chain_id=self.chain_id)
+            transactions.append(BtcTransaction(
+                [TxIn(random.randbytes(32), 0, DEFAULT_SCRIPT_SIG)],
+                [TxOut(amount, lock_script), op_return['tx_out']]
+            ))
+            stakes.append(StakeItem(None, None, delegator, None, amount, lock_script, 0, lst=True))
+
+        return self.__fill_raw_txs(stakes, transactions)
+
+    def confirm(self, stakes, batch_size=CONFIRM_BATCH_SIZE):
+        # the mock only needs a non zero timestamp for LST txids
+        for i in range(0, len(stakes), batch_size):
+            batch = stakes[i:i + batch_size]
+            BtcLightClientMock[0].setTxConfirmations(
+                [stake.tx_id for stake in batch],
+                [max(stake.block_timestamp, 1) for stake in batch]
+            )
+
+    def submit(self, stakes, max_workers=8, gas_limit=DEFAULT_GAS_LIMIT) -> list:
+        # nonces are assigned up front in stake order, then the transactions are sent
+        # from a thread pool; returns the receipts in stake order
+        gas_price = web3.eth.gas_price
+        requests = []
+        for stake in stakes:
+            contract = BitcoinLSTStakeMock[0] if stake.lst else BitcoinStakeMock[0]
+            data = contract.delegate.encode_input('0x' + stake.raw_tx, 1, [], 0, '0x' + stake.lock_script)
+            sender = str(stake.delegator)
+            requests.append({
+                'from': sender,
+                'to': contract.address,
+                'data': data,
+                'gas': gas_limit,
+                'gasPrice': gas_price,
+                'nonce': self.nonce_manager.next_nonce(sender)
+            })
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tx_hashes = list(executor.map(web3.eth.send_transaction, requests))
+            receipts = list(executor.map(web3.eth.wait_for_transaction_receipt, tx_hashes))
+
+        return receipts
+
+    def delegate(self, stakes, max_workers=8) -> list:
+        self.confirm(stakes)
+        receipts = self.submit(stakes, max_workers)
+        failed = [stake for stake, receipt in zip(stakes, receipts) if receipt['status'] != 1]
+        assert len(failed) == 0, f"{len(failed)} delegations failed, first {failed[0]}"
+        return receipts
+
+    @staticmethod
+    def __fill_raw_txs(stakes, transactions):
+        for stake, (raw_tx, tx_id) in zip(stakes, build_batch(transactions)):
+            stake.raw_tx = raw_tx
+            stake.tx_id = tx_id
+        return stakes
@@ -0,0 +1,358 @@
+import hashlib
+import struct
+from abc import ABC, abstractmethod
+from web3 import Web3
+from .btc_merkle import double_sha256
+from .btc_tx import to_bytes
+
+BTC_STAKE_MAGIC = 0x5341542b
+BTC_STAKE_VERSION = 1
+BTCLST_STAKE_VERSION = 2
+ROUND_INTERVAL = 86400
+ZERO_ADDRESS = '0x' + '00' * 20
+
+# revert reasons of BitcoinStake.delegate/BitcoinLSTStake.delegate and the BitcoinHelper parsers
+REVERT_INVALID_REDEEM_SCRIPT = "not a valid redeem script"
+REVERT_ALREADY_DELEGATED = "btc tx is already delegated."
+REVERT_INSUFFICIENT_ROUNDS = "insufficient locking rounds"
+REVERT_INVALID_TX = "BitcoinHelper: invalid tx"
+REVERT_INVALID_OPRETURN = "BitcoinHelper: invalid opreturn"
+REVERT_PAYLOAD_TOO_SMALL = "payload length is too small"
+REVERT_WRONG_MAGIC = "wrong magic"
+REVERT_WRONG_CHAIN_ID = "wrong chain id"
+REVERT_WRONG_VERSION = "unsupported sat+ version in btc staking"
+REVERT_ZERO_VALUE = "staked value is zero"
+REVERT_NO_OPRETURN = "no opreturn"
+REVERT_WALLET_NOT_FOUND = "Wallet not found"
+REVERT_WALLET_INACTIVE = "wallet inactive"
+REVERT_FROM_WALLET = "should not delegate from whitelisted multisig wallets"
+REVERT_AMOUNT_TOO_SMALL = "btc amount is too small"
+REVERT_INDEX_OUT_OF_RANGE = "Index out of range"
+# TypedMemView overruns and non-minimal var ints revert with messages that embed memory
+# offsets, they are all reported under this reason
+REVERT_MALFORMED_TX = "malformed tx"
+
+
+class StakeRevert(Exception):
+    pass
+
+
+class StakeCheck:
+    def __init__(self, tx_id, amount=0, output_index=0, delegator=None, candidate=None, lock_time=0, error=None):
+        self.tx_id = tx_id
+        self.amount = amount
+        self.output_index = output_index
+        self.delegator = delegator
+        self.candidate = candidate
+        self.lock_time = lock_time
+        self.error = error
+
+    @property
+    def valid(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"StakeCheck({self.tx_id}, error={self.error!r})"
+        return f"StakeCheck({self.tx_id}, {self.amount}, {self.output_index}, {self.delegator})"
+
+
+def index_uint(view: memoryview, offset: int, size: int) -> int:
+    # big endian TypedMemView.indexUint, reverts on overrun
+    if offset + size > len(view):
+        raise StakeRevert(REVERT_MALFORMED_TX)
+    return int.from_bytes(view[offset:offset + size], 'big')
+
+
+def index_compact_int(view: memoryview, offset: int) -> int:
+    # mirror of BitcoinHelper.indexCompactInt, non-minimal encodings revert
+    flag = index_uint(view, offset, 1)
+    if flag <= 0xfc:
+        return flag
+    size = {0xfd: 2, 0xfe: 4, 0xff: 8}[flag]
+    if offset + 1 + size > len(view):
+        raise StakeRevert(REVERT_MALFORMED_TX)
+    number = int.from_bytes(view[offset + 1:offset + 1 + size], 'little')
+    if compact_int_length(number) != size + 1:
+        raise StakeRevert(REVERT_MALFORMED_TX)
+    return number
+
+
+def compact_int_length(number: int) -> int:
+    if number <= 0xfc:
+        return 1
+    if number <= 0xffff:
+        return 3
+    if number <= 0xffffffff:
+        return 5
+    return 9
+
+
+def input_length(view: memoryview, offset: int) -> int:
+    script_length = index_compact_int(view, offset + 36)
+    return compact_int_length(script_length) + script_length + 36 + 4
+
+
+def output_length(view: memoryview, offset: int) -> int:
+    script_length = index_compact_int(view, offset + 8)
+    return compact_int_length(script_length) + script_length + 8
+
+
+def _list_length(view: memoryview, offset: int, item_length) -> int:
+    # mirror of BitcoinHelper.getVinLength/getVoutLength over view[offset:], including
+    # their quirk of reporting 0 for an empty list or a list running past the end
+    if offset >= len(view):
+        return 0
+    count = index_compact_int(view, offset)
+    if count == 0:
+        return 0
+
+    length = compact_int_length(count)
+    for _ in range(count):
+        if offset + length >= len(view):
+            return 0
+        length += item_length(view, offset + length)
+    return length
+
+
+def extract_tx(view: memoryview):
+    # mirror of BitcoinHelper.extractTx, returns (version, vin view, vout view, lock time).
+    # the vin/vout views share the memory of the tx, nothing is copied
+    if len(view) < 4:
+        raise StakeRevert(REVERT_MALFORMED_TX)
+    version = struct.unpack_from('<I', view, 0)[0]
+    offset = 4
+
+    vin_length = _list_length(view, offset, input_length)
+    vin = view[offset:offset + vin_length]
+    offset += vin_length
+
+    vout_length = _list_length(view, offset, output_length)
+    vout = view[offset:offset + vout_length]
+    offset += vout_length
+
+    if offset + 4 > len(view) or len(vin) != vin_length or len(vout) != vout_length:
+        raise StakeRevert(REVERT_MALFORMED_TX)
+    lock_time = struct.unpack_from('<I', view, offset)[0]
+    if offset + 4 != len(view):
+        raise StakeRevert(REVERT_INVALID_TX)
+    return version, vin, vout, lock_time
+
+
+def iter_outpoints(vin: memoryview):
+    # (outpoint hash, outpoint index) of every input, the hash in internal byte order
+    count = index_compact_int(vin, 0)
+    offset = compact_int_length(count)
+    for _ in range(count):
+        length = input_length(vin, offset)
+        if offset + length > len(vin):
+            raise StakeRevert(REVERT_MALFORMED_TX)
+        yield bytes(vin[offset:offset + 32]), struct.unpack_from('<I', vin, offset + 32)[0]
+        offset += length
+
+
+def iter_outputs(vout: memoryview):
+    # (index, value, script pubkey, script pubkey with its length prefix) of every output
+    count = index_compact_int(vout, 0)
+    offset = compact_int_length(count)
+    for index in range(count):
+        script_length = index_compact_int(vout, offset + 8)
+        length = compact_int_length(script_length) + script_length + 8
+        if offset + length > len(vout):
+            raise StakeRevert(REVERT_MALFORMED_TX)
+        value = struct.unpack_from('<Q', vout, offset)[0]
+        yield index, value, vout[offset + length - script_length:offset + length], vout[offset + 8:offset + length]
+        offset += length
+
+
+def op_return_payload(script_with_length: memoryview):
+    # mirror of BitcoinHelper.opReturnPayload, None when the output is not an op_return
+    body_length = index_compact_int(script_with_length, 0)
+    if index_uint(script_with_length, 1, 1) != 0x6a:
+        return None
+
+    if index_uint(script_with_length, 2, 1) == 0x4c:
+        payload_length = index_uint(script_with_length, 3, 1)
+        if payload_length != body_length - 3 or not 79 <= body_length <= 83:
+            raise StakeRevert(REVERT_INVALID_OPRETURN)
+        payload = script_with_length[4:4 + payload_length]
+    else:
+        payload_length = index_uint(script_with_length, 2, 1)
+        if payload_length != body_length - 2 or not 4 <= body_length <= 77:
+            raise StakeRevert(REVERT_INVALID_OPRETURN)
+        payload = script_with_length[3:3 + payload_length]
+
+    if len(payload) != payload_length:
+        raise StakeRevert(REVERT_MALFORMED_TX)
+    return payload
+
+
+def index_address(payload: memoryview, offset: int) -> str:
+    if offset + 20 > len(payload):
+        raise StakeRevert(REVERT_MALFORMED_TX)
+    return Web3.to_checksum_address(bytes(payload[offset:offset + 20]))
+
+
+def check_payload_header(payload: memoryview, min_length: int, chain_id: int, version: int):
+    if len(payload) < min_length:
+        raise StakeRevert(REVERT_PAYLOAD_TOO_SMALL)
+    if index_uint(payload, 0, 4) != BTC_STAKE_MAGIC:
+        raise StakeRevert(REVERT_WRONG_MAGIC)
+    if index_uint(payload, 5, 2) != chain_id:
+        raise StakeRevert(REVERT_WRONG_CHAIN_ID)
+    if index_uint(payload, 4, 1) != version:
+        raise StakeRevert(REVERT_WRONG_VERSION)
+
+
+def parse_btc_stake_payload(payload: memoryview, chain_id: int):
+    # mirror of BitcoinStake._parsePayloadAndCheckProtocol, returns (delegator, candidate)
+    check_payload_header(payload, 48, chain_id, BTC_STAKE_VERSION)
+    return index_address(payload, 7), index_address(payload, 27)
+
+
+def parse_btc_lst_stake_payload(payload: memoryview, chain_id: int):
+    # mirror of BitcoinLSTStake._parsePayloadAndCheckProtocol, returns the delegator
+    check_payload_header(payload, 28, chain_id, BTCLST_STAKE_VERSION)
+    return index_address(payload, 7)
+
+
+def parse_lock_time(script: bytes) -> int:
+    # mirror of BitcoinStake._parseLockTime, the 4 bytes after the leading push opcode
+    return int.from_bytes(script[1:5].ljust(4, b'\x00'), 'little')
+
+
+def _tx_view(raw_tx) -> memoryview:
+    if isinstance(raw_tx, memoryview):
+        return raw_tx
+    return memoryview(to_bytes(raw_tx))
+
+
+class StakeValidator(ABC):
+    # screens stake txs before they are relayed. the light client proof and the relayer
+    # check are left out, the contract state the checks depend on is passed in. txids
+    # are '0x' hex in internal byte order, the form BtcStakeFactory reports them in
+    def __init__(self, chain_id, delegated_tx_ids=None):
+        self.chain_id = chain_id
+        self.delegated_tx_ids = set() if delegated_tx_ids is None else delegated_tx_ids
+
+    def validate(self, raw_tx, script) -> StakeCheck:
+        return self.validate_view(_tx_view(raw_tx), to_bytes(script))
+
+    def validate_view(self, view: memoryview, script: bytes) -> StakeCheck:
+        tx_id = '0x' + double_sha256(view).hex()
+        try:
+            return self._check(view, script, tx_id)
+        except StakeRevert as e:
+            return StakeCheck(tx_id, error=str(e))
+
+    def validate_batch(self, txs: list) -> list:
+        # txs are (raw tx, redeem script) pairs, raw txs as hex, bytes or memoryview
+        return [self.validate(raw_tx, script) for raw_tx, script in txs]
+
+    def validate_buffer(self, buf, spans: list, scripts: list) -> list:
+        # validates the txs of a serialize_batch style buffer in place
+        view = memoryview(buf)
+        return [self.validate_view(view[start:end], to_bytes(script))
+                for (start, end), script in zip(spans, scripts)]
+
+    @abstractmethod
+    def _check(self, view: memoryview, script: bytes, tx_id: str) -> StakeCheck:
+        pass
+
+
+class BtcStakeValidator(StakeValidator):
+    # mirror of the checks BitcoinStake.delegate runs on a stake tx and its redeem script
+    def __init__(self, chain_id, round_tag=0, delegated_tx_ids=None):
+        super().__init__(chain_id, delegated_tx_ids)
+        self.round_tag = round_tag
+
+    def _check(self, view, script, tx_id):
+        if len(script) < 6:
+            raise StakeRevert(REVERT_INDEX_OUT_OF_RANGE)
+        if script[0] != 0x04 or script[5] != 0xb1:
+            raise StakeRevert(REVERT_INVALID_REDEEM_SCRIPT)
+        if tx_id in self.delegated_tx_ids:
+            raise StakeRevert(REVERT_ALREADY_DELEGATED)
+
+        lock_time = parse_lock_time(script)
+        if lock_time // ROUND_INTERVAL <= self.round_tag + 1:
+            raise StakeRevert(REVERT_INSUFFICIENT_ROUNDS)
+
+        amount, output_index, delegator, candidate = self.parse_vout(extract_tx(view)[2], script)
+        return StakeCheck(tx_id, amount, output_index, delegator, candidate, lock_time)
+
+    def parse_vout(self, vout: memoryview, script: bytes):
+        # mirror of BitcoinStake._parseVout, the last matching output and the last
+        # op_return win, like on chain
+        script_hash = hashlib.sha256(script).digest()
+        script_hash160 = hashlib.new('ripemd160', script_hash).digest()
+        amount = 0
+        output_index = 0
+        delegator = candidate = None
+        op_return = False
+        for index, value, script_pubkey, script_with_length in iter_outputs(vout):
+            payload = op_return_payload(script_with_length)
+            if payload is None:
+                if (len(script_pubkey) == 23 and script_pubkey[0] == 0xa9 and script_pubkey[1] == 0x14 and
+                        script_pubkey[22] == 0x87 and script_pubkey[2:22] == script_hash160) or \
+                        (len(script_pubkey) == 34 and script_pubkey[0] == 0 and script_pubkey[1] == 32 and
+                         script_pubkey[2:34] == script_hash):
+                    amount = value
+                    output_index = index
+            else:
+                delegator, candidate = parse_btc_stake_payload(payload, self.chain_id)
+                op_return = True
+
+        if amount == 0:
+            raise StakeRevert(REVERT_ZERO_VALUE)
+        if not op_return:
+            raise StakeRevert(REVERT_NO_OPRETURN)
+        return amount, output_index, delegator, candidate
+
+
+class BtcLstStakeValidator(StakeValidator):
+    # mirror of the checks BitcoinLSTStake.delegate runs on a stake tx. wallets maps the
+    # lock scripts added to BitcoinLSTStake to whether they are active, wallet_utxos holds
+    # the (txid bytes, output index) outpoints recorded for the multisig wallets
+    def __init__(self, chain_id, wallets: dict, utxo_fee=0, delegated_tx_ids=None, wallet_utxos=None):
+        super().__init__(chain_id, delegated_tx_ids)
+        self.wallets = {to_bytes(script): active for script, active in wallets.items()}
+        self.utxo_fee = utxo_fee
+        self.wallet_utxos = set() if wallet_utxos is None else wallet_utxos
+
+    def _check(self, view, script, tx_id):
+        if tx_id in self.delegated_tx_ids:
+            raise StakeRevert(REVERT_ALREADY_DELEGATED)
+        active = self.wallets.get(script)
+        if active is None:
+            raise StakeRevert(REVERT_WALLET_NOT_FOUND)
+        if not active:
+            raise StakeRevert(REVERT_WALLET_INACTIVE)
+
+        _, vin, vout, _ = extract_tx(view)
+        if any(outpoint in self.wallet_utxos for outpoint in iter_outpoints(vin)):
+            raise StakeRevert(REVERT_FROM_WALLET)
+
+        amount, output_index, delegator = self.parse_vout(vout, script)
+        if delegator != ZERO_ADDRESS and amount < self.utxo_fee * 2:
+            raise StakeRevert(REVERT_AMOUNT_TOO_SMALL)
+        return StakeCheck(tx_id, amount, output_index, delegator)
+
+    def parse_vout(self, vout: memoryview, script: bytes):
+        # mirror of BitcoinLSTStake._parseVout. a tx without op_return is accepted with
+        # the zero delegator, the contract records it without minting
+        amount = 0
+        output_index = 0
+        delegator = ZERO_ADDRESS
+        for index, value, script_pubkey, script_with_length in iter_outputs(vout):
+            payload = op_return_payload(script_with_length)
+            if payload is None:
+                if script_pubkey == script:
+                    amount = value
+                    output_index = index
+            else:
+                delegator = parse_btc_lst_stake_payload(payload, self.chain_id)
+
+        if amount == 0:
+            raise StakeRevert(REVERT_ZERO_VALUE)
+        return amount, output_index, delegator
@@ -0,0 +1,204 @@
+import struct
+from .btc_merkle import double_sha256
+
+SEGWIT_MARKER = 0x00
+SEGWIT_FLAG = 0x01
+DEFAULT_SEQUENCE = 0xffffffff
+
+
+def to_bytes(value) -> bytes:
+    # hex strings with or without 0x prefix, bytes-like values are taken as they are
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    return bytes(value)
+
+
+def write_varint(buf: bytearray, n: int):
+    if n < 0xfd:
+        buf.append(n)
+    elif n <= 0xffff:
+        buf.append(0xfd)
+        buf += struct.pack('<H', n)
+    elif n <= 0xffffffff:
+        buf.append(0xfe)
+        buf += struct.pack('<I', n)
+    else:
+        buf.append(0xff)
+        buf += struct.pack('<Q', n)
+
+
+def read_varint(view: memoryview, offset: int):
+    # returns (value, offset after the varint)
+    prefix = view[offset]
+    if prefix < 0xfd:
+        return prefix, offset + 1
+    if prefix == 0xfd:
+        return struct.unpack_from('<H', view, offset + 1)[0], offset + 3
+    if prefix == 0xfe:
+        return struct.unpack_from('<I', view, offset + 1)[0], offset + 5
+    return struct.unpack_from('<Q', view, offset + 1)[0], offset + 9
+
+
+def encode_varint(n: int) -> bytes:
+    buf = bytearray()
+    write_varint(buf, n)
+    return bytes(buf)
+
+
+class TxIn:
+    def __init__(self, prev_hash, vout=0, script_sig=b'', sequence=DEFAULT_SEQUENCE, witness=None):
+        # prev_hash is kept in serialized byte order, the order get_transaction_txid returns
+        self.prev_hash = to_bytes(prev_hash)
+        assert len(self.prev_hash) == 32, "prev tx hash must be 32 bytes"
+        self.vout = vout
+        self.script_sig = to_bytes(script_sig)
+        self.sequence = sequence
+        self.witness = [] if witness is None else [to_bytes(item) for item in witness]
+
+    def write(self, buf: bytearray):
+        buf += self.prev_hash
+        buf += struct.pack('<I', self.vout)
+        write_varint(buf, len(self.script_sig))
+        buf += self.script_sig
+        buf += struct.pack('<I', self.sequence)
+
+    def serialize(self) -> bytes:
+        buf = bytearray()
+        self.write(buf)
+        return bytes(buf)
+
+
+class TxOut:
+    def __init__(self, amount: int, script_pubkey):
+        self.amount = amount
+        self.script_pubkey = to_bytes(script_pubkey)
+
+    def write(self, buf: bytearray):
+        buf += struct.pack('<q', self.amount)
+        write_varint(buf, len(self.script_pubkey))
+        buf += self.script_pubkey
+
+    def serialize(self) -> bytes:
+        buf = bytearray()
+        self.write(buf)
+        return bytes(buf)
+
+
+class BtcTransaction:
+    def __init__(self, inputs=None, outputs=None, version=2, locktime=0):
+        self.inputs = [] if inputs is None else inputs
+        self.outputs = [] if outputs is None else outputs
+        self.version = version
+        self.locktime = locktime
+
+    def has_witness(self) -> bool:
+        return any(len(tx_in.witness) > 0 for tx_in in self.inputs)
+
+    def write(self, buf: bytearray, with_witness=True):
+        with_witness = with_witness and self.has_witness()
+        buf += struct.pack('<i', self.version)
+        if with_witness:
+            buf.append(SEGWIT_MARKER)
+            buf.append(SEGWIT_FLAG)
+
+        write_varint(buf, len(self.inputs))
+        for tx_in in self.inputs:
+            tx_in.write(buf)
+        write_varint(buf, len(self.outputs))
+        for tx_out in self.outputs:
+            tx_out.write(buf)
+
+        if with_witness:
+            for tx_in in self.inputs:
+                write_varint(buf, len(tx_in.witness))
+                for item in tx_in.witness:
+                    write_varint(buf, len(item))
+                    buf += item
+
+        buf += struct.pack('<I', self.locktime)
+
+    def serialize(self, with_witness=True) -> bytes:
+        buf = bytearray()
+        self.write(buf, with_witness)
+        return bytes(buf)
+
+    def to_hex(self, with_witness=True) -> str:
+        return self.serialize(with_witness).hex()
+
+    @property
+    def txid(self) -> bytes:
+        # double sha256 of the non-witness serialization, not reversed,
+        # the same value as utils.get_transaction_txid
+        return double_sha256(self.serialize(with_witness=False))
+
+    @classmethod
+    def deserialize(cls, data):
+        data = to_bytes(data)
+        tx, offset = cls.read(memoryview(data), 0)
+        assert offset == len(data), "trailing bytes after tx"
+        return tx
+
+    @classmethod
+    def read(cls, view: memoryview, offset: int):
+        # returns (tx, offset after the tx)
+        version = struct.unpack_from('<i', view, offset)[0]
+        offset += 4
+
+        with_witness = view[offset] == SEGWIT_MARKER and view[offset + 1] == SEGWIT_FLAG
+        if with_witness:
+            offset += 2
+
+        input_count, offset = read_varint(view, offset)
+        inputs = []
+        for _ in range(input_count):
+            prev_hash = bytes(view[offset:offset + 32])
+            vout = struct.unpack_from('<I', view, offset + 32)[0]
+            script_size, offset = read_varint(view, offset + 36)
+            script_sig = bytes(view[offset:offset + script_size])
+            offset += script_size
+            sequence = struct.unpack_from('<I', view, offset)[0]
+            offset += 4
+            inputs.append(TxIn(prev_hash, vout, script_sig, sequence))
+
+        output_count, offset = read_varint(view, offset)
+        outputs = []
+        for _ in range(output_count):
+            amount = struct.unpack_from('<q', view, offset)[0]
+            script_size, offset = read_varint(view, offset + 8)
+            outputs.append(TxOut(amount, bytes(view[offset:offset + script_size])))
+            offset += script_size
+
+        if with_witness:
+            for tx_in in inputs:
+                item_count, offset = read_varint(view, offset)
+                for _ in range(item_count):
+                    item_size, offset = read_varint(view, offset)
+                    tx_in.witness.append(bytes(view[offset:offset + item_size]))
+                    offset += item_size
+
+        locktime = struct.unpack_from('<I', view, offset)[0]
+        return cls(inputs, outputs, version, locktime), offset + 4
+
+
+def strip_witness(raw_tx) -> bytes:
+    # the non-witness serialization of a raw tx, the form the staking contracts parse
+    return BtcTransaction.deserialize(raw_tx).serialize(with_witness=False)
+
+
+def serialize_batch(transactions: list, with_witness=True):
+    # serializes many transactions into one buffer, returns the buffer and the
+    # (start, end) span of every transaction in it
+    buf = bytearray()
+    spans = []
+    for tx in transactions:
+        start = len(buf)
+        tx.write(buf, with_witness)
+        spans.append((start, len(buf)))
+    return bytes(buf), spans
+
+
+def build_batch(transactions: list):
+    # returns [(raw tx hex, '0x' txid)] for the transactions, the form the tests submit them in
+    buf, spans = serialize_batch(transactions, with_witness=False)
+    view = memoryview(buf)
+    return [(view[start:end].hex(), '0x' + double_sha256(view[start:end]).hex()) for start, end in spans]
@@ -2,6 +2,7 @@ from collections import defaultdict
 from copy import copy
 
 from tests.constant import *
+from tests.grade_table import GradeTable
 from tests.utils import get_asset_weight
 
 
@@ -21,6 +22,9 @@ class Discount:
         5000: 6000,
         0: 1000
     }
+    # lookup tables of the rates above, built once
+    tlp_table = GradeTable(tlp_rates)
+    lp_table = GradeTable(lp_rates)
     percentage = 5000
     state_map = {}
 
@@ -46,23 +50,14 @@ def set_btc_lst_delegate(delegate_amount, redeem_amount=0):
 
 
 def get_tlp_rate(day):
-    rate = Utils.DENOMINATOR
     months = day // 30
-    for i in Discount.tlp_rates:
-        if months >= i:
-            rate = Discount.tlp_rates[i]
-            break
-
+    rate = Discount.tlp_table.lookup(months, default=Utils.DENOMINATOR)
     return months, rate
 
 
 def get_lp_rate(coin_amount, asset_amount, asset):
-    discount = Utils.DENOMINATOR
     level = (coin_amount * get_asset_weight(asset)) // (asset_amount * get_asset_weight('coin'))
-    for l in Discount.lp_rates:
-        if level >= l:
-            discount = Discount.lp_rates[l]
-            break
+    discount = Discount.lp_table.lookup(level, default=Utils.DENOMINATOR)
     return level, discount
 
 
@@ -82,6 +82,12 @@ def stake_hub_claim_reward(account):
     return tx
 
 
+def get_paid_float_reward(tx, float_reserve):
+    # extra rewards beyond surplus paid by a claim, from the float reserve first and then from SystemReward
+    refill = tx.events['rewardTo']['amount'] if 'rewardTo' in tx.events else 0
+    return float_reserve + refill - StakeHubMock[0].floatReserve()
+
+
 def claim_stake_and_relay_reward(account):
     tx0 = None
     if isinstance(account, list):
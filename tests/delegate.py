@@ -2,6 +2,7 @@ import time
 
 from tests.common import get_current_round, stake_hub_claim_reward
 from tests.utils import *
+from tests.btc_tx import TxIn, TxOut, BtcTransaction, encode_varint
 from brownie import *
 
 LOCK_TIME = 1736956800
@@ -41,17 +42,16 @@ def build_btc_lst_stake_opreturn(delegator, fee=1, version=2, chain_id=1112, mag
     if len(message) // 2 > 76:
         op_return += remove_0x(hex(Opcode.OP_PUSHDATA1))
     op_return = op_return + message_length + message
-    op_return_length = remove_0x(hex(len(op_return) // 2))
-    btc_value = btc_value_2hex(0)
-    op_return = btc_value + op_return_length + op_return
+    tx_out = TxOut(0, op_return)
     op_return_info = {
         'magic': magic,
         'version': version_hex,
         'chain_id': chain_id_hex,
         'delegator': delegator,
         'fee': fee_hex,
-        'value_hex': btc_value,
-        'hex_value': op_return,
+        'value_hex': btc_value_2hex(0),
+        'tx_out': tx_out,
+        'hex_value': tx_out.serialize().hex(),
         'message': message
     }
     return op_return_info
@@ -77,9 +77,7 @@ def build_btc_stake_opreturn(agent_address, delegate_address, lock_data, chain_i
     if len(message) // 2 > 76:
         op_return += remove_0x(hex(Opcode.OP_PUSHDATA1))
     op_return = op_return + message_length + message
-    op_return_length = remove_0x(hex(len(op_return) // 2))
-    btc_value = btc_value_2hex(0)
-    op_return = btc_value + op_return_length + op_return
+    tx_out = TxOut(0, op_return)
     opreturn_info = {
         'flag_hex': flag_hex,
         'version_hex': version_hex,
@@ -88,74 +86,64 @@ def build_btc_stake_opreturn(agent_address, delegate_address, lock_data, chain_i
         'agent_address_hex': agent_address_hex,
         'core_fee_hex': core_fee_hex,
         'op_return_data': op_return_data,
-        'hex_value': op_return,
+        'tx_out': tx_out,
+        'hex_value': tx_out.serialize().hex(),
         'message': message
     }
     return opreturn_info
 
 
-def build_input(txid=None, vout=0, scriptsigsize='6a', scriptsig=None, sequence='ffffffff'):
+DEFAULT_SCRIPT_SIG = '473044022046e23b8f6b749a15b0571848fe2b86bfbe7e158b23f37fb0335be0a71f48a5dd022076640b2d39659c26224c9e67101b34e1394a38ff08a4bdd88d7503f63e54adc5012103b3e19c8169b81d15ec21f9d0f3ed4b2f18c7c9e1149ce5f7ddebed7732724b9f'
+
+
+def build_input(txid=None, vout=0, scriptsigsize=None, scriptsig=None, sequence='ffffffff'):
+    # scriptsigsize is derived from scriptsig, the argument is kept for existing callers
     if txid is None:
         txid = random_btc_tx_id()
     if scriptsig is None:
-        scriptsig = '473044022046e23b8f6b749a15b0571848fe2b86bfbe7e158b23f37fb0335be0a71f48a5dd022076640b2d39659c26224c9e67101b34e1394a38ff08a4bdd88d7503f63e54adc5012103b3e19c8169b81d15ec21f9d0f3ed4b2f18c7c9e1149ce5f7ddebed7732724b9f'
-    txid = remove_0x(txid)
-    vout = format_number(vout)
+        scriptsig = DEFAULT_SCRIPT_SIG
+    tx_in = TxIn(txid, vout, scriptsig, int.from_bytes(bytes.fromhex(sequence), 'little'))
     input_info = {
-        'txid': txid,
+        'txid': tx_in.prev_hash.hex(),
         'vout': vout,
-        'scriptsigsize': scriptsigsize,
-        'scriptsig': scriptsig,
+        'scriptsigsize': encode_varint(len(tx_in.script_sig)).hex(),
+        'scriptsig': tx_in.script_sig.hex(),
         'sequence': sequence,
-        'hex_value': txid + vout + scriptsigsize + scriptsig + sequence
+        'tx_in': tx_in,
+        'hex_value': tx_in.serialize().hex()
     }
     return input_info
 
 
 def build_output(amount, script_pub_key):
-    script_pub_key = remove_0x(script_pub_key)
-    scriptpubkeysize = value2hex(len(script_pub_key) // 2)
+    tx_out = TxOut(amount, script_pub_key)
     output_info = {
         'amount': btc_value_2hex(amount),
-        'scriptpubkeysize': scriptpubkeysize,
-        'scriptpubkey': script_pub_key,
-        'hex_value': btc_value_2hex(amount) + scriptpubkeysize + script_pub_key
+        'scriptpubkeysize': encode_varint(len(tx_out.script_pubkey)).hex(),
+        'scriptpubkey': tx_out.script_pubkey.hex(),
+        'tx_out': tx_out,
+        'hex_value': tx_out.serialize().hex()
     }
     return output_info
 
 
 def generate_btc_transaction_info(btc_tx_info, inputs=None, outputs=None):
-    btc_tx_info['version'] = '02000000'
-    btc_tx_info['inputcount'] = f'0{len(inputs)}'
-    btc_tx_info['inputs'] = []
-    # btc_tx_info['outputcount'] = f'0{len(outputs)}'
-    output_count = hex(len(outputs)).replace('0x', '')
-    if len(output_count) == 1:
-        output_count = f'0{output_count}'
-    btc_tx_info['outputcount'] = f'{output_count}'
-    btc_tx_info['outputs'] = []
-    btc_tx_info['inputs'] = []
-    outputs_list = btc_tx_info['outputs']
-    inputs_list = btc_tx_info['inputs']
-    for i in inputs:
-        inputs_list.append(i)
-    for i in outputs:
-        outputs_list.append(i)
-    btc_tx_info['locktime'] = '00000000'
+    if inputs is None:
+        inputs = []
+    if outputs is None:
+        outputs = []
+    tx = BtcTransaction([i['tx_in'] for i in inputs], [o['tx_out'] for o in outputs])
+    btc_tx_info['tx'] = tx
+    btc_tx_info['version'] = tx.version.to_bytes(4, 'little').hex()
+    btc_tx_info['inputcount'] = encode_varint(len(inputs)).hex()
+    btc_tx_info['outputcount'] = encode_varint(len(outputs)).hex()
+    btc_tx_info['inputs'] = list(inputs)
+    btc_tx_info['outputs'] = list(outputs)
+    btc_tx_info['locktime'] = tx.locktime.to_bytes(4, 'little').hex()
 
 
 def build_btc_transaction(btc_tx_info):
-    btc_tx = btc_tx_info['version']
-    btc_tx += btc_tx_info['inputcount']
-    inputs = btc_tx_info['inputs']
-    outputs = btc_tx_info['outputs']
-    for input in inputs:
-        btc_tx += input['hex_value']
-    btc_tx += btc_tx_info['outputcount']
-    for output in outputs:
-        btc_tx += output['hex_value']
-    btc_tx += btc_tx_info['locktime']
-    return btc_tx
+    return btc_tx_info['tx'].to_hex()
 
 
 def build_btc_lst_tx(delegator, amount, pay_address, input_tx_id=None, vout=0, fee=1, version=2,
@@ -566,18 +554,9 @@ class BtcStake:
         for output in outputs[1:]:
             self.btc_stake_build_output(*output)
         generate_btc_transaction_info(self.btc_tx_info, self.inputs, self.outputs)
-        btc_tx = self.btc_tx_info['version']
-        btc_tx += self.btc_tx_info['inputcount']
-        inputs = self.btc_tx_info['inputs']
-        outputs = self.btc_tx_info['outputs']
-        for input in inputs:
-            btc_tx += input['hex_value']
-        btc_tx += self.btc_tx_info['outputcount']
-        for output in outputs:
-            btc_tx += output['hex_value']
-        btc_tx += self.btc_tx_info['locktime']
-        self.tx_id = get_transaction_txid(btc_tx)
-        return btc_tx
+        tx = self.btc_tx_info['tx']
+        self.tx_id = '0x' + tx.txid.hex()
+        return tx.to_hex()
 
     def build_btc_lst(self, outputs, inputs=None, opreturn=None):
         if inputs is None:
@@ -596,18 +575,9 @@ class BtcStake:
         for output in outputs[1:]:
             self.btc_stake_build_output(*output)
         generate_btc_transaction_info(self.btc_tx_info, self.inputs, self.outputs)
-        btc_tx = self.btc_tx_info['version']
-        btc_tx += self.btc_tx_info['inputcount']
-        inputs = self.btc_tx_info['inputs']
-        outputs = self.btc_tx_info['outputs']
-        for input in inputs:
-            btc_tx += input['hex_value']
-        btc_tx += self.btc_tx_info['outputcount']
-        for output in outputs:
-            btc_tx += output['hex_value']
-        btc_tx += self.btc_tx_info['locktime']
-        self.tx_id = get_transaction_txid(btc_tx)
-        return btc_tx
+        tx = self.btc_tx_info['tx']
+        self.tx_id = '0x' + tx.txid.hex()
+        return tx.to_hex()
 
 
 def random_btc_lst_lock_script():
@@ -619,10 +589,12 @@ def random_btc_lst_lock_script():
     return script
 
 
-def random_btc_lock_script():
+def random_btc_lock_script(lock_time=None):
     private_key = generate_private_key()
     private_key_hex = get_public_key(private_key)
-    timestamp = random.randint(int(time.time()), int(time.time()) + 1000000)
+    timestamp = lock_time
+    if timestamp is None:
+        timestamp = random.randint(int(time.time()), int(time.time()) + 1000000)
     scrip_type = random.choice(['hash', 'key'])
     lock_script_type = random.choice(['p2sh', 'p2wsh'])
     script, pay_address = BtcScript().k2_btc_script(private_key_hex, timestamp, scrip_type, lock_script_type)
@@ -0,0 +1,41 @@
+from bisect import bisect_right
+
+# upper bound of the grade tables exercised by the tests, governance only bounds the
+# thresholds and percentages so tables of this size stay well within them
+MAX_GRADE_COUNT = 100
+
+
+class GradeTable:
+    # (threshold, percentage) grades sorted by threshold, a value falls in the highest
+    # grade whose threshold it reaches. mirrors the binary search of BitcoinAgent stake
+    # rate grades and BitcoinStake lock duration grades
+    def __init__(self, grades):
+        if isinstance(grades, dict):
+            grades = grades.items()
+        grades = sorted((int(threshold), int(percentage)) for threshold, percentage in grades)
+        self.thresholds = [threshold for threshold, _ in grades]
+        self.percentages = [percentage for _, percentage in grades]
+
+    def __len__(self):
+        return len(self.thresholds)
+
+    def lookup(self, value, default=None):
+        # values below every threshold take the lowest grade on chain, default when given
+        assert len(self.thresholds) > 0, "Empty grade table"
+        index = bisect_right(self.thresholds, value)
+        if index == 0:
+            return self.percentages[0] if default is None else default
+        return self.percentages[index - 1]
+
+
+def build_grades(count, step, percentage_step):
+    # strictly increasing thresholds from zero and percentages, the shape governance accepts
+    return [[i * step, (i + 1) * percentage_step] for i in range(count)]
+
+
+def get_probe_values(table: GradeTable, upper: int) -> list:
+    # zero, both sides of every threshold and the upper bound
+    values = {0, upper}
+    for threshold in table.thresholds:
+        values.update(v for v in (threshold - 1, threshold, threshold + 1) if 0 <= v <= upper)
+    return sorted(values)
@@ -0,0 +1,203 @@
+import os
+import random
+import sqlite3
+import time
+from .scenario_generator import ScenarioGenerator
+from .scenario import JSONL_EXT
+from .account_mgr import AccountMgr
+from . import key_pool
+from . import taproot
+from . import constants
+
+
+################ campaign shape ##################
+class ScenarioShape:
+    def __init__(self, seed, start_round, stop_round, candidate_count, delegator_count, task_probabilities):
+        self.seed = seed
+        self.start_round = start_round
+        self.stop_round = stop_round
+        self.candidate_count = candidate_count
+        self.delegator_count = delegator_count
+        self.task_probabilities = task_probabilities
+
+    def __repr__(self):
+        return f"(seed={self.seed}, rounds={self.start_round}~{self.stop_round}, " \
+               f"candidates={self.candidate_count}, delegators={self.delegator_count})"
+
+
+class ShapeDistribution:
+    # every shape parameter is drawn from a random stream seeded with the campaign seed,
+    # so a seed alone is enough to rebuild the shape and the generated scenario
+    def __init__(self):
+        self.round_count_range = (10, 50)
+        self.candidate_count_range = (1, constants.OPERATOR_ADDR_COUNT)
+        self.delegator_count_range = (1, constants.DELEGATOR_ADDR_COUNT)
+
+        # task name => (min probability, max probability), tasks not listed keep
+        # the defaults from DataCenter.init_random_task_probabilities
+        self.task_probability_ranges = {}
+
+    def set_round_count_range(self, min_count, max_count):
+        assert 0 < min_count <= max_count
+        self.round_count_range = (min_count, max_count)
+
+    def set_candidate_count_range(self, min_count, max_count):
+        assert 0 < min_count <= max_count <= constants.OPERATOR_ADDR_COUNT
+        self.candidate_count_range = (min_count, max_count)
+
+    def set_delegator_count_range(self, min_count, max_count):
+        assert 0 < min_count <= max_count <= constants.DELEGATOR_ADDR_COUNT
+        self.delegator_count_range = (min_count, max_count)
+
+    def set_task_probability_range(self, task_name, min_probability, max_probability):
+        assert 0 <= min_probability <= max_probability <= constants.PROBABILITY_DECIMALS
+        self.task_probability_ranges[task_name] = (min_probability, max_probability)
+
+    def draw(self, seed):
+        shape_rng = random.Random(seed)
+
+        start_round = constants.MIN_ROUND
+        stop_round = start_round + shape_rng.randint(*self.round_count_range)
+        candidate_count = shape_rng.randint(*self.candidate_count_range)
+        delegator_count = shape_rng.randint(*self.delegator_count_range)
+
+        task_probabilities = {}
+        for task_name in sorted(self.task_probability_ranges.keys()):
+            task_probabilities[task_name] = shape_rng.randint(*self.task_probability_ranges[task_name])
+
+        return ScenarioShape(seed, start_round, stop_round, candidate_count, delegator_count, task_probabilities)
+
+############## end campaign shape ################
+
+
+############### campaign results #################
+class CampaignResults:
+    # one row per seed; sqlite serializes the writes of concurrent workers
+    # that share the same database file
+    OUTCOME_PASSED = "passed"
+    OUTCOME_FAILED = "failed"
+
+    __TIMEOUT_SECONDS = 60
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        with self.__connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "seed INTEGER PRIMARY KEY, "
+                "start_round INTEGER, "
+                "stop_round INTEGER, "
+                "candidate_count INTEGER, "
+                "delegator_count INTEGER, "
+                "outcome TEXT, "
+                "error TEXT, "
+                "runtime REAL, "
+                "task_count INTEGER, "
+                "scenario_file TEXT)"
+            )
+
+    def record(self, shape, outcome, runtime, task_count, error=None, scenario_file=None):
+        with self.__connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    shape.seed,
+                    shape.start_round,
+                    shape.stop_round,
+                    shape.candidate_count,
+                    shape.delegator_count,
+                    outcome,
+                    error,
+                    runtime,
+                    task_count,
+                    scenario_file
+                )
+            )
+
+    def get_failed_seeds(self):
+        with self.__connect() as conn:
+            rows = conn.execute(
+                "SELECT seed FROM results WHERE outcome = ? ORDER BY seed",
+                (CampaignResults.OUTCOME_FAILED,)
+            ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def __connect(self):
+        return sqlite3.connect(self.db_file, timeout=CampaignResults.__TIMEOUT_SECONDS)
+
+############# end campaign results ###############
+
+
+################ campaign runner #################
+def make_failed_seed_file_path(failed_dir, shape):
+    file_name = f"seed_{shape.seed}_{shape.start_round}_{shape.stop_round}_" \
+                f"{shape.candidate_count}_{shape.delegator_count}_error{JSONL_EXT}"
+    return os.path.join(failed_dir, file_name)
+
+
+def init_seed_state(seed, key_cache_dir=None):
+    # the global random stream drives the execution side (account names, tx fees),
+    # the generator has its own stream, both are seeded so that the run replays.
+    # BTC payment keys come from a key pool seeded the same way
+    random.seed(seed)
+    AccountMgr.init_account_mgr()
+    key_pool.init_key_pool(seed, key_cache_dir)
+    taproot.template_pool.reset()
+
+
+def run_seed(seed, distribution, results, failed_dir, pipeline_depth=0, key_cache_dir=None):
+    shape = distribution.draw(seed)
+    init_seed_state(seed, key_cache_dir)
+    try:
+        return run_shape(shape, results, failed_dir, pipeline_depth)
+    finally:
+        key_pool.close_key_pool()
+
+
+def generate_shape(shape, pipeline_depth=0):
+    # generation only reads the chain while the data center is created, so the
+    # scenario is the same for any pipeline_depth
+    generator = ScenarioGenerator()
+    scenario = generator.generate(
+        shape.start_round,
+        shape.stop_round,
+        shape.candidate_count,
+        shape.delegator_count,
+        lazy=True,
+        pipeline_depth=pipeline_depth,
+        seed=shape.seed,
+        task_probabilities=shape.task_probabilities
+    )
+
+    # the journal carries the seed for the shrinker
+    scenario.set_seed(shape.seed)
+    return scenario
+
+
+def run_shape(shape, results, failed_dir, pipeline_depth=0):
+    scenario = generate_shape(shape, pipeline_depth)
+
+    # only the journal of a failed run is kept
+    file_path = make_failed_seed_file_path(failed_dir, shape)
+    start_time = time.time()
+    try:
+        scenario.execute(journal_file=file_path)
+    except Exception as e:
+        runtime = time.time() - start_time
+        results.record(
+            shape,
+            CampaignResults.OUTCOME_FAILED,
+            runtime,
+            scenario.get_task_count(),
+            error=f"{e.__class__.__name__}: {e}",
+            scenario_file=file_path
+        )
+        return False, shape
+
+    runtime = time.time() - start_time
+    os.remove(file_path)
+    results.record(shape, CampaignResults.OUTCOME_PASSED, runtime, scenario.get_task_count())
+    return True, shape
+
+############## end campaign runner ###############
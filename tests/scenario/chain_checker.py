@@ -461,6 +461,10 @@ class ChainChecker:
             assert_result("amount", amount, amount_on_chain)
 
     def check_total_unclaimed_reward(self):
+        float_reserve = self.chain.get_float_reserve()
+        float_reserve_on_chain = self.chain.get_float_reserve_on_chain()
+        assert_result("float_reserve", float_reserve, float_reserve_on_chain)
+
         unclaim_reward = self.chain.get_total_unclaimed_reward()
         unclaim_reward_on_chain = self.chain.get_total_unclaimed_reward_on_chain()
 
@@ -142,7 +142,9 @@ class ChainHandler:
         # print(f"distribute_reward_to_stake_hub {remain_reward}")
 
         burn_amount = 0
+        btc_reward = 0
         assets = self.chain.get_assets()
+        btc_asset = self.chain.get_btc_asset()
         validators = self.chain.get_validators()
         round = self.chain.get_round()
         for asset in assets:
@@ -166,6 +168,8 @@ class ChainHandler:
                 # set reward for each asset
                 validator.get_stake_state().set_reward(asset.get_name(), asset_reward)
                 self.chain.add_total_income(-asset_reward)
+                if asset is btc_asset:
+                    btc_reward += asset_reward
 
             # # update asset subsidy
             # asset_bonus = self.chain.get_total_unclaimed_reward() * asset.get_bonus_rate() // constants.PERCENT_DECIMALS
@@ -185,6 +189,22 @@ class ChainHandler:
 
         self.chain.add_balance(StakeHubMock[0], remain_reward - burn_amount)
         self.chain.pay_to_system_reward(burn_amount)
+        self.refill_float_reserve(btc_reward)
+
+    def refill_float_reserve(self, btc_reward):
+        # the float reserve is refilled to the most extra rewards grading can pay on the round's BTC rewards
+        percentage = self.chain.get_delegator_stake_state().get_max_grade_percentage()
+        if percentage <= constants.PERCENT_DECIMALS:
+            return
+
+        max_float_reward = btc_reward * (percentage - constants.PERCENT_DECIMALS) // constants.PERCENT_DECIMALS
+        float_reserve = self.chain.get_float_reserve()
+        if max_float_reward > float_reserve:
+            # SystemReward pays at most its balance
+            amount = min(max_float_reward - float_reserve, self.chain.get_balance(SystemRewardMock[0]))
+            if amount > 0:
+                amount = self.chain.claim_system_reward(StakeHubMock[0], amount)
+            self.chain.update_float_reserve(float_reserve + amount)
 
     def update_validator_set(self):
         validators = self.select_validators_for_next_round()
@@ -568,15 +588,23 @@ class ChainHandler:
         float_reward_pool = self.chain.get_total_unclaimed_reward()
         total_float_reward = -total_unclaimable_reward
         if total_float_reward > float_reward_pool:
-            supplementary_amount = total_float_reward - float_reward_pool
-            actual_supplementary_amount = \
-                self.chain.claim_system_reward(StakeHubMock[0], supplementary_amount)
-
-            # maybe actual_supplementary_amount < supplementary_amount
-            self.chain.add_total_unclaimed_reward(actual_supplementary_amount)
-
-            print(
-                f"supplementary_amount={supplementary_amount}, actual_supplementary_amount={actual_supplementary_amount}, total_unclaimed_reward={self.chain.get_total_unclaimed_reward()}")
+            # extra rewards beyond the pool are paid from the float reserve,
+            # SystemReward is only claimed when the reserve runs short
+            extra_reward = total_float_reward - float_reward_pool
+            float_reserve = self.chain.get_float_reserve()
+            if extra_reward > float_reserve:
+                supplementary_amount = extra_reward - float_reserve
+                actual_supplementary_amount = \
+                    self.chain.claim_system_reward(StakeHubMock[0], supplementary_amount)
+
+                # maybe actual_supplementary_amount < supplementary_amount
+                float_reserve += actual_supplementary_amount
+
+                print(
+                    f"supplementary_amount={supplementary_amount}, actual_supplementary_amount={actual_supplementary_amount}, float_reserve={float_reserve}")
+
+            self.chain.update_float_reserve(float_reserve - extra_reward)
+            self.chain.add_total_unclaimed_reward(extra_reward)
 
         return total_float_reward
 
@@ -268,6 +268,7 @@ class ChainState:
         self.is_burn_out_of_cap = False
         self.burn_cap = 0
         self.total_unclaimed_reward = 0
+        self.float_reserve = 0
 
         self.delegator_stake_state = DelegatorStakeState()
 
@@ -490,6 +491,13 @@ class ChainState:
         self.total_unclaimed_reward += delta_amount
         assert self.total_unclaimed_reward >= 0
 
+    def get_float_reserve(self):
+        return self.float_reserve
+
+    def update_float_reserve(self, amount):
+        assert amount >= 0
+        self.float_reserve = amount
+
     def get_incentive_percent(self):
         return self.incentive_percent
 
@@ -649,6 +657,9 @@ class ChainState:
     def get_total_unclaimed_reward_on_chain(self):
         return StakeHubMock[0].surplus()
 
+    def get_float_reserve_on_chain(self):
+        return StakeHubMock[0].floatReserve()
+
     def get_wallets_on_chain(self):
         return BitcoinLSTStakeMock[0].getWallets()
 
@@ -2,6 +2,7 @@ from brownie import *
 from .payment import BtcLSTLockWallet
 import random
 from . import constants
+from ..grade_table import GradeTable
 
 
 class RedeemRequest:
@@ -124,6 +125,8 @@ class DelegatorStakeState:
         #  reward level is related to the lock-up duration
         self.btc_stake_grade_flag = False
         self.btc_stake_grades = []
+        # lookup table of btc_stake_grades, rebuilt whenever the grades change
+        self.btc_stake_grade_table = GradeTable([])
 
         self.btc_lst_stake_grade_flag = False
         self.btc_lst_stake_percent = 0
@@ -131,6 +134,8 @@ class DelegatorStakeState:
         # dual staking level
         self.core_stake_grade_flag = False
         self.core_stake_grades = []
+        # lookup table of core_stake_grades, rebuilt whenever the grades change
+        self.core_stake_grade_table = GradeTable([])
 
         # wallets (script_pubkey => flag)   flag(0,1):is active
         self.wallets = {}
@@ -145,10 +150,10 @@ class DelegatorStakeState:
 
     def init_data_on_chain(self):
         self.core_stake_grade_flag = BitcoinAgentMock[0].gradeActive()
-        self.core_stake_grades = BitcoinAgentMock[0].getGrades()
+        self.update_core_stake_grades(BitcoinAgentMock[0].getGrades())
 
         self.btc_stake_grade_flag = BitcoinStakeMock[0].gradeActive()
-        self.btc_stake_grades = BitcoinStakeMock[0].getGrades()
+        self.update_btc_stake_grades(BitcoinStakeMock[0].getGrades())
 
         self.btc_lst_stake_grade_flag = True
         self.btc_lst_stake_percent = BitcoinAgentMock[0].lstGradePercentage()
@@ -170,8 +175,19 @@ class DelegatorStakeState:
     def get_core_stake_grade_data(self):
         return self.core_stake_grade_flag, self.core_stake_grades
 
+    def get_max_grade_percentage(self):
+        # the highest percentage grading applies to BTC rewards, grade percentages are ascending
+        percentage = self.btc_lst_stake_percent
+        if self.core_stake_grade_flag and len(self.core_stake_grades) > 0:
+            percentage = max(percentage, self.core_stake_grades[-1][1])
+        return percentage
+
     def update_core_stake_grades(self, grades):
         self.core_stake_grades = grades
+        self.core_stake_grade_table = GradeTable(grades)
+
+    def get_core_stake_grade_table(self):
+        return self.core_stake_grade_table
 
     def get_btc_stake_grade_data(self):
         return self.btc_stake_grade_flag, self.btc_stake_grades
@@ -181,6 +197,7 @@ class DelegatorStakeState:
 
     def update_btc_stake_grades(self, grades):
         self.btc_stake_grades = grades
+        self.btc_stake_grade_table = GradeTable(grades)
 
     def get_btc_lst_stake_grade_data(self):
         return self.btc_lst_stake_grade_flag, self.btc_lst_stake_percent
@@ -569,11 +586,7 @@ class DelegatorStakeState:
 
         print(f"lock duration={lock_duration}")
 
-        percent = self.btc_stake_grades[0][1]
-        for grade in reversed(self.btc_stake_grades):
-            if lock_duration >= grade[0]:
-                percent = grade[1]
-                break
+        percent = self.btc_stake_grade_table.lookup(lock_duration)
 
         claimable_reward = reward * percent // constants.PERCENT_DECIMALS
         return claimable_reward, reward - claimable_reward
@@ -0,0 +1,137 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from ecdsa import SigningKey, SECP256k1
+
+PRIVATE_KEY_SIZE = 32
+PUBLIC_KEY_SIZE = 33
+KEY_PAIR_SIZE = PRIVATE_KEY_SIZE + PUBLIC_KEY_SIZE
+KEY_POOL_BATCH_SIZE = 256
+KEY_POOL_FILE_EXT = ".keys"
+
+# the key pool of the executing scenario, payments created while it is set
+# take their key pairs from it instead of generating random ones
+active_key_pool = None
+
+
+def derive_private_key(seed_hash: bytes, index: int) -> bytes:
+    # sha256(seed hash || index || counter) until the value is a valid secp256k1 scalar
+    counter = 0
+    while True:
+        data = seed_hash + index.to_bytes(8, 'big') + counter.to_bytes(4, 'big')
+        private_key = hashlib.sha256(data).digest()
+        if 0 < int.from_bytes(private_key, 'big') < SECP256k1.order:
+            return private_key
+        counter += 1
+
+
+def derive_key_pairs(seed_hash: bytes, from_index: int, count: int) -> bytes:
+    # runs in the worker process, returns count packed (private key, compressed public key) records
+    records = bytearray()
+    for index in range(from_index, from_index + count):
+        private_key = derive_private_key(seed_hash, index)
+        public_key = SigningKey.from_string(private_key, curve=SECP256k1).get_verifying_key().to_string("compressed")
+        records += private_key + public_key
+    return bytes(records)
+
+
+class KeyPool:
+    # hands out secp256k1 key pairs derived deterministically from a seed. batches are
+    # derived ahead of use in a worker process and appended to {cache_dir}/{seed}.keys,
+    # so a later run with the same seed does no EC math for the keys it already has
+    def __init__(self, seed, cache_dir=None, batch_size=KEY_POOL_BATCH_SIZE):
+        self.seed_hash = hashlib.sha256(str(seed).encode()).digest()
+        self.batch_size = batch_size
+        self.cache_file = None
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.cache_file = os.path.join(cache_dir, f"{self.seed_hash[:8].hex()}{KEY_POOL_FILE_EXT}")
+
+        self.records = bytearray()
+        self.cached_count = 0
+        self.next_index = 0
+        self.executor = None
+        self.pending = None
+
+        self.__load_cache()
+
+    def __len__(self):
+        return len(self.records) // KEY_PAIR_SIZE
+
+    def next_key_pair(self):
+        if self.next_index >= len(self):
+            self.__extend()
+
+        offset = self.next_index * KEY_PAIR_SIZE
+        record = memoryview(self.records)[offset:offset + KEY_PAIR_SIZE]
+        self.next_index += 1
+
+        # prefetch the next batch once the current one is half consumed
+        if self.pending is None and len(self) - self.next_index < self.batch_size // 2:
+            self.__prefetch()
+
+        return bytes(record[:PRIVATE_KEY_SIZE]), bytes(record[PRIVATE_KEY_SIZE:])
+
+    def get_used_count(self):
+        return self.next_index
+
+    def reset(self):
+        # hands out the same key pairs again from the first one
+        self.next_index = 0
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+            self.pending = None
+        self.__save_cache()
+
+    def __prefetch(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=1)
+        self.pending = self.executor.submit(derive_key_pairs, self.seed_hash, len(self), self.batch_size)
+
+    def __extend(self):
+        if self.pending is None:
+            self.__prefetch()
+
+        records = self.pending.result()
+        self.pending = None
+        self.records += records
+
+    def __load_cache(self):
+        if self.cache_file is None or not os.path.exists(self.cache_file):
+            return
+
+        with open(self.cache_file, 'rb') as cache_file:
+            records = cache_file.read()
+
+        # drop a partially written trailing record
+        count = len(records) // KEY_PAIR_SIZE
+        self.records = bytearray(records[:count * KEY_PAIR_SIZE])
+        self.cached_count = count
+
+    def __save_cache(self):
+        if self.cache_file is None or len(self) <= self.cached_count:
+            return
+
+        with open(self.cache_file, 'ab') as cache_file:
+            cache_file.write(self.records[self.cached_count * KEY_PAIR_SIZE:])
+        self.cached_count = len(self)
+
+
+def init_key_pool(seed, cache_dir=None):
+    global active_key_pool
+    close_key_pool()
+
+    active_key_pool = KeyPool(seed, cache_dir)
+    return active_key_pool
+
+
+def close_key_pool():
+    global active_key_pool
+    if active_key_pool is None:
+        return
+
+    active_key_pool.close()
+    active_key_pool = None
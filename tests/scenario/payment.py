@@ -11,6 +11,8 @@ from bitcoin.core.key import CPubKey
 from bitcoin.core.script import *
 from ecdsa import SigningKey, SECP256k1
 from . import payment
+from . import key_pool
+from . import taproot
 from eth_hash.auto import keccak
 from ..delegate import get_btc_lst_transaction_op_return_data, get_transaction_op_return_data
 
@@ -121,6 +123,10 @@ class Payment(ABC):
         return self.amount
 
     def create_random_key_pair(self):
+        if key_pool.active_key_pool is not None:
+            private_key, public_key = key_pool.active_key_pool.next_key_pair()
+            return private_key, CPubKey(public_key)
+
         private_key = os.urandom(32)  # bytes
         secret = CBitcoinSecret.from_secret_bytes(private_key)
         public_key = CPubKey(secret.pub)  # bytes
@@ -275,6 +281,10 @@ class P2TR(Payment):
         return self.taproot_pubkey  # 32bytes
 
     def create_random_key_pair(self):
+        # pooled private keys are kept as bytes, building a SigningKey would redo the EC math
+        if key_pool.active_key_pool is not None:
+            return key_pool.active_key_pool.next_key_pair()
+
         private_key = SigningKey.generate(curve=SECP256k1)
         public_key = private_key.get_verifying_key().to_string("compressed")
 
@@ -290,91 +300,34 @@ class P2TR_PUBKEY(P2TR):
 
 
 class P2TR_SCRIPT(P2TR):
-    def __init__(self):
+    def __init__(self, scripts=None):
+        # leaf scripts of the tapscript tree, drawn from the shared template pool by default
+        self.scripts = scripts
+        self.tap_tree = None
+        self.internal_key = None
+        self.output_parity = 0
         super().__init__()
 
     def create_taproot_pubkey(self):
-        merkle_root = self.__build_merkle_root()  # bytes
-
-        tweak = self.__build_taproot_tweak("TapTweak", self.public_key, merkle_root)
-        tweaked_pubkey = int.from_bytes(self.public_key, 'big') + int.from_bytes(tweak, 'big')
-        tweaked_pubkey = tweaked_pubkey % SECP256k1.order
-        return tweaked_pubkey.to_bytes(32, 'big')
-
-    def __random_build_merkle_node(self):
-        # P2PKH P2MS P2SH-P2PKH, P2SH-P2MS, P2SH-P2WPKH, P2SH-P2WSH, P2WPKH, P2WSH ,P2WSH-P2MS
-        avaliable_lock_script_list = ["P2PKH", "P2MS", "P2SH", "P2WPKH", "P2WSH"]
-        avaliable_redeem_script_map = {
-            "P2SH": ["P2PKH", "P2MS", "P2WPKH", "P2WSH"],
-            "P2WSH": ["P2MS"]
-        }
-
-        lock_script_list = []
-        merkle_nodes = []
-
-        # build 4 ~ 8 lock scripts
-        count = random.randint(4, 8)
-        for i in range(count):
-            lock_script_type = random.choice(avaliable_lock_script_list)
-            redeem_script_type = None
-            if avaliable_redeem_script_map.get(lock_script_type) is not None:
-                redeem_script_type = random.choice(avaliable_redeem_script_map[lock_script_type])
-
-            PaymentClass = getattr(payment, lock_script_type)
-
-            if redeem_script_type is None:
-                paymentInst = PaymentClass()
-            else:
-                paymentInst = PaymentClass(
-                    redeem_script_type=redeem_script_type
-                )
-
-            script_pubkey = paymentInst.get_script_pubkey()
-            redeem_script = paymentInst.get_redeem_script()
-
-            lock_script_list.append({
-                script_pubkey: script_pubkey,
-                redeem_script: redeem_script
-            })
-
-            merkle_nodes.append(self.__build_node_hash(script_pubkey))
-
-        return merkle_nodes
-
-    def __build_node_hash(self, script_pubkey, version="c0"):
-        return hashlib.sha256(bytes.fromhex(version) + script_pubkey)
-
-    def __build_merkle_root(self):
-        merkle_nodes = self.__random_build_merkle_node()
-        assert merkle_nodes is not None, f"Script list is None"
-
-        node_count = len(merkle_nodes)
-        nodes = merkle_nodes
-
-        while node_count > 1:
-            for i in range(0, node_count, 2):
-                left = nodes[i]
-                right = nodes[i + 1] if i + 1 < node_count else left
-
-                # reuse nodes
-                # (i,i+1) -> i/2
-                nodes[i // 2] = hashlib.sha256(hashlib.sha256(left.digest() + right.digest()).digest())
-            node_count //= 2
-
-        return nodes[0].digest()
-
-    def __build_taproot_tweak(self, tag, public_key, merkle_root):
-        assert len(public_key) == 33 and len(merkle_root) == 32, \
-            f"Invalid pubkey or merkle root"
-
-        tag_hash = hashlib.sha256(tag.encode("utf-8")).digest()
-        h = hashlib.sha256()
-        h.update(tag_hash)
-        h.update(tag_hash)
-        h.update(public_key)
-        h.update(merkle_root)
-
-        return h.digest()
+        if self.scripts is None:
+            self.scripts = taproot.random_leaf_scripts()
+        self.tap_tree = taproot.TapTree(self.scripts)
+
+        self.internal_key = taproot.x_only(self.public_key)
+        output_key, self.output_parity = taproot.taproot_tweak(self.internal_key, self.tap_tree.merkle_root)
+        return output_key
+
+    def get_control_block(self, index):
+        return self.tap_tree.control_block(self.internal_key, self.output_parity, index)
+
+    def get_script_path_witness(self, index, stack=()):
+        # witness spending the output through leaf `index`: stack items, script, control block
+        return list(stack) + [self.tap_tree.scripts[index], self.get_control_block(index)]
+
+    @classmethod
+    def build_many(cls, count, scripts=None):
+        # many outputs sharing one leaf script list reuse its cached leaf hashes
+        return [cls(scripts) for _ in range(count)]
 
 
 import struct
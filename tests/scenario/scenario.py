@@ -6,18 +6,110 @@ from . import chain_state
 from . import constants
 
 
+JSONL_EXT = ".jsonl"
+
+
+# line-delimited scenario format, one record per line:
+#   header: {"init_round": N, "seed": S}, seed is only set for generated scenarios
+#   round:  {"advanced_round": k, "tasks": [[task name, params...], ...]}
+class ScenarioWriter:
+    def __init__(self, write_file, init_round, seed=None):
+        assert init_round >= constants.MIN_ROUND
+
+        self.file = open(write_file, 'w')
+        self.round_count = 0
+
+        header = {"init_round": init_round}
+        if seed is not None:
+            header["seed"] = seed
+        self.__write_record(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_round(self, advanced_round, tasks):
+        self.__write_record({"advanced_round": int(advanced_round), "tasks": tasks})
+        self.round_count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __write_record(self, record):
+        self.file.write(json.dumps(record))
+        self.file.write("\n")
+
+
+# only the header is parsed on load, each iteration reopens the file
+# and yields (advanced_round, tasks) one round at a time
+class ScenarioReader:
+    def __init__(self, jsonl_file):
+        self.jsonl_file = jsonl_file
+        self.init_round = 0
+        self.seed = None
+
+        with open(jsonl_file, 'r') as file:
+            header = json.loads(file.readline())
+            self.init_round = header['init_round']
+            self.seed = header.get('seed')
+
+    def __iter__(self):
+        with open(self.jsonl_file, 'r') as file:
+            file.readline()
+            for line in file:
+                line = line.strip()
+                if len(line) == 0:
+                    continue
+
+                record = json.loads(line)
+                yield record['advanced_round'], record['tasks']
+
+
 class Scenario:
     def __init__(self):
         self.init_round = 0
         self.round_tasks = {}
+
+        # seed of the random streams the scenario was generated with, None if unknown;
+        # replaying needs the same seed since the execution side draws from them too
+        self.seed = None
+
+        # lazy round task source, an iterable of (advanced_round, tasks);
+        # used instead of round_tasks when set
+        self.round_task_source = None
+        self.executed_task_count = 0
+        self.executing_round = None
+        self.profiler = None
         self.chain = None
 
     def load(self, json_file):
-        ok, init_round, round_tasks = self.__load(json_file)
+        if json_file.endswith(JSONL_EXT):
+            self.load_jsonl(json_file)
+            return
+
+        ok, init_round, seed, round_tasks = self.__load(json_file)
         assert ok, f"Load json file error"
 
         self.init_round = init_round
+        self.seed = seed
         self.round_tasks = round_tasks
+        self.round_task_source = None
+
+    def load_jsonl(self, jsonl_file):
+        assert os.path.isfile(jsonl_file), f"Load jsonl file error"
+
+        reader = ScenarioReader(jsonl_file)
+        self.init_round = reader.init_round
+        self.seed = reader.seed
+        self.round_tasks = {}
+        self.round_task_source = reader
 
     def dump(self, write_file):
         assert self.init_round >= constants.MIN_ROUND
@@ -27,16 +119,54 @@ class Scenario:
             "init_round": self.init_round,
             "round_tasks": self.round_tasks
         }
+        if self.seed is not None:
+            json_data["seed"] = self.seed
         with open(write_file, 'w') as json_file:
             json.dump(json_data, json_file, indent=4)
 
+    def dump_jsonl(self, write_file):
+        assert self.init_round >= constants.MIN_ROUND
+
+        with ScenarioWriter(write_file, self.init_round, self.seed) as writer:
+            for advanced_round, tasks in self.iter_round_tasks():
+                writer.write_round(advanced_round, tasks)
+
+        assert writer.round_count > 0
+
     def set_init_round(self, init_round):
         self.init_round = init_round
 
+    def set_seed(self, seed):
+        self.seed = seed
+
+    def get_seed(self):
+        return self.seed
+
     def set_round_tasks(self, round_tasks):
         self.round_tasks = round_tasks
+        self.round_task_source = None
+
+    def set_profiler(self, profiler):
+        self.profiler = profiler
+
+    def set_round_task_source(self, round_task_source):
+        self.round_tasks = {}
+        self.round_task_source = round_task_source
+
+    def iter_round_tasks(self):
+        if self.round_task_source is not None:
+            return iter(self.round_task_source)
+
+        return iter(self.round_tasks.items())
+
+    def get_executing_round(self):
+        return self.executing_round
 
     def get_task_count(self):
+        # a lazy source may be single-pass, so only count what has been executed
+        if self.round_task_source is not None:
+            return self.executed_task_count
+
         assert self.round_tasks is not None
 
         count = 0
@@ -45,18 +175,56 @@ class Scenario:
 
         return count
 
-    def execute(self):
+    def execute(self, journal_file=None):
+        # when journal_file is set, each round is appended to it in the
+        # line-delimited format before it executes, so a failing lazy
+        # scenario can still be replayed
         init_round = self.init_round
-        round_tasks = self.round_tasks
 
         assert init_round >= constants.MIN_ROUND, f"Initial round is too small (init_round >= {constants.MIN_ROUND})"
         if init_round != common.get_current_round():
             common.set_round_tag(init_round)
 
         self.chain = chain_state.ChainState(init_round)
+        self.executed_task_count = 0
+
+        journal = None
+        if journal_file is not None:
+            journal = ScenarioWriter(journal_file, init_round, self.seed)
+
+        if self.profiler is not None:
+            self.profiler.start()
+
+        try:
+            self.__execute_rounds(journal)
+        finally:
+            if journal is not None:
+                journal.close()
+
+            if self.profiler is not None:
+                self.profiler.stop()
+                self.profiler.export()
+
+    def __execute_rounds(self, journal):
+        round_tasks = self.iter_round_tasks()
+        try:
+            self.__execute_round_tasks(round_tasks, journal)
+        finally:
+            # stop a lazy source (e.g. a generator running ahead) as soon as execution stops
+            close = getattr(round_tasks, "close", None)
+            if close is not None:
+                close()
+
+    def __execute_round_tasks(self, round_tasks, journal):
+        init_round = self.init_round
         last_advanced_round = 0
 
-        for advanced_round, tasks in round_tasks.items():
+        for advanced_round, tasks in round_tasks:
+            self.executing_round = int(advanced_round)
+            if journal is not None:
+                journal.write_round(advanced_round, tasks)
+                journal.flush()
+
             round = init_round + int(advanced_round)
 
             turn_round_count = int(advanced_round) - last_advanced_round
@@ -81,6 +249,7 @@ class Scenario:
                     task[1:] if len(task) > 1 else []
                 )
 
+            self.executed_task_count += len(tasks)
             last_advanced_round = int(advanced_round)
 
     def __execute_task(self, advanced_round, round, task_name, task_params):
@@ -92,6 +261,15 @@ class Scenario:
 
         task_inst.set_round(round)
         task_inst.set_chain_state(self.chain)
+
+        if self.profiler is None:
+            self.__run_task(task_inst, task_params)
+            return
+
+        with self.profiler.profile_task(round, task_name):
+            self.__run_task(task_inst, task_params)
+
+    def __run_task(self, task_inst, task_params):
         task_inst.pre_execute(task_params)
         task_inst.execute()
         task_inst.post_execute()
@@ -102,16 +280,17 @@ class Scenario:
 
         # for json_file in json_files:
         if not os.path.isfile(json_file):
-            return False
+            return False, 0, None, []
 
         return self.__parse(json_file)
 
     def __parse(self, json_file):
         init_round = 0
+        seed = None
         round_tasks = []
 
         if not os.path.exists(json_file):
-            return False, init_round, round_tasks
+            return False, init_round, seed, round_tasks
 
         ok = False
 
@@ -119,6 +298,7 @@ class Scenario:
             with open(json_file, 'r') as file:
                 data = json.load(file)
                 init_round = data['init_round']
+                seed = data.get('seed')
                 round_tasks = data['round_tasks']
                 ok = True
 
@@ -129,4 +309,4 @@ class Scenario:
         except Exception as e:
             print(f"Error: {e}")
 
-        return ok, init_round, round_tasks
+        return ok, init_round, seed, round_tasks
@@ -1,7 +1,9 @@
 from enum import Enum
 from brownie import *
 import json
+import queue
 import random
+import threading
 from . import constants
 from .account_mgr import AccountMgr
 from .chain_state import NodeStatus, Candidate
@@ -9,6 +11,11 @@ from . import payment
 from .scenario import Scenario
 
 
+# the generator draws from its own random stream, so a seeded generation is
+# reproducible even when it runs ahead of the execution on a worker thread
+rng = random.Random()
+
+
 ############### scenario generator ################
 class AssetAmount:
     def __init__(self):
@@ -82,7 +89,7 @@ class DelegatorStakeInfo:
         if operators is None or len(operators) == 0:
             return None, 0
 
-        operator = random.choice(operators)
+        operator = rng.choice(operators)
         amount = self.cores[operator].amount
 
         return operator, amount
@@ -123,16 +130,16 @@ class DelegatorStakeInfo:
         if len(self.btcs) == 0:
             return None, None, 0
 
-        delegatee = random.choice(list(self.btcs.keys()))
+        delegatee = rng.choice(list(self.btcs.keys()))
         if len(self.btcs[delegatee]) == 0:
             return None, None, 0
 
-        tx_symbol = random.choice(list(self.btcs[delegatee].keys()))
+        tx_symbol = rng.choice(list(self.btcs[delegatee].keys()))
         return delegatee, tx_symbol, self.btcs[delegatee][tx_symbol]
 
 
 class DataCenter:
-    def __init__(self, round, candidate_count, delegator_count):
+    def __init__(self, round, candidate_count, delegator_count, task_probabilities=None):
         # update when a candidate is registered or its status changes
         self.candidates = {}
 
@@ -152,6 +159,10 @@ class DataCenter:
         self.operators = None
         self.delegators = None
 
+        # delegator => modelled balance, read once here and kept up to date by the
+        # generated core stake tasks so that generation never touches the chain
+        self.balances = None
+
         self.btc_stake_payments = None
 
         self.btc_lst_stake_payments = None
@@ -164,11 +175,12 @@ class DataCenter:
 
         self.init_sponsees()
         self.init_delegators()
+        self.init_balances()
         self.init_operators()
         self.init_btc_stake_payments()
         self.init_btc_lst_stake_payments()
         self.init_btc_lst_redeem_max_amount()
-        self.init_random_task_probabilities()
+        self.init_random_task_probabilities(task_probabilities)
         self.init_utxo_fee()
         self.init_slash_params()
 
@@ -186,6 +198,13 @@ class DataCenter:
 
         self.delegators = delegators
 
+    def init_balances(self):
+        balances = {}
+        for delegator in self.delegators:
+            balances[delegator] = AccountMgr.get_delegator_addr(delegator).balance()
+
+        self.balances = balances
+
     def init_operators(self):
         operators = []
         for i in range(self.candidate_count):
@@ -226,7 +245,7 @@ class DataCenter:
 
         }
 
-    def init_random_task_probabilities(self):
+    def init_random_task_probabilities(self, task_probabilities=None):
         self.random_task_probabilities = {
             GenerateBlock.__name__: 100,
             UpdateCoreStakeGradeFlag.__name__: 20,
@@ -240,6 +259,9 @@ class DataCenter:
             StakeCore.__name__: 30
         }
 
+        if task_probabilities is not None:
+            self.random_task_probabilities.update(task_probabilities)
+
     def init_btc_lst_redeem_max_amount(self):
         self.btc_lst_redeem_max_amount = 0#BitcoinLSTStakeMock[0].burnBTCLimit()
 
@@ -429,7 +451,7 @@ class DataCenter:
         if len(candidates) == 0:
             return
 
-        return random.choice(list(candidates.keys()))
+        return rng.choice(list(candidates.keys()))
 
     # delegateable candidate
     def choice_available_candidate(self):
@@ -437,7 +459,7 @@ class DataCenter:
         if len(candidates) == 0:
             return
 
-        return random.choice(list(candidates.keys()))
+        return rng.choice(list(candidates.keys()))
 
     # delegateable candidate
     def choice_available_candidate_exclude(self, excluded_operator):
@@ -457,12 +479,15 @@ class DataCenter:
     def choice_miners(self):
         assert self.delegator_count > 0
         max_count = max(self.delegator_count // 2, 1)
-        count = random.randint(1, max_count)
+        count = rng.randint(1, max_count)
 
-        return random.choices(self.delegators, k=count)
+        return rng.choices(self.delegators, k=count)
 
     def choice_delegator(self):
-        return random.choice(self.delegators)
+        return rng.choice(self.delegators)
+
+    def get_balance(self, delegator):
+        return self.balances[delegator]
 
     ############## end delegator ####################
 
@@ -470,10 +495,12 @@ class DataCenter:
     def stake_core(self, delegator, delegatee, amount):
         stake_info = self.get_stake_info(delegator)
         stake_info.transfer_in_core(delegatee, amount)
+        self.balances[delegator] -= amount
 
     def unstake_core(self, delegator, delegatee, amount):
         stake_info = self.get_stake_info(delegator)
         stake_info.transfer_out_core(delegatee, amount)
+        self.balances[delegator] += amount
 
     def transfer_core(self, delegator, from_delegatee, to_delegatee, amount):
         stake_info = self.get_stake_info(delegator)
@@ -533,7 +560,7 @@ class DataCenter:
         if max_amount < min_amount:
             return 0
 
-        amount = round(random.uniform(min_amount, max_amount), 8)
+        amount = round(rng.uniform(min_amount, max_amount), 8)
         return amount
 
     def is_staked_asset(self, delegator):
@@ -549,19 +576,19 @@ class DataCenter:
         return cur_symbol
 
     def choice_btc_stake_lock_script(self):
-        payment_type = random.choice(list(self.btc_stake_payments.keys()))
-        redeem_script_type = random.choice(list(self.btc_stake_payments[payment_type]))
+        payment_type = rng.choice(list(self.btc_stake_payments.keys()))
+        redeem_script_type = rng.choice(list(self.btc_stake_payments[payment_type]))
 
         return payment_type, redeem_script_type
 
     def choice_btc_lst_stake_lock_script(self):
-        payment_type = random.choice(list(self.btc_lst_stake_payments.keys()))
+        payment_type = rng.choice(list(self.btc_lst_stake_payments.keys()))
 
         redeem_script_types = self.btc_lst_stake_payments[payment_type]
         if len(redeem_script_types) == 0:
             return payment_type, None
 
-        redeem_script_type = random.choice(redeem_script_types)
+        redeem_script_type = rng.choice(redeem_script_types)
         return payment_type, redeem_script_type
 
     ################ end lock script #################
@@ -583,11 +610,38 @@ class ScenarioGenerator:
         generator.set_data_center(self.data_center)
         self.task_generators[generator.get_id()] = generator
 
-    def generate(self, start_round, stop_round, candidate_count, delegator_count):
+    def generate(self, start_round, stop_round, candidate_count, delegator_count,
+                 lazy=False, pipeline_depth=0, seed=None, task_probabilities=None):
+        # in lazy mode the round tasks are generated on demand while the scenario
+        # executes, so round N+1 is only built after round N has been executed.
+        # with pipeline_depth > 0 a worker thread runs up to pipeline_depth rounds
+        # ahead of the execution, hiding the generation cost behind RPC latency
+        round_tasks = self.iter_round_tasks(
+            start_round, stop_round, candidate_count, delegator_count,
+            seed=seed, task_probabilities=task_probabilities
+        )
+
+        scenario = Scenario()
+        scenario.set_init_round(start_round)
+        if pipeline_depth > 0:
+            scenario.set_round_task_source(RoundTaskPipeline(round_tasks, pipeline_depth))
+        elif lazy:
+            scenario.set_round_task_source(round_tasks)
+        else:
+            self.round_tasks = dict(round_tasks)
+            scenario.set_round_tasks(self.round_tasks)
+
+        return scenario
+
+    def iter_round_tasks(self, start_round, stop_round, candidate_count, delegator_count,
+                         seed=None, task_probabilities=None):
         # check params
         assert start_round >= constants.MIN_ROUND and stop_round > start_round
         assert candidate_count > 0 and delegator_count > 0
 
+        if seed is not None:
+            rng.seed(seed)
+
         # init data members
         self.start_round = start_round
         self.stop_round = stop_round
@@ -596,7 +650,7 @@ class ScenarioGenerator:
         self.task_generators = {}
         self.round_tasks = {}
 
-        self.data_center = DataCenter(start_round, candidate_count, delegator_count)
+        self.data_center = DataCenter(start_round, candidate_count, delegator_count, task_probabilities)
 
         # init global task builder for each task generator
         ChainTaskGenerator.init_supported_task_builders()
@@ -617,44 +671,108 @@ class ScenarioGenerator:
             generator = DelegatorTaskGenerator()
             self.add_generator(generator)
 
-        # generate round task
-        round_count = stop_round - start_round + 1
-        for advanced_round in range(round_count):
-            self.data_center.refresh()
+        return self.__iter_round_tasks(stop_round - start_round + 1)
 
-            tasks = []
-            for generator in self.task_generators.values():
-                res = generator.generate_one_time_task(advanced_round)
-                if res is None or len(res) == 0:
-                    continue
+    def __iter_round_tasks(self, round_count):
+        try:
+            for advanced_round in range(round_count):
+                yield advanced_round, self.__generate_round_tasks(advanced_round)
+        finally:
+            ChainTaskGenerator.reset()
+            CandidateTaskGenerator.reset()
+            DelegatorTaskGenerator.reset()
+            TaskGenerator.reset()
 
-                tasks.extend(res)
+    def __generate_round_tasks(self, advanced_round):
+        self.data_center.refresh()
 
-            for generator in self.task_generators.values():
-                res = generator.generate_mandatory_task(advanced_round)
-                if res is None or len(res) == 0:
-                    continue
+        tasks = []
+        for generator in self.task_generators.values():
+            res = generator.generate_one_time_task(advanced_round)
+            if res is None or len(res) == 0:
+                continue
 
-                tasks.extend(res)
+            tasks.extend(res)
 
-            for generator in self.task_generators.values():
-                res = generator.generate_random_task(advanced_round)
-                if res is None or len(res) == 0:
-                    continue
+        for generator in self.task_generators.values():
+            res = generator.generate_mandatory_task(advanced_round)
+            if res is None or len(res) == 0:
+                continue
 
-                tasks.extend(res)
+            tasks.extend(res)
 
-            self.round_tasks[advanced_round] = tasks
+        for generator in self.task_generators.values():
+            res = generator.generate_random_task(advanced_round)
+            if res is None or len(res) == 0:
+                continue
 
-        scenario = Scenario()
-        scenario.set_init_round(self.init_round)
-        scenario.set_round_tasks(self.round_tasks)
+            tasks.extend(res)
 
-        ChainTaskGenerator.reset()
-        CandidateTaskGenerator.reset()
-        DelegatorTaskGenerator.reset()
-        TaskGenerator.reset()
-        return scenario
+        return tasks
+
+
+class RoundTaskPipeline:
+    # feeds round tasks produced on a worker thread through a bounded queue;
+    # all chain parameters are read when the DataCenter is created, so the
+    # worker only runs pure python generation code
+    __DONE = object()
+    __POLL_SECONDS = 0.1
+
+    def __init__(self, round_tasks, depth):
+        assert depth > 0
+
+        self.round_tasks = round_tasks
+        self.queue = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.error = None
+        self.started = False
+        self.thread = threading.Thread(target=self.__produce, daemon=True)
+
+    def __iter__(self):
+        assert not self.started, "Round task pipeline can only be iterated once"
+
+        self.started = True
+        self.thread.start()
+
+        try:
+            while True:
+                item = self.queue.get()
+                if item is RoundTaskPipeline.__DONE:
+                    break
+
+                yield item
+        finally:
+            self.close()
+
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        # stop generating early, e.g. after a failing execution
+        self.stopped.set()
+        if self.started:
+            self.thread.join()
+
+    def __produce(self):
+        try:
+            for item in self.round_tasks:
+                if not self.__put(item):
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            self.round_tasks.close()
+            self.__put(RoundTaskPipeline.__DONE)
+
+    def __put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=RoundTaskPipeline.__POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+
+        return False
 
 
 ############# end scenario generator ##############
@@ -941,7 +1059,7 @@ class TaskBuilder:
         probability = data_center.get_probability(self.__class__.__name__)
 
         print(f"{self.__class__.__name__}:{probability}")
-        p = random.randint(1, constants.PROBABILITY_DECIMALS)
+        p = rng.randint(1, constants.PROBABILITY_DECIMALS)
         return p <= probability
 
     def build(self, task_generator):
@@ -969,7 +1087,7 @@ class TaskBuilder:
         return self.next_builder.build(task_generator)
 
     def build_confirm_btc_tx_task(self, tx_symbol):
-        delay_minutes = random.randint(12, 60)
+        delay_minutes = rng.randint(12, 60)
         return [ConfirmBtcTx.__name__, tx_symbol, delay_minutes]
 
 
@@ -1024,9 +1142,9 @@ class GenerateBlock(TaskBuilder):
         if candidate_count == 0:
             return
 
-        block_count_per_validator = random.randint(1, constants.MAX_BLOCK_COUNT_PER_VALIDATOR)
+        block_count_per_validator = rng.randint(1, constants.MAX_BLOCK_COUNT_PER_VALIDATOR)
         block_count = block_count_per_validator * candidate_count
-        block_count += random.randint(0, candidate_count)
+        block_count += rng.randint(0, candidate_count)
 
         task = [self.__class__.__name__, block_count]
         return [task]
@@ -1040,7 +1158,7 @@ class UpdateCoreStakeGradeFlag(TaskBuilder):
         self.next_builder = UpdateCoreStakeGrades()
 
     def self_build(self, task_generator):
-        value = random.randint(0, 1)
+        value = rng.randint(0, 1)
         if value > 0:
             self.next_builder.enable()
         else:
@@ -1060,7 +1178,7 @@ class UpdateCoreStakeGrades(TaskBuilder):
 
     def self_build(self, task_generator):
         # discount grades
-        grade_count = random.randint(constants.MIN_GRADE_COUNT, constants.MAX_GRADE_COUNT)
+        grade_count = rng.randint(constants.MIN_GRADE_COUNT, constants.MAX_GRADE_COUNT)
         level_step = constants.PERCENT_DECIMALS // (grade_count - 1)
         percent_step = level_step
 
@@ -1068,7 +1186,7 @@ class UpdateCoreStakeGrades(TaskBuilder):
             return
 
         min_level = 0
-        min_percent = random.randint(1, percent_step - 1)
+        min_percent = rng.randint(1, percent_step - 1)
         grades = [min_level, min_percent]
         for i in range(1, grade_count):
             level = min_level + i * level_step
@@ -1080,7 +1198,7 @@ class UpdateCoreStakeGrades(TaskBuilder):
             grades.append(percent)
 
         # multiple grades
-        multiple = random.randint(1, constants.MAX_CORE_STAKE_GRADE_PERCENT // constants.PERCENT_DECIMALS)
+        multiple = rng.randint(1, constants.MAX_CORE_STAKE_GRADE_PERCENT // constants.PERCENT_DECIMALS)
         if multiple > 1:
             percent = constants.PERCENT_DECIMALS * multiple
             level = constants.PERCENT_DECIMALS * multiple * (
@@ -1100,7 +1218,7 @@ class UpdateBtcStakeGradeFlag(TaskBuilder):
         self.next_builder = UpdateBtcStakeGrades()
 
     def self_build(self, task_generator):
-        value = random.randint(0, 1)
+        value = rng.randint(0, 1)
         if value > 0:
             self.next_builder.enable()
         else:
@@ -1119,9 +1237,9 @@ class UpdateBtcStakeGrades(TaskBuilder):
         return self.enabled
 
     def self_build(self, task_generator):
-        max_level = random.randint(0, constants.MAX_BTC_STAKE_GRADE_LEVEL)
+        max_level = rng.randint(0, constants.MAX_BTC_STAKE_GRADE_LEVEL)
         max_percent = constants.PERCENT_DECIMALS
-        grade_count = random.randint(5, 10)
+        grade_count = rng.randint(5, 10)
 
         level_step = max_level // grade_count
         percent_step = max_percent // grade_count
@@ -1157,7 +1275,7 @@ class UpdateBtcLstStakeGradeFlag(TaskBuilder):
         self.next_builder = UpdateBtcLstStakeGradePercent()
 
     def self_build(self, task_generator):
-        value = random.randint(0, 1)
+        value = rng.randint(0, 1)
         if value > 0:
             self.next_builder.enable()
         else:
@@ -1173,7 +1291,7 @@ class UpdateBtcLstStakeGradePercent(TaskBuilder):
         self.type = TaskType.UpdateBtcLstStakeGradePercent.value
 
     def self_build(self, task_generator):
-        value = random.randint(1, constants.MAX_BTC_LST_STAKE_GRADE_PERCENT)
+        value = rng.randint(1, constants.MAX_BTC_LST_STAKE_GRADE_PERCENT)
         task = [self.__class__.__name__, value]
         return [task]
 
@@ -1200,7 +1318,7 @@ class RegisterCandidate(TaskBuilder):
             return True
 
         probability = data_center.get_probability(self.__class__.__name__)
-        p = random.randint(1, constants.PROBABILITY_DECIMALS)
+        p = rng.randint(1, constants.PROBABILITY_DECIMALS)
         return p <= probability
 
     def self_build(self, task_generator):
@@ -1212,7 +1330,7 @@ class RegisterCandidate(TaskBuilder):
 
         data_center.register_candidate(operator)
 
-        commission = random.randint(1, constants.MAX_CANDIDATE_COMMISSION)
+        commission = rng.randint(1, constants.MAX_CANDIDATE_COMMISSION)
         task = [self.__class__.__name__, operator, commission]
 
         return [task]
@@ -1237,7 +1355,7 @@ class SlashValidator(TaskBuilder):
             return
 
         max_count = data_center.get_felony_threshold()
-        count = random.randint(1, max_count * 2)
+        count = rng.randint(1, max_count * 2)
         task = [self.__class__.__name__, operator, count]
 
         data_center.slash_validator(operator, count)
@@ -1339,7 +1457,7 @@ class StakePower(TaskBuilder):
             return
 
         # lagged round
-        # lagged_round = random.randint(0, 6)
+        # lagged_round = rng.randint(0, 6)
         lagged_round = 6
 
         # random generate miner list
@@ -1359,10 +1477,10 @@ class AssetOperationBuilder(TaskBuilder):
     def __init__(self):
         super().__init__()
 
-    def random_stake_amount(self, delegator):
-        delegator_addr = AccountMgr.get_delegator_addr(delegator)
-        delegator_balance = delegator_addr.balance()
-        return random.randint(1, min(delegator_balance // 100, 1000))
+    def random_stake_amount(self, data_center, delegator):
+        # claimed rewards are not modelled, so the balance is a lower bound
+        delegator_balance = data_center.get_balance(delegator)
+        return rng.randint(1, min(delegator_balance // 100, 1000))
 
 
 class StakeCore(AssetOperationBuilder):
@@ -1381,7 +1499,7 @@ class StakeCore(AssetOperationBuilder):
         delegator = task_generator.get_delegator()
 
         # init amount by delegator balance
-        amount = self.random_stake_amount(delegator)
+        amount = self.random_stake_amount(data_center, delegator)
         task = [self.__class__.__name__, delegator, delegatee, amount]
 
         data_center.stake_core(delegator, delegatee, amount)
@@ -1404,7 +1522,7 @@ class UnstakeCore(AssetOperationBuilder):
             return
 
         # random init undelegate amount
-        amount = random.randint(1, staked_amount)
+        amount = rng.randint(1, staked_amount)
         task = [self.__class__.__name__, delegator, delegatee, amount]
 
         data_center.unstake_core(delegator, delegatee, amount)
@@ -1432,7 +1550,7 @@ class TransferCore(AssetOperationBuilder):
             return
 
         # random init amount
-        amount = random.randint(1, staked_amount)
+        amount = rng.randint(1, staked_amount)
         task = [self.__class__.__name__, delegator, from_delegatee, to_delegatee, amount]
 
         data_center.transfer_core(delegator, from_delegatee, to_delegatee, amount)
@@ -1474,10 +1592,10 @@ class StakeBtc(AssetOperationBuilder):
         delegatee = data_center.choice_candidate()
 
         # bitcoin amount 0.01 ~ 2
-        amount = random.randint(1, 200) / 100
+        amount = rng.randint(1, 200) / 100
 
         # lock round
-        lock_round = random.randint(5, 365)
+        lock_round = rng.randint(5, 365)
 
         # payment type
         payment_type, redeem_script_type = \
@@ -1556,7 +1674,7 @@ class StakeLSTBtc(AssetOperationBuilder):
         delegator = task_generator.get_delegator()
 
         # bitcoin amount 0.01 ~ 2
-        amount = random.randint(1, 200) / 100
+        amount = rng.randint(1, 200) / 100
 
         # payment type
         payment_type, redeem_script_type = \
@@ -1595,7 +1713,7 @@ class TransferLSTBtc(AssetOperationBuilder):
         if stake_amount == 0:
             return
 
-        transfer_amount = round(random.uniform(0, stake_amount), 8)
+        transfer_amount = round(rng.uniform(0, stake_amount), 8)
 
         to_delegator = data_center.choice_delegator()
         if to_delegator == from_delegator:
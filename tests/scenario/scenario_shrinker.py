@@ -0,0 +1,249 @@
+from brownie import *
+import random
+import re
+from .scenario import Scenario
+from .account_mgr import AccountMgr
+from . import key_pool
+from . import taproot
+from . import constants
+
+
+############### scenario shrinker #################
+# tasks which create a key that later tasks refer to in their params;
+# removing such a task also removes every later task referring to the key
+TX_PRODUCER_TASKS = {
+    "CreateStakeLockTx",
+    "CreateLSTLockTx",
+    "BurnLSTBtcAndPayBtcToRedeemer"
+}
+CANDIDATE_PRODUCER_TASKS = {
+    "RegisterCandidate"
+}
+
+# tasks that are never removed on their own, the sponsored funds back
+# the rewards of every other task
+PINNED_TASKS = {
+    "SponsorFund"
+}
+
+ACTOR_NAME_PATTERN = re.compile(
+    f"({constants.DELEGATOR_NAME_PREFIX}|{constants.OPERATOR_NAME_PREFIX})[0-9]+"
+)
+
+
+class ScenarioShrinker:
+    # minimizes a failing scenario with delta debugging: rounds, then actors,
+    # then single tasks are removed as long as the scenario still fails with
+    # the same error. every candidate is executed from the same chain snapshot
+    # and, for generated scenarios, with the random streams reseeded from the
+    # seed recorded in the scenario
+    def __init__(self):
+        self.init_round = 0
+        self.seed = None
+        self.rounds = None
+        self.failure = None
+        self.run_count = 0
+
+    def shrink(self, scenario_file, write_file=None):
+        scenario = Scenario()
+        scenario.load(scenario_file)
+
+        self.init_round = scenario.init_round
+        self.seed = scenario.get_seed()
+        self.rounds = [[int(advanced_round), tasks] for advanced_round, tasks in scenario.iter_round_tasks()]
+        self.run_count = 0
+
+        chain.snapshot()
+        try:
+            self.failure, failed_round = self.__run(self.rounds)
+            assert self.failure is not None, f"Scenario {scenario_file} does not fail"
+
+            # rounds after the failing one are never executed
+            self.rounds = [r for r in self.rounds if r[0] <= failed_round]
+
+            self.rounds = self.__ddmin(self.__round_units, self.__remove_rounds)
+            self.rounds = self.__ddmin(self.__actor_units, self.__remove_actors)
+            self.rounds = self.__ddmin(self.__task_units, self.__remove_tasks)
+        finally:
+            # leave the chain as it was before the shrink
+            chain.revert()
+            key_pool.close_key_pool()
+
+        shrunk = self.__make_scenario(self.rounds)
+        if write_file is not None:
+            shrunk.dump(write_file)
+
+        print(f"Shrunk scenario to {shrunk.get_task_count()} tasks after {self.run_count} runs: {self.failure}")
+        return shrunk
+
+    def get_failure(self):
+        return self.failure
+
+    ################# delta debugging ################
+    def __ddmin(self, get_units, remove):
+        # classic ddmin over the complement: split the units into n chunks and
+        # keep any removal that still reproduces the failure. units are
+        # recollected after each reduction since dependents may disappear too
+        n = 2
+        units = get_units()
+        while len(units) >= 1:
+            chunk_size = max(len(units) // n, 1)
+            chunks = [units[i:i + chunk_size] for i in range(0, len(units), chunk_size)]
+
+            reduced = False
+            for chunk in chunks:
+                candidate = remove(self.rounds, set(chunk))
+                if candidate == self.rounds or not self.__still_fails(candidate):
+                    continue
+
+                self.rounds = candidate
+                units = get_units()
+                n = max(n - 1, 2)
+                reduced = True
+                break
+
+            if reduced:
+                continue
+
+            if chunk_size == 1:
+                break
+
+            n = min(n * 2, len(units))
+
+        return self.rounds
+
+    def __still_fails(self, rounds):
+        failure, _ = self.__run(rounds)
+        return failure == self.failure
+
+    def __run(self, rounds):
+        self.run_count += 1
+        chain.revert()
+        self.__reset_replay_state()
+
+        scenario = self.__make_scenario(rounds)
+        try:
+            scenario.execute()
+        except Exception as e:
+            return self.__failure_signature(e), scenario.get_executing_round()
+
+        return None, None
+
+    def __reset_replay_state(self):
+        # same order as campaign.run_seed, a scenario without a seed keeps
+        # random keys and can only be replayed if it does not depend on them
+        if self.seed is not None:
+            random.seed(self.seed)
+        AccountMgr.init_account_mgr()
+        if self.seed is not None:
+            key_pool.init_key_pool(self.seed)
+        taproot.template_pool.reset()
+
+    def __make_scenario(self, rounds):
+        scenario = Scenario()
+        scenario.set_init_round(self.init_round)
+        scenario.set_seed(self.seed)
+        scenario.set_round_tasks({advanced_round: tasks for advanced_round, tasks in rounds})
+        return scenario
+
+    @staticmethod
+    def __failure_signature(e):
+        return f"{e.__class__.__name__}: {e}"
+
+    ##################### units ######################
+    def __round_units(self):
+        # the initial round registers candidates and funds sponsors
+        return [advanced_round for advanced_round, _ in self.rounds if advanced_round > 0]
+
+    def __actor_units(self):
+        actors = set()
+        for _, tasks in self.rounds:
+            for task in tasks:
+                for param in task[1:]:
+                    if self.__is_actor(param):
+                        actors.add(param)
+
+        return sorted(actors)
+
+    def __task_units(self):
+        units = []
+        for round_idx, (_, tasks) in enumerate(self.rounds):
+            for task_idx, task in enumerate(tasks):
+                if task[0] not in PINNED_TASKS:
+                    units.append((round_idx, task_idx))
+
+        return units
+
+    @staticmethod
+    def __is_actor(param):
+        if not isinstance(param, str):
+            return False
+
+        return ACTOR_NAME_PATTERN.fullmatch(param) is not None
+
+    ##################### removal ####################
+    def __remove_rounds(self, rounds, removed_rounds):
+        removed = set()
+        for round_idx, (advanced_round, tasks) in enumerate(rounds):
+            if advanced_round in removed_rounds:
+                removed.update((round_idx, task_idx) for task_idx in range(len(tasks)))
+
+        return self.__remove_with_dependents(rounds, removed)
+
+    def __remove_actors(self, rounds, removed_actors):
+        removed = set()
+        for round_idx, (_, tasks) in enumerate(rounds):
+            for task_idx, task in enumerate(tasks):
+                if any(param in removed_actors for param in task[1:] if isinstance(param, str)):
+                    removed.add((round_idx, task_idx))
+
+        return self.__remove_with_dependents(rounds, removed)
+
+    def __remove_tasks(self, rounds, removed_tasks):
+        return self.__remove_with_dependents(rounds, removed_tasks)
+
+    def __remove_with_dependents(self, rounds, removed):
+        # walk the tasks in execution order; a removed producer invalidates its key,
+        # and any later task referring to an invalid key is removed as well.
+        # keys are chained, e.g. CreateStakeLockTx -> ConfirmBtcTx -> StakeBtc -> TransferBtc
+        # or CreateLSTLockTx -> ConfirmBtcTx -> AddWallet -> StakeLSTBtc
+        invalid_keys = set()
+        new_rounds = []
+        for round_idx, (advanced_round, tasks) in enumerate(rounds):
+            new_tasks = []
+            for task_idx, task in enumerate(tasks):
+                keys = self.__task_keys(task)
+                if (round_idx, task_idx) in removed or len(keys & invalid_keys) > 0:
+                    invalid_keys.update(self.__produced_keys(task))
+                    continue
+
+                new_tasks.append(task)
+
+            # keep the initial round so that the advanced rounds stay aligned
+            if len(new_tasks) > 0 or advanced_round == 0:
+                new_rounds.append([advanced_round, new_tasks])
+
+        return new_rounds
+
+    @staticmethod
+    def __task_keys(task):
+        keys = set()
+        for param in task[1:]:
+            if isinstance(param, str):
+                keys.add(param)
+
+        return keys
+
+    @staticmethod
+    def __produced_keys(task):
+        if task[0] in TX_PRODUCER_TASKS or task[0] in CANDIDATE_PRODUCER_TASKS:
+            return {task[1]}
+
+        # removing any task in a tx chain invalidates the rest of the chain
+        if len(task) > 1 and isinstance(task[1], str) and \
+                task[1].startswith(constants.BITCOIN_TX_SYMBOL_PREFIX):
+            return {task[1]}
+
+        return set()
+
+############# end scenario shrinker ##############
@@ -186,11 +186,7 @@ class Asset:
         assert accured_stake_amount > 0, f"{self.name}"
 
         stake_amount_rate = core_accured_stake_amount // (accured_stake_amount * self.decimals)
-        percent = grades[0][1]
-        for grade in reversed(grades):
-            if stake_amount_rate >= grade[0]:
-                percent = grade[1]
-                break
+        percent = delegator_stake_state.get_core_stake_grade_table().lookup(stake_amount_rate)
 
         if percent == constants.PERCENT_DECIMALS:
             return claimable_reward, unclaimable_reward
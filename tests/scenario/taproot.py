@@ -0,0 +1,164 @@
+import hashlib
+import random
+from functools import lru_cache
+from ecdsa import SECP256k1
+from ecdsa.ellipticcurve import PointJacobi
+
+TAPSCRIPT_LEAF_VERSION = 0xc0
+TAP_TEMPLATE_POOL_SIZE = 64
+SECP256K1_P = SECP256k1.curve.p()
+SECP256K1_ORDER = SECP256k1.order
+
+
+@lru_cache(maxsize=None)
+def _tag_prefix(tag: str):
+    # sha256 state after sha256(tag) || sha256(tag), copied for every tagged hash
+    tag_hash = hashlib.sha256(tag.encode("utf-8")).digest()
+    return hashlib.sha256(tag_hash + tag_hash)
+
+
+def tagged_hash(tag: str, data: bytes) -> bytes:
+    h = _tag_prefix(tag).copy()
+    h.update(data)
+    return h.digest()
+
+
+def ser_script(script: bytes) -> bytes:
+    # compact size length prefix, tapleaf scripts are far below 0xfd bytes in the scenarios
+    length = len(script)
+    if length < 0xfd:
+        return bytes([length]) + script
+    return b'\xfd' + length.to_bytes(2, 'little') + script
+
+
+@lru_cache(maxsize=4096)
+def tapleaf_hash(script: bytes, leaf_version=TAPSCRIPT_LEAF_VERSION) -> bytes:
+    return tagged_hash("TapLeaf", bytes([leaf_version]) + ser_script(script))
+
+
+def tapbranch_hash(left: bytes, right: bytes) -> bytes:
+    if right < left:
+        left, right = right, left
+    return tagged_hash("TapBranch", left + right)
+
+
+def x_only(public_key: bytes) -> bytes:
+    # 32 byte x-only key of a compressed public key, BIP340 takes the point with even y
+    assert len(public_key) in (32, 33), f"Invalid public key length {len(public_key)}"
+    return public_key[-32:]
+
+
+def lift_x(x_only_key: bytes) -> PointJacobi:
+    x = int.from_bytes(x_only_key, 'big')
+    c = (pow(x, 3, SECP256K1_P) + 7) % SECP256K1_P
+    y = pow(c, (SECP256K1_P + 1) // 4, SECP256K1_P)
+    assert y * y % SECP256K1_P == c, f"Invalid x-only key {x_only_key.hex()}"
+    if y & 1:
+        y = SECP256K1_P - y
+    return PointJacobi(SECP256k1.curve, x, y, 1, SECP256K1_ORDER)
+
+
+def taproot_tweak(internal_key: bytes, merkle_root: bytes):
+    # BIP341 taproot_tweak_pubkey, returns (32 byte output key, parity of its y)
+    tweak = int.from_bytes(tagged_hash("TapTweak", internal_key + merkle_root), 'big')
+    assert tweak < SECP256K1_ORDER, "Invalid taproot tweak"
+    q = SECP256k1.generator * tweak + lift_x(internal_key)
+    return q.x().to_bytes(32, 'big'), q.y() & 1
+
+
+class TapTree:
+    # tapscript tree over an ordered list of leaf scripts. adjacent nodes are paired level
+    # by level and an unpaired last node is carried up unchanged, so every leaf gets a
+    # valid merkle path. all levels are kept, paths are read off without rehashing
+    def __init__(self, scripts: list, leaf_version=TAPSCRIPT_LEAF_VERSION):
+        assert len(scripts) > 0, "Tap tree needs at least one leaf"
+        self.scripts = [bytes(script) for script in scripts]
+        self.leaf_version = leaf_version
+
+        self.levels = [[tapleaf_hash(script, leaf_version) for script in self.scripts]]
+        while len(self.levels[-1]) > 1:
+            nodes = self.levels[-1]
+            parents = [tapbranch_hash(nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+            if len(nodes) % 2 == 1:
+                parents.append(nodes[-1])
+            self.levels.append(parents)
+
+    def __len__(self):
+        return len(self.scripts)
+
+    @property
+    def merkle_root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def get_proof(self, index: int) -> list:
+        # sibling hashes from the leaf up to the root
+        assert 0 <= index < len(self.scripts), f"Leaf index {index} out of range"
+        proof = []
+        for nodes in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(nodes):
+                proof.append(nodes[sibling])
+            index //= 2
+        return proof
+
+    def control_block(self, internal_key: bytes, output_parity: int, index: int) -> bytes:
+        return bytes([self.leaf_version | output_parity]) + internal_key + b''.join(self.get_proof(index))
+
+
+def verify_script_path(output_key: bytes, script: bytes, control_block: bytes) -> bool:
+    # BIP341 script path commitment check of a witness (script, control block)
+    if len(control_block) < 33 or (len(control_block) - 33) % 32 != 0:
+        return False
+    leaf_version = control_block[0] & 0xfe
+    internal_key = control_block[1:33]
+    node = tapleaf_hash(bytes(script), leaf_version)
+    for offset in range(33, len(control_block), 32):
+        node = tapbranch_hash(node, control_block[offset:offset + 32])
+    tweaked_key, parity = taproot_tweak(internal_key, node)
+    return tweaked_key == output_key and parity == control_block[0] & 1
+
+
+class TapTemplatePool:
+    # leaf scripts of the lock script templates P2TR_SCRIPT trees are drawn from. every
+    # template instantiates a payment with fresh keys, so a fixed number is built once per
+    # campaign seed and their leaf hashes stay in the tapleaf_hash cache
+    def __init__(self, size=TAP_TEMPLATE_POOL_SIZE):
+        self.size = size
+        self.scripts = []
+
+    def draw(self, count: int) -> list:
+        if len(self.scripts) < self.size:
+            self.__fill()
+        return random.sample(self.scripts, count)
+
+    def reset(self):
+        self.scripts = []
+
+    def __fill(self):
+        from . import payment
+
+        # P2PKH P2MS P2SH-P2PKH, P2SH-P2MS, P2SH-P2WPKH, P2SH-P2WSH, P2WPKH, P2WSH ,P2WSH-P2MS
+        avaliable_lock_script_list = ["P2PKH", "P2MS", "P2SH", "P2WPKH", "P2WSH"]
+        avaliable_redeem_script_map = {
+            "P2SH": ["P2PKH", "P2MS", "P2WPKH", "P2WSH"],
+            "P2WSH": ["P2MS"]
+        }
+        while len(self.scripts) < self.size:
+            lock_script_type = random.choice(avaliable_lock_script_list)
+            PaymentClass = getattr(payment, lock_script_type)
+            redeem_script_types = avaliable_redeem_script_map.get(lock_script_type)
+            if redeem_script_types is None:
+                paymentInst = PaymentClass()
+            else:
+                paymentInst = PaymentClass(redeem_script_type=random.choice(redeem_script_types))
+
+            script = bytes(paymentInst.get_script_pubkey())
+            tapleaf_hash(script)
+            self.scripts.append(script)
+
+
+template_pool = TapTemplatePool()
+
+
+def random_leaf_scripts(min_count=4, max_count=8) -> list:
+    return template_pool.draw(random.randint(min_count, max_count))
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from brownie import *
 from . import chain_checker
 from . import chain_handler
+from . import task_profiler
 from .account_mgr import AccountMgr
 
 addr_to_name = AccountMgr.addr_to_name
@@ -20,7 +21,7 @@ class TaskHandler(ABC):
     def init_checker(self):
         assert self.chain is not None
         assert self.task is not None
-        self.checker = chain_checker.ChainChecker(self.chain, self.task)
+        self.checker = task_profiler.wrap_checker(chain_checker.ChainChecker(self.chain, self.task))
 
     def init_handler(self):
         assert self.chain is not None
@@ -0,0 +1,194 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+from brownie import *
+
+RPC_COUNTER_NAME = "scenario_task_profiler"
+CALL_METHODS = {"eth_call", "eth_estimateGas"}
+
+# the profiler of the executing scenario, checkers created while it is set are timed
+active_profiler = None
+
+
+class TaskStats:
+    def __init__(self):
+        self.count = 0
+        self.wall_time = 0
+        self.checker_time = 0
+        self.call_count = 0
+        self.tx_count = 0
+        self.gas_used = 0
+
+    def add(self, stats):
+        self.count += stats.count
+        self.wall_time += stats.wall_time
+        self.checker_time += stats.checker_time
+        self.call_count += stats.call_count
+        self.tx_count += stats.tx_count
+        self.gas_used += stats.gas_used
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "wall_time": round(self.wall_time, 6),
+            "checker_time": round(self.checker_time, 6),
+            "call_count": self.call_count,
+            "tx_count": self.tx_count,
+            "gas_used": self.gas_used
+        }
+
+
+class ProfiledChecker:
+    # times every check_* call of the wrapped ChainChecker
+    def __init__(self, checker, profiler):
+        self.checker = checker
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        attr = getattr(self.checker, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self.profiler.add_checker_time(time.perf_counter() - start_time)
+
+        return timed
+
+
+def wrap_checker(checker):
+    if active_profiler is None:
+        return checker
+
+    return ProfiledChecker(checker, active_profiler)
+
+
+class TaskProfiler:
+    # collects wall time, eth_call/transaction counts, gas used and checker time
+    # per task class and per round while a scenario executes, and writes
+    # {report_prefix}.json, {report_prefix}.csv and optionally a collapsed-stack
+    # file ({report_prefix}.folded) that flame graph tools render directly
+    def __init__(self, report_prefix, flame=False):
+        self.report_prefix = report_prefix
+        self.flame = flame
+
+        # task name => stats
+        self.task_stats = {}
+
+        # round => task name => stats
+        self.round_stats = {}
+
+        self.current = None
+        self.call_count = 0
+
+    def start(self):
+        global active_profiler
+        assert active_profiler is None, "Another task profiler is active"
+
+        active_profiler = self
+        web3.middleware_onion.add(self.__rpc_counter, RPC_COUNTER_NAME)
+
+    def stop(self):
+        global active_profiler
+        if active_profiler is not self:
+            return
+
+        active_profiler = None
+        web3.middleware_onion.remove(RPC_COUNTER_NAME)
+
+    @contextmanager
+    def profile_task(self, round, task_name):
+        stats = TaskStats()
+        stats.count = 1
+
+        self.current = stats
+        call_count = self.call_count
+        tx_count = len(history)
+        start_time = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.wall_time = time.perf_counter() - start_time
+            stats.call_count = self.call_count - call_count
+
+            receipts = history[tx_count:]
+            stats.tx_count = len(receipts)
+            stats.gas_used = sum(receipt.gas_used for receipt in receipts)
+
+            self.current = None
+            self.__add_stats(round, task_name, stats)
+
+    def add_checker_time(self, seconds):
+        if self.current is not None:
+            self.current.checker_time += seconds
+
+    def get_task_stats(self):
+        return self.task_stats
+
+    def get_round_stats(self):
+        return self.round_stats
+
+    def export(self):
+        self.__export_json(f"{self.report_prefix}.json")
+        self.__export_csv(f"{self.report_prefix}.csv")
+        if self.flame:
+            self.__export_flame(f"{self.report_prefix}.folded")
+
+    def __add_stats(self, round, task_name, stats):
+        if self.task_stats.get(task_name) is None:
+            self.task_stats[task_name] = TaskStats()
+        self.task_stats[task_name].add(stats)
+
+        if self.round_stats.get(round) is None:
+            self.round_stats[round] = {}
+        if self.round_stats[round].get(task_name) is None:
+            self.round_stats[round][task_name] = TaskStats()
+        self.round_stats[round][task_name].add(stats)
+
+    def __rpc_counter(self, make_request, w3):
+        def middleware(method, params):
+            if method in CALL_METHODS:
+                self.call_count += 1
+
+            return make_request(method, params)
+
+        return middleware
+
+    def __export_json(self, write_file):
+        report = {
+            "tasks": {
+                task_name: stats.to_dict() for task_name, stats in self.task_stats.items()
+            },
+            "rounds": {
+                round: {
+                    task_name: stats.to_dict() for task_name, stats in tasks.items()
+                } for round, tasks in self.round_stats.items()
+            }
+        }
+
+        with open(write_file, 'w') as json_file:
+            json.dump(report, json_file, indent=4)
+
+    def __export_csv(self, write_file):
+        fields = ["round", "task"] + list(TaskStats().to_dict().keys())
+        with open(write_file, 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=fields)
+            writer.writeheader()
+            for round, tasks in self.round_stats.items():
+                for task_name, stats in tasks.items():
+                    writer.writerow({"round": round, "task": task_name, **stats.to_dict()})
+
+    def __export_flame(self, write_file):
+        # one "scenario;round;task;phase microseconds" line per stack
+        with open(write_file, 'w') as flame_file:
+            for round, tasks in self.round_stats.items():
+                for task_name, stats in tasks.items():
+                    stack = f"scenario;round_{round};{task_name}"
+                    task_us = int((stats.wall_time - stats.checker_time) * 10 ** 6)
+                    checker_us = int(stats.checker_time * 10 ** 6)
+                    flame_file.write(f"{stack};execute {task_us}\n")
+                    flame_file.write(f"{stack};check {checker_us}\n")
@@ -8,6 +8,7 @@ from .delegate import delegate_btc_lst_success, delegate_btc_success, set_block_
     RoundRewardManager
 from .utils import expect_event, padding_left, update_system_contract_address
 from .common import turn_round, get_current_round, register_candidate, set_round_tag
+from .grade_table import GradeTable, MAX_GRADE_COUNT, build_grades, get_probe_values
 
 TOTAL_REWARD = None
 TX_FEE = 100
@@ -523,6 +524,27 @@ def test_get_grades(btc_agent, btc_stake):
     assert old_grades == btc_agent.getGrades()
 
 
+@pytest.mark.parametrize("grade_active", [True, False])
+def test_get_max_grade_percentage(btc_agent, grade_active):
+    assert btc_agent.getMaxGradePercentage() == Utils.DENOMINATOR
+    stake_manager.set_lp_rates([[0, 1000], [5000, 15000]])
+    stake_manager.set_is_stake_hub_active(grade_active)
+    grade_percentage = 15000 if grade_active else Utils.DENOMINATOR
+    assert btc_agent.getMaxGradePercentage() == grade_percentage
+    btc_agent.setPercentage(12000)
+    assert btc_agent.getMaxGradePercentage() == max(grade_percentage, 12000)
+
+
+@pytest.mark.parametrize("grade_count", [1, 4, MAX_GRADE_COUNT])
+def test_grade_percentage_lookup_matches_grade_table(btc_agent, grade_count):
+    grades = build_grades(grade_count, 1000, Utils.DENOMINATOR // MAX_GRADE_COUNT)
+    update_system_contract_address(btc_agent, gov_hub=accounts[0])
+    btc_agent.updateParam('grades', rlp.encode(grades))
+    table = GradeTable(grades)
+    for stake_rate in get_probe_values(table, int(1e8)):
+        assert btc_agent.getGradePercentageMock(stake_rate) == table.lookup(stake_rate)
+
+
 def test_update_param_failed(btc_agent):
     update_system_contract_address(btc_agent, gov_hub=accounts[0])
     with brownie.reverts("UnsupportedGovParam: error key"):
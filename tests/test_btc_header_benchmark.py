@@ -0,0 +1,82 @@
+import os
+import pytest
+from web3 import Web3
+from brownie import *
+from .common import register_relayer
+from .btc_block_data import btc_block_data
+from .btc_header_chain import HeaderChainGenerator, BlockHeader, DIFFICULTY_ADJUSTMENT_INTERVAL
+from .btc_header_benchmark import HeaderGasBenchmark, PATH_TIP, PATH_FORK, PATH_REORG, PATH_FAILED, FLAG_POWER, \
+    FLAG_REWARD
+from .btc_header_verifier import CONFIRM_BLOCK
+
+# directory the gas reports are written to, pytest's tmp_path when unset
+REPORT_DIR_ENV = "HEADER_GAS_REPORT_DIR"
+RELAYER_COUNT = 4
+
+
+@pytest.fixture(scope="module", autouse=True)
+def set_up(system_reward, btc_light_client):
+    for relayer in accounts[:RELAYER_COUNT]:
+        register_relayer(relayer)
+    accounts[0].transfer(system_reward.address, Web3.to_wei(10, 'ether'))
+
+
+@pytest.fixture()
+def benchmark(btc_light_client):
+    gas_price = btc_light_client.storeBlockGasPrice()
+    if gas_price == 0:
+        gas_price = btc_light_client.INIT_STORE_BLOCK_GAS_PRICE()
+    return lambda: HeaderGasBenchmark(btc_light_client, accounts[:RELAYER_COUNT], gas_price)
+
+
+def write_report(benchmark, tmp_path, name):
+    report_dir = os.environ.get(REPORT_DIR_ENV, str(tmp_path))
+    os.makedirs(report_dir, exist_ok=True)
+    return benchmark.write_report(os.path.join(report_dir, f"{name}.json"))
+
+
+def test_header_gas_mainnet_replay(btc_light_client, benchmark, tmp_path):
+    # every third header is bound to a candidate so that the miner power path is taken
+    block_hashes = [BlockHeader.deserialize(bytes.fromhex(h[2:])).block_hash for h in btc_block_data[::3]]
+    btc_light_client.setBlockBindings(block_hashes, [accounts[5].address] * len(block_hashes),
+                                      [accounts[6].address] * len(block_hashes))
+
+    bench = benchmark()
+    records = bench.store_all(btc_block_data)
+    report = write_report(bench, tmp_path, "mainnet_replay")
+
+    assert btc_light_client.getChainTip() == '0x' + bench.verifier.get_chain_tip().hex()
+    assert all(record.path == PATH_TIP for record in records)
+    assert records[-1].height % DIFFICULTY_ADJUSTMENT_INTERVAL == 0
+    assert f"{PATH_TIP}+{FLAG_POWER}" in report['paths']
+    assert sum(FLAG_REWARD in record.flags for record in records) == len(records) // btc_light_client.roundSize()
+    assert report['overall']['count'] == len(btc_block_data)
+    assert report['worst'][0]['gas_used'] == report['overall']['max']
+
+
+def test_header_gas_synthetic_forks(btc_light_client, benchmark, tmp_path):
+    generator = HeaderChainGenerator(DIFFICULTY_ADJUSTMENT_INTERVAL * 400 - 20, chain.time())
+    btc_light_client.developmentInitRegtest(generator.get_init_header_hex(), generator.init_block.height)
+    main_blocks = generator.extend(40, bindings=lambda height: (accounts[5].address, accounts[6].address))
+    btc_light_client.setBlockBindings(*HeaderChainGenerator.get_bindings(main_blocks))
+
+    headers = [block.header.to_hex() for block in main_blocks]
+    # a fork that stays below the tip, then heavier forks rewriting 1 .. CONFIRM_BLOCK + 2 blocks
+    headers += [block.header.to_hex() for block in generator.extend(2, parent=main_blocks[-4])]
+    for depth in range(1, CONFIRM_BLOCK + 3):
+        fork = generator.extend(depth + 1, parent=generator.get_ancestor(generator.tip, generator.tip.height - depth))
+        headers += [block.header.to_hex() for block in fork]
+    wrong_bits = generator.extend(1)[0]
+    wrong_bits.header.bits -= 1
+    headers.append(wrong_bits.header.mine().to_hex())
+
+    bench = benchmark()
+    records = bench.store_all(headers)
+    report = write_report(bench, tmp_path, "synthetic_forks")
+
+    assert btc_light_client.getChainTip() == '0x' + bench.verifier.get_chain_tip().hex()
+    paths = {record.path for record in records}
+    assert paths == {PATH_TIP, PATH_FORK, PATH_REORG, PATH_FAILED}
+    reorg_depths = sorted({record.reorg_depth for record in records if record.path == PATH_REORG})
+    assert reorg_depths == list(range(1, CONFIRM_BLOCK + 1))
+    assert f"{PATH_TIP}+{FLAG_POWER}" in report['paths']
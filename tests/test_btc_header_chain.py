@@ -0,0 +1,101 @@
+import pytest
+from web3 import Web3
+from brownie import *
+from brownie.network import gas_price
+from .utils import expect_event
+from .common import register_relayer
+from .btc_header_chain import HeaderChainGenerator, DIFFICULTY_ADJUSTMENT_INTERVAL
+
+ROUND_INTERVAL = 86400
+CONFIRM_BLOCK = 6
+
+
+def teardown_module():
+    gas_price(False)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def set_up(system_reward, btc_light_client):
+    register_relayer()
+    accounts[0].transfer(system_reward.address, Web3.to_wei(10, 'ether'))
+    store_block_header_tx_gas_price = btc_light_client.storeBlockGasPrice()
+    if store_block_header_tx_gas_price == 0:
+        store_block_header_tx_gas_price = btc_light_client.INIT_STORE_BLOCK_GAS_PRICE()
+    gas_price(store_block_header_tx_gas_price)
+
+
+def init_regtest_chain(btc_light_client, init_height):
+    generator = HeaderChainGenerator(init_height, chain.time())
+    btc_light_client.developmentInitRegtest(generator.get_init_header_hex(), init_height)
+    return generator
+
+
+def store_blocks(btc_light_client, blocks):
+    for block in blocks:
+        tx = btc_light_client.storeBlockHeader(block.header.to_hex())
+        expect_event(tx, 'StoreHeader', {'height': block.height})
+
+
+def test_store_synthetic_chain(btc_light_client):
+    generator = init_regtest_chain(btc_light_client, DIFFICULTY_ADJUSTMENT_INTERVAL * 400 - 3)
+    blocks = generator.extend(10)
+    store_blocks(btc_light_client, blocks)
+
+    assert btc_light_client.getChainTip() == generator.tip.header.block_hash
+    assert btc_light_client.getChainTipHeight() == generator.tip.height
+    assert btc_light_client.getScore(generator.tip.header.block_hash) == generator.tip.score
+    boundary = generator.get_ancestor(generator.tip, DIFFICULTY_ADJUSTMENT_INTERVAL * 400)
+    assert btc_light_client.adjustmentHashes(400) == boundary.header.block_hash
+
+
+def test_store_synthetic_fork(btc_light_client):
+    generator = init_regtest_chain(btc_light_client, 800000)
+    main_blocks = generator.extend(5)
+    store_blocks(btc_light_client, main_blocks)
+
+    # a shorter fork is stored but does not move the tip
+    fork_blocks = generator.extend(2, parent=main_blocks[1])
+    store_blocks(btc_light_client, fork_blocks)
+    assert btc_light_client.getChainTip() == main_blocks[-1].header.block_hash
+
+    # a heavier fork reorgs the main chain
+    fork_blocks += generator.extend(2, parent=fork_blocks[-1])
+    store_blocks(btc_light_client, fork_blocks[2:])
+    assert generator.tip is fork_blocks[-1]
+    assert btc_light_client.getChainTip() == fork_blocks[-1].header.block_hash
+    for block in main_blocks[:2] + fork_blocks:
+        assert btc_light_client.height2HashMap(block.height) == block.header.block_hash
+
+
+@pytest.mark.parametrize("init_height,return_code", [
+    (800000, 10010),
+    (DIFFICULTY_ADJUSTMENT_INTERVAL * 400 - 1, 10020)
+])
+def test_store_synthetic_wrong_bits(btc_light_client, init_height, return_code):
+    generator = init_regtest_chain(btc_light_client, init_height)
+    block = generator.extend(1)[0]
+    block.header.bits -= 1
+    block.header.mine()
+    tx = btc_light_client.storeBlockHeader(block.header.to_hex())
+    expect_event(tx, "StoreHeaderFailed", {"returnCode": return_code})
+
+
+def test_synthetic_chain_miner_power(btc_light_client):
+    candidate = accounts[1].address
+    miners = accounts[2:4]
+    generator = init_regtest_chain(btc_light_client, 800000)
+    blocks = generator.extend(
+        CONFIRM_BLOCK + 4,
+        bindings=lambda height: (candidate, miners[height % len(miners)].address)
+    )
+    btc_light_client.setBlockBindings(*HeaderChainGenerator.get_bindings(blocks))
+    store_blocks(btc_light_client, blocks)
+
+    # power is added for the blocks CONFIRM_BLOCK below each new tip
+    powered = blocks[:len(blocks) - CONFIRM_BLOCK]
+    assert btc_light_client.getCandidate(powered[0].header.block_hash) == candidate
+    round_tags = {block.header.time // ROUND_INTERVAL for block in powered}
+    powered_miners = []
+    for round_tag in round_tags:
+        powered_miners += btc_light_client.getRoundMiners(round_tag, candidate)
+    assert sorted(powered_miners) == sorted(block.reward_addr for block in powered)
@@ -0,0 +1,117 @@
+import random
+import pytest
+import brownie
+from web3 import Web3
+from brownie import *
+from brownie.network import gas_price
+from .utils import expect_event
+from .common import register_relayer
+from .btc_header_chain import HeaderChainGenerator, BlockHeader, REGTEST_BITS, target_from_bits
+from .btc_header_verifier import HeaderVerifier, ERR_DIFFICULTY, ERR_RETARGET, ERR_NO_PREV_BLOCK, ERR_PROOF_OF_WORK
+
+
+def teardown_module():
+    gas_price(False)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def set_up(system_reward, btc_light_client):
+    register_relayer()
+    accounts[0].transfer(system_reward.address, Web3.to_wei(10, 'ether'))
+    store_block_header_tx_gas_price = btc_light_client.storeBlockGasPrice()
+    if store_block_header_tx_gas_price == 0:
+        store_block_header_tx_gas_price = btc_light_client.INIT_STORE_BLOCK_GAS_PRICE()
+    gas_price(store_block_header_tx_gas_price)
+
+
+def init_regtest_chain(btc_light_client, init_height):
+    generator = HeaderChainGenerator(init_height, chain.time())
+    btc_light_client.developmentInitRegtest(generator.get_init_header_hex(), init_height)
+    verifier = HeaderVerifier(regtest=True)
+    verifier.init(generator.init_block.header.serialize(), init_height)
+    return generator, verifier
+
+
+def store_and_compare(btc_light_client, verifier, header: BlockHeader):
+    expected = verifier.store_headers([header.serialize()])[0]
+    if isinstance(expected, str):
+        with brownie.reverts(expected):
+            btc_light_client.storeBlockHeader(header.to_hex())
+        return expected
+
+    tx = btc_light_client.storeBlockHeader(header.to_hex())
+    if expected == 0:
+        expect_event(tx, 'StoreHeader', {'blockHash': header.block_hash})
+    else:
+        expect_event(tx, 'StoreHeaderFailed', {'returnCode': expected})
+    return expected
+
+
+def make_invalid_pow_header(parent):
+    header = BlockHeader(parent.header.version, parent.hash, bytes(32), parent.header.time + 600, REGTEST_BITS)
+    target = target_from_bits(REGTEST_BITS)
+    while int.from_bytes(header.hash, 'little') <= target:
+        header.nonce += 1
+    return header
+
+
+def make_wrong_bits_header(parent):
+    return BlockHeader(parent.header.version, parent.hash, bytes(32), parent.header.time + 600,
+                       REGTEST_BITS - 1).mine()
+
+
+def test_verifier_parity(btc_light_client):
+    generator, verifier = init_regtest_chain(btc_light_client, 2016 * 400 - 4)
+    main_blocks = generator.extend(4)
+    fork_blocks = generator.extend(3, parent=main_blocks[0])
+    orphan = HeaderChainGenerator(800000, chain.time()).extend(1)[0]
+
+    headers = [b.header for b in main_blocks + fork_blocks]
+    headers += [
+        main_blocks[1].header,
+        orphan.header,
+        make_invalid_pow_header(main_blocks[1]),
+        make_wrong_bits_header(main_blocks[1]),
+        make_wrong_bits_header(main_blocks[2]),
+        generator.init_block.header
+    ]
+    results = [store_and_compare(btc_light_client, verifier, header) for header in headers]
+    assert results == [0] * 7 + ["can't sync duplicated header", ERR_NO_PREV_BLOCK, ERR_PROOF_OF_WORK,
+                                 ERR_DIFFICULTY, ERR_RETARGET, ERR_NO_PREV_BLOCK]
+    assert btc_light_client.getChainTip() == '0x' + verifier.get_chain_tip().hex()
+    assert btc_light_client.highScore() == verifier.high_score
+
+
+def test_verifier_seeded_from_chain(btc_light_client):
+    generator, _ = init_regtest_chain(btc_light_client, 800000)
+    main_blocks = generator.extend(8)
+    generator.extend(2, parent=main_blocks[4])
+    for block in sorted(generator.blocks.values(), key=lambda b: b.height)[1:]:
+        btc_light_client.storeBlockHeader(block.header.to_hex())
+
+    verifier = HeaderVerifier.from_light_client(btc_light_client)
+    assert verifier.regtest is True
+    assert verifier.get_chain_tip() == generator.tip.header.hash[::-1]
+    assert verifier.get_chain_tip_height() == generator.tip.height
+    assert verifier.high_score == generator.tip.score
+    for block in main_blocks:
+        assert verifier.height2hash[block.height] == block.header.hash[::-1]
+
+    next_block = generator.extend(1)[0]
+    assert verifier.verify_header(next_block.header.serialize()) == 0
+    assert verifier.verify_header(make_wrong_bits_header(main_blocks[-1]).serialize()) == ERR_DIFFICULTY
+
+
+def test_verifier_sort_headers(btc_light_client):
+    generator, verifier = init_regtest_chain(btc_light_client, 800000)
+    main_blocks = generator.extend(10)
+    generator.extend(3, parent=main_blocks[5])
+
+    headers = [block.header.serialize() for block in list(generator.blocks.values())[1:]]
+    random.shuffle(headers)
+    headers = verifier.sort_headers(headers)
+    assert verifier.store_headers(headers) == [0] * len(headers)
+    for header in headers:
+        tx = btc_light_client.storeBlockHeader('0x' + header.hex())
+        expect_event(tx, 'StoreHeader')
+    assert btc_light_client.getChainTip() == generator.tip.header.block_hash
@@ -165,6 +165,15 @@ def test_get_round_miners(btc_light_client):
         assert miner in miners
 
 
+def test_get_round_miner_powers(btc_light_client):
+    block_miners = [accounts[1], accounts[2], accounts[1], accounts[3], accounts[1], accounts[2]]
+    btc_light_client.setMiners(1, accounts[0], block_miners)
+    assert btc_light_client.getRoundMinerPowers(1, accounts[0]) == (accounts[1:4], [3, 2, 1])
+    btc_light_client.setMiners(1, accounts[0], accounts[3:4])
+    assert btc_light_client.getRoundMinerPowers(1, accounts[0]) == (accounts[3:4], [1])
+    assert btc_light_client.getRoundMinerPowers(1, accounts[1]) == ((), ())
+
+
 def test_get_round_candidates(btc_light_client):
     candidates = accounts[:2]
     btc_light_client.setCandidates(1, candidates)
@@ -174,6 +183,18 @@ def test_get_round_candidates(btc_light_client):
         assert c in result
 
 
+def test_set_tx_confirmations(btc_light_client):
+    txids = ['0x' + f'{i:064x}' for i in range(1, 4)]
+    timestamps = [1736956800 + i for i in range(3)]
+    btc_light_client.setTxConfirmations(txids, timestamps)
+    for txid, timestamp in zip(txids, timestamps):
+        assert btc_light_client.checkTxProof(txid, 1, 6, [], 0) is True
+        assert btc_light_client.checkTxProofAndGetTime(txid, 1, 6, [], 0) == (True, timestamp)
+
+    btc_light_client.setTxConfirmations(txids[:1], [0])
+    assert btc_light_client.checkTxProofAndGetTime(txids[0], 1, 6, [], 0) == (False, 0)
+
+
 def test_store_btc_block_gasprice_limit_failed(btc_light_client):
     gas_price(store_block_header_tx_gas_price // 2)
     block_data = btc_block_data[-2]
@@ -4,6 +4,7 @@ from web3 import constants
 from .common import *
 from .delegate import *
 from .utils import *
+from .btc_stake_factory import BtcStakeFactory
 
 BTC_VALUE = 2000
 TX_FEE = 100
@@ -112,6 +113,25 @@ def test_delegate_lst_btc_p2sh_script_success(btc_lst_stake, lst_token, gov_hub,
     assert tracker.delta() == TOTAL_REWARD * 3
 
 
+def test_batch_delegate_btc_lst_success(btc_lst_stake, lst_token, gov_hub):
+    lock_scripts = ['a914' + random_address()[2:].lower() + '87' for _ in range(2)]
+    for lock_script in lock_scripts:
+        btc_lst_stake.updateParam('add', '0x' + lock_script, {'from': gov_hub.address})
+    delegators = accounts[10:15]
+    balances = [lst_token.balanceOf(delegator) for delegator in delegators]
+    realtime_amount = btc_lst_stake.realtimeAmount()
+    factory = BtcStakeFactory()
+    stakes = factory.make_lst_stakes(20, delegators, lock_scripts)
+    receipts = factory.delegate(stakes)
+    assert len(receipts) == len(stakes)
+    for stake in stakes:
+        assert __get_btc_tx_map(stake.tx_id)[0] == stake.amount
+    for delegator, balance in zip(delegators, balances):
+        amount = sum(stake.amount for stake in stakes if stake.delegator == delegator)
+        assert lst_token.balanceOf(delegator) == balance + amount
+    assert btc_lst_stake.realtimeAmount() == realtime_amount + sum(stake.amount for stake in stakes)
+
+
 def test_delegate_lst_btc_p2pkh_script_success(btc_lst_stake, lst_token, gov_hub, set_candidate, stake_hub, btc_agent):
     operators, consensuses = set_candidate
     turn_round()
@@ -2115,6 +2135,24 @@ def test_on_token_transfer_success(btc_agent, btc_lst_stake, lst_token, set_cand
     assert tracker1.delta() == TOTAL_REWARD * 3 // 2
 
 
+def test_transfer_gas_bounded_after_long_reward_gap(btc_lst_stake, lst_token, set_candidate):
+    # accrued reward lookups binary search the rewarded round ranges instead of walking every round of the gap
+    reward_gap = 500
+    operators, consensuses = set_candidate
+    turn_round()
+    delegate_btc_lst_success(accounts[0], BTC_VALUE, LOCK_SCRIPT, percentage=Utils.DENOMINATOR)
+    delegate_btc_lst_success(accounts[2], BTC_VALUE, LOCK_SCRIPT, percentage=Utils.DENOMINATOR)
+    turn_round(consensuses, round_count=3)
+    end_rounds = btc_lst_stake.getContinuousRewardEndRounds()
+    assert end_rounds[-1] == btc_lst_stake.roundTag() - 1
+    tx = lst_token.transfer(accounts[1], BTC_VALUE // 2, {'from': accounts[0]})
+    short_gap_gas = tx.gas_used
+    btc_lst_stake.setRoundTag(btc_lst_stake.roundTag() + reward_gap)
+    tx = lst_token.transfer(accounts[3], BTC_VALUE // 2, {'from': accounts[2]})
+    assert tx.gas_used - short_gap_gas < 20000
+    assert btc_lst_stake.rewardMap(accounts[2])[0] == btc_lst_stake.rewardMap(accounts[0])[0] > 0
+
+
 def test_only_lst_token_can_call_on_token_transfer(btc_lst_stake, lst_token, set_candidate):
     with brownie.reverts("only btc lst token can call this function"):
         btc_lst_stake.onTokenTransfer(accounts[0], accounts[1], BTC_VALUE)
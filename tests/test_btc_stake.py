@@ -7,6 +7,8 @@ from .calc_reward import set_delegate, parse_delegation
 from .common import register_candidate, turn_round, get_current_round, set_round_tag, stake_hub_claim_reward
 from .delegate import *
 from .utils import *
+from .btc_stake_factory import BtcStakeFactory
+from .grade_table import GradeTable, MAX_GRADE_COUNT, build_grades, get_probe_values
 
 stake_manager = StakeManager()
 
@@ -15,6 +17,7 @@ BTC_VALUE = 2000
 FEE = 0
 STAKE_ROUND = 3
 TOTAL_REWARD = 0
+RECEIPT_GAS_COUNT = 10
 # BTC delegation-related
 PUBLIC_KEY = "0223dd766d6e38eaf9c044dcb18d8221fe8c9a5763ca331e93fadc8f55949b8e12"
 LOCK_TIME = 1736956800
@@ -217,6 +220,20 @@ def test_delegate_btc_success_public_key(btc_stake, set_candidate):
     assert tracker.delta() == TOTAL_REWARD - FEE
 
 
+def test_batch_delegate_btc_success(btc_stake, set_candidate):
+    operators, consensuses = set_candidate
+    factory = BtcStakeFactory(lock_time=LOCK_TIME)
+    stakes = factory.make_stakes(40, operators, accounts[10:20])
+    receipts = factory.delegate(stakes)
+    assert len(receipts) == len(stakes)
+    for stake in stakes:
+        assert btc_stake.receiptMap(stake.tx_id)[0] == stake.candidate
+        assert btc_stake.btcTxMap(stake.tx_id)[0] == stake.amount
+    for operator in operators:
+        amount = sum(stake.amount for stake in stakes if stake.candidate == operator)
+        assert btc_stake.candidateMap(operator)[1] == amount
+
+
 def test_delegate_btc_success_public_hash(btc_stake, set_candidate):
     operators, consensuses = set_candidate
     lock_script = __get_stake_lock_script(PUBLIC_KEY, LOCK_TIME, 'hash')
@@ -875,6 +892,36 @@ def test_btc_claim_reward_success(btc_stake, set_candidate):
     assert acc_staked_amount == BTC_VALUE * 3
 
 
+def test_packed_receipt_gas(btc_stake, set_candidate):
+    # receipts stored before packing are emulated with setLegacyReceipt, the packed ones
+    # are claimed first so that slots shared by both claims only warm up the legacy path
+    operators, consensuses = set_candidate
+    tx_ids = {}
+    delegate_gas = []
+    for delegator in accounts[:2]:
+        tx_ids[delegator] = []
+        for i in range(RECEIPT_GAS_COUNT):
+            tx = delegate_btc_success(operators[0], delegator, BTC_VALUE + i, LOCK_SCRIPT, events=True)
+            tx_ids[delegator].append(tx.events['delegated']['txid'])
+            delegate_gas.append(tx.gas_used)
+    turn_round()
+    turn_round(consensuses)
+    for tx_id in tx_ids[accounts[1]]:
+        round_tag = btc_stake.receiptMap(tx_id)['round']
+        btc_stake.setLegacyReceipt(tx_id)
+        assert btc_stake.receiptMap(tx_id)['round'] == round_tag
+    update_system_contract_address(btc_stake, btc_agent=accounts[0])
+    packed_tx = btc_stake.claimReward(accounts[0], get_current_round() - 1, True)
+    legacy_tx = btc_stake.claimReward(accounts[1], get_current_round() - 1, True)
+    assert packed_tx.return_value == legacy_tx.return_value
+    for tx_id in tx_ids[accounts[0]] + tx_ids[accounts[1]]:
+        assert btc_stake.receiptMap(tx_id)['round'] == get_current_round() - 1
+    assert packed_tx.gas_used < legacy_tx.gas_used
+    print(f"per receipt gas: delegate={sum(delegate_gas) // len(delegate_gas)}, "
+          f"claim packed={packed_tx.gas_used // RECEIPT_GAS_COUNT}, "
+          f"claim legacy={legacy_tx.gas_used // RECEIPT_GAS_COUNT}")
+
+
 @pytest.mark.parametrize("claim", [True, False])
 def test_claim_rewards_for_multiple_btc(btc_stake, set_candidate, claim):
     btc_stake.popTtlpRates()
@@ -1565,6 +1612,45 @@ def test_transfer_expired_collateral_quantity_decreases(btc_stake, set_candidate
     assert amounts == [1, BTC_VALUE + 1]
 
 
+def test_transfer_batch_matches_sequential_transfers(btc_stake, set_candidate):
+    operators, consensuses = set_candidate
+    set_last_round_tag(STAKE_ROUND)
+    tx_ids = [delegate_btc_success(operators[0], accounts[0], BTC_VALUE + i, LOCK_SCRIPT) for i in
+              range(RECEIPT_GAS_COUNT)]
+    turn_round()
+    turn_round(consensuses)
+    chain.snapshot()
+    sequential_gas = sum(btc_stake.transfer(tx_id, operators[1]).gas_used for tx_id in tx_ids)
+    sequential_state = __get_transfer_state(tx_ids, operators, consensuses)
+    chain.revert()
+    tx = btc_stake.transferBatch(tx_ids, operators[1])
+    assert [event['txid'] for event in tx.events['transferredBtc']] == tx_ids
+    assert __get_transfer_state(tx_ids, operators, consensuses) == sequential_state
+    assert tx.gas_used < sequential_gas
+    print(f"per receipt transfer gas: sequential={sequential_gas // RECEIPT_GAS_COUNT}, "
+          f"batch={tx.gas_used // RECEIPT_GAS_COUNT}")
+
+
+def test_transfer_batch_reverts_as_a_whole(btc_stake, set_candidate):
+    operators, consensuses = set_candidate
+    tx_id0 = delegate_btc_success(operators[0], accounts[0], BTC_VALUE, LOCK_SCRIPT)
+    tx_id1 = delegate_btc_success(operators[0], accounts[1], BTC_VALUE, LOCK_SCRIPT)
+    turn_round()
+    with brownie.reverts("empty txids"):
+        btc_stake.transferBatch([], operators[1])
+    with brownie.reverts("can not transfer to the same validator"):
+        btc_stake.transferBatch([tx_id0, tx_id0], operators[1])
+    with brownie.reverts("not the delegator of this btc receipt"):
+        btc_stake.transferBatch([tx_id0, tx_id1], operators[1])
+    __check_receipt_map_info(tx_id0, {
+        'candidate': operators[0],
+        'delegator': accounts[0]
+    })
+    __check_candidate_map_info(operators[1], {
+        'realtimeAmount': 0
+    })
+
+
 def test_calculate_btc_reward_success(btc_stake, set_candidate):
     operators, consensuses = set_candidate
     tx_id0 = delegate_btc_success(operators[0], accounts[0], BTC_VALUE, LOCK_SCRIPT)
@@ -1683,6 +1769,16 @@ def test_update_param_grades_success(btc_stake, grades):
         assert grades_value == grades[i]
 
 
+@pytest.mark.parametrize("grade_count", [1, 4, MAX_GRADE_COUNT])
+def test_grade_percentage_lookup_matches_grade_table(btc_stake, grade_count):
+    grades = build_grades(grade_count, 40, Utils.DENOMINATOR // MAX_GRADE_COUNT)
+    update_system_contract_address(btc_stake, gov_hub=accounts[0])
+    btc_stake.updateParam('grades', rlp.encode(grades))
+    table = GradeTable([[lock_round * Utils.ROUND_INTERVAL, percentage] for lock_round, percentage in grades])
+    for lock_duration in get_probe_values(table, 4000 * Utils.ROUND_INTERVAL):
+        assert btc_stake.getGradePercentageMock(lock_duration) == table.lookup(lock_duration)
+
+
 @pytest.mark.parametrize("grades", [
     [[0, 1], [4001, 2000]],
     [[0, 1000], [4002, 2000], [2, 4000], [30, 9000], [40, 10000]],
@@ -1854,6 +1950,17 @@ def __check_candidate_map_info(candidate, result: dict):
         assert data[i] == result[i]
 
 
+def __get_transfer_state(tx_ids, operators, consensuses):
+    # receipts, candidates and expirations right after the transfer, then the rewards they earn
+    state = [[__get_receipt_map_info(tx_id) for tx_id in tx_ids], [__get_candidate_map_info(o) for o in operators],
+             __get_round2_expire_info_map(LOCK_TIME // Utils.ROUND_INTERVAL)]
+    turn_round(consensuses, round_count=2)
+    tracker0 = get_tracker(accounts[0])
+    stake_hub_claim_reward(accounts[0])
+    state.append(tracker0.delta())
+    return state
+
+
 def __check_receipt_map_info(tx_id, result: dict):
     data = __get_receipt_map_info(tx_id)
     for i in result:
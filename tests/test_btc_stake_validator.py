@@ -0,0 +1,121 @@
+import random
+import brownie
+import pytest
+from web3 import constants
+from .common import register_candidate
+from .delegate import *
+from .utils import *
+from .btc_tx import BtcTransaction, TxIn, TxOut, serialize_batch
+from .btc_stake_validator import BtcStakeValidator, BtcLstStakeValidator, REVERT_MALFORMED_TX, REVERT_ZERO_VALUE, \
+    REVERT_WALLET_NOT_FOUND
+
+BTC_VALUE = 2000
+STAKE_ROUND = 3
+PUBLIC_KEY = "0223dd766d6e38eaf9c044dcb18d8221fe8c9a5763ca331e93fadc8f55949b8e12"
+LST_LOCK_SCRIPT = "0xa914cdf3d02dd323c14bea0bed94962496c80c09334487"
+btc_script = get_btc_script()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def set_up(candidate_hub, btc_light_client, btc_lst_stake, gov_hub, relay_hub):
+    candidate_hub.setControlRoundTimeTag(True)
+    btc_light_client.setCheckResult(True, LOCK_TIME)
+    relay_hub.setRelayerRegister(accounts[0].address, True)
+    btc_lst_stake.updateParam('add', LST_LOCK_SCRIPT, {'from': gov_hub.address})
+    set_last_round_tag(STAKE_ROUND)
+
+
+@pytest.fixture()
+def set_candidate():
+    operators = []
+    for operator in accounts[5:8]:
+        register_candidate(operator=operator)
+        operators.append(operator)
+    return operators
+
+
+def __tamper(btc_tx, old, new):
+    return btc_tx.replace(old.replace('0x', ''), new.replace('0x', ''))
+
+
+def __assert_matches_contract(check, send):
+    if check.valid:
+        tx = send()
+        assert 'delegated' in tx.events
+        return tx
+    reason = None if check.error == REVERT_MALFORMED_TX else check.error
+    with brownie.reverts(reason):
+        send()
+
+
+def test_btc_stake_validator_matches_contract(btc_stake, set_candidate):
+    operators = set_candidate
+    lock_script, pay_address = btc_script.k2_btc_script(PUBLIC_KEY, LOCK_TIME, 'key', 'p2sh')
+    wsh_lock_script, _ = btc_script.k2_btc_script(PUBLIC_KEY, LOCK_TIME, 'hash', 'p2wsh')
+    valid_tx = build_btc_tx(operators[0], accounts[0], BTC_VALUE, lock_script, LOCK_TIME)
+    cases = [
+        (valid_tx, lock_script),
+        (build_btc_tx(operators[1], accounts[1], BTC_VALUE, wsh_lock_script, LOCK_TIME, 'p2wsh'), wsh_lock_script),
+        (build_btc_tx(operators[0], accounts[0], BTC_VALUE, lock_script, LOCK_TIME, chain_id=Utils.CHAIN_ID - 1),
+         lock_script),
+        (build_btc_tx(operators[0], accounts[0], BTC_VALUE, lock_script, LOCK_TIME, version=2), lock_script),
+        (__tamper(build_btc_tx(operators[2], accounts[0], BTC_VALUE + 1, lock_script, LOCK_TIME), pay_address,
+                  'a9142d0a37f671e76a72f6dc30669ffaefa6120b798887'), lock_script),
+        (build_btc_tx(operators[2], accounts[0], BTC_VALUE + 2, lock_script, LOCK_TIME)[:-2], lock_script),
+        (build_btc_tx(operators[2], accounts[0], BTC_VALUE + 3, lock_script, LOCK_TIME) + '00', lock_script),
+        (build_btc_tx(operators[2], accounts[0], BTC_VALUE + 4, lock_script, LOCK_TIME), '05' + lock_script[2:])
+    ]
+    validator = BtcStakeValidator(Utils.CHAIN_ID, btc_stake.roundTag())
+    checks = validator.validate_batch(cases)
+    assert [check.valid for check in checks] == [True, True] + [False] * 6
+    assert checks[0].amount == BTC_VALUE
+    assert checks[0].delegator == accounts[0] and checks[0].candidate == operators[0]
+    assert checks[0].lock_time == LOCK_TIME
+    for check, (btc_tx, script) in zip(checks, cases):
+        __assert_matches_contract(check, lambda: btc_stake.delegate(btc_tx, 0, [], 0, script))
+        if check.valid:
+            validator.delegated_tx_ids.add(check.tx_id)
+            assert btc_stake.btcTxMap(check.tx_id)[0] == check.amount
+
+    check = validator.validate(valid_tx, lock_script)
+    assert check.error == "btc tx is already delegated."
+    __assert_matches_contract(check, lambda: btc_stake.delegate(valid_tx, 0, [], 0, lock_script))
+
+
+def test_btc_lst_stake_validator_matches_contract(btc_lst_stake):
+    wallets = {LST_LOCK_SCRIPT: True}
+    utxo_fee = btc_lst_stake.utxoFee()
+    cases = [
+        build_btc_lst_tx(accounts[0], BTC_VALUE, LST_LOCK_SCRIPT),
+        build_btc_lst_tx(accounts[1], BTC_VALUE, LST_LOCK_SCRIPT, chain_id=Utils.CHAIN_ID - 1),
+        build_btc_lst_tx(accounts[1], BTC_VALUE, LST_LOCK_SCRIPT, version=1),
+        build_btc_lst_tx(accounts[1], BTC_VALUE, LST_LOCK_SCRIPT, magic='5341542c'),
+        build_btc_lst_tx(accounts[1], utxo_fee * 2 - 1, LST_LOCK_SCRIPT),
+        build_btc_lst_tx(accounts[1], BTC_VALUE, btc_script.k2_btc_lst_script(PUBLIC_KEY, AddressType.P2WPKH))
+    ]
+    validator = BtcLstStakeValidator(Utils.CHAIN_ID, wallets, utxo_fee)
+    checks = validator.validate_batch([(btc_tx, LST_LOCK_SCRIPT) for btc_tx in cases])
+    assert checks[0].valid and checks[0].delegator == accounts[0] and checks[0].amount == BTC_VALUE
+    assert [check.valid for check in checks[1:]] == [False] * 5
+    assert checks[-1].error == REVERT_ZERO_VALUE
+    for check, btc_tx in zip(checks, cases):
+        __assert_matches_contract(check, lambda: btc_lst_stake.delegate(btc_tx, 0, [], 0, LST_LOCK_SCRIPT))
+
+    unknown_wallet = btc_script.k2_btc_lst_script(PUBLIC_KEY, AddressType.P2WPKH)
+    check = validator.validate(cases[-1], unknown_wallet)
+    assert check.error == REVERT_WALLET_NOT_FOUND
+    __assert_matches_contract(check, lambda: btc_lst_stake.delegate(cases[-1], 0, [], 0, unknown_wallet))
+
+
+def test_validate_buffer_without_op_return(btc_lst_stake):
+    # an lst stake without op_return is recorded on chain without a delegator
+    transactions = [BtcTransaction([TxIn(random.randbytes(32), 0, DEFAULT_SCRIPT_SIG)],
+                                   [TxOut(BTC_VALUE + i, LST_LOCK_SCRIPT)]) for i in range(3)]
+    buf, spans = serialize_batch(transactions)
+    validator = BtcLstStakeValidator(Utils.CHAIN_ID, {LST_LOCK_SCRIPT: True}, btc_lst_stake.utxoFee())
+    checks = validator.validate_buffer(buf, spans, [LST_LOCK_SCRIPT] * len(spans))
+    for i, (check, tx) in enumerate(zip(checks, transactions)):
+        assert check.valid and check.delegator == constants.ADDRESS_ZERO and check.amount == BTC_VALUE + i
+        assert check.tx_id == '0x' + tx.txid.hex()
+        receipt = btc_lst_stake.delegate(tx.to_hex(), 0, [], 0, LST_LOCK_SCRIPT)
+        assert 'delegated' in receipt.events
@@ -9,6 +9,9 @@ from brownie.network.transaction import Status, TransactionReceipt
 from .utils import random_address, expect_event, padding_left, update_system_contract_address
 from .common import register_candidate, turn_round, get_candidate
 
+# upper bound of the turnRound gas added by a candidate whose status does not change
+STABLE_CANDIDATE_GAS = 4000
+
 
 @pytest.fixture(scope="module")
 def required_margin(candidate_hub):
@@ -515,6 +518,46 @@ def test_turn_round(candidate_hub, core_agent, validator_set, required_margin):
                 core_agent.undelegateCoin(agent, _deposit, {'from': agent})
 
 
+def test_turn_round_gas_with_stable_candidates(candidate_hub, set_candidate_status, set_inactive_status):
+    __register_candidates(candidate_hub, 20, set_candidate_status)
+    __register_candidates(candidate_hub, 20, set_candidate_status | set_inactive_status)
+    turn_round(round_count=2)
+    tx = turn_round()
+    assert 'statusChanged' not in tx.events
+    base_gas = tx.gas_used
+
+    stable_count = 200
+    __register_candidates(candidate_hub, stable_count, set_candidate_status | set_inactive_status)
+    turn_round()
+    tx = turn_round()
+    assert 'statusChanged' not in tx.events
+    # a stable candidate costs its status read only, neither a jail lookup nor a status write
+    gas_per_candidate = (tx.gas_used - base_gas) // stable_count
+    print(f"turnRound gas {base_gas} -> {tx.gas_used}, {gas_per_candidate} per stable candidate")
+    assert gas_per_candidate < STABLE_CANDIDATE_GAS
+
+
+def test_turn_round_releases_jailed_candidates(candidate_hub, validator_set, set_candidate_status):
+    operators = accounts[1:4]
+    for operator in operators:
+        register_candidate(operator=operator)
+    turn_round()
+    validator_set.jailValidator(operators[0], 1, 0, {'from': operators[0]})
+    validator_set.jailValidator(operators[1], 2, 0, {'from': operators[1]})
+    assert candidate_hub.getJailedCandidates() == operators[:2]
+
+    tx = turn_round()
+    assert candidate_hub.jailMap(operators[0]) == 0
+    assert candidate_hub.getJailedCandidates() == [operators[1]]
+    assert {event['operateAddr'] for event in tx.events['statusChanged']} == set(operators[:2])
+    assert candidate_hub.getCandidate(operators[0]).dict()['status'] == set_candidate_status
+
+    tx = turn_round()
+    assert candidate_hub.jailMap(operators[1]) == 0
+    assert candidate_hub.getJailedCandidates() == []
+    assert {event['operateAddr'] for event in tx.events['statusChanged']} == set(operators[:2])
+
+
 def test_unregister_reentry(candidate_hub, required_margin, stake_hub):
     candidate_hub_proxy = UnRegisterReentry.deploy(candidate_hub.address, stake_hub, {'from': accounts[0]})
     register_candidate(operator=accounts[1])
@@ -539,3 +582,10 @@ def __delegate_coin_success(core_agent, agent, delegator, old_value, new_value):
         "amount": new_value,
         "realtimeAmount": new_value + old_value
     })
+
+
+def __register_candidates(candidate_hub, count, status):
+    for _ in range(count):
+        operator = random_address()
+        candidate_hub.registerMock(operator, random_address(), operator, 10)
+        candidate_hub.setCandidateStatus(operator, status)
@@ -5,6 +5,7 @@ from .calc_reward import set_delegate, parse_delegation
 from .common import register_candidate, turn_round, get_current_round, stake_hub_claim_reward, set_round_tag
 from .delegate import delegate_btc_success, transfer_btc_success, get_btc_script, build_btc_tx, set_last_round_tag
 from .utils import *
+from .btc_tx import BtcTransaction, TxIn, TxOut, build_batch
 
 BLOCK_REWARD = 0
 TOTAL_REWARD = 0
@@ -930,6 +931,26 @@ def test_btc_transaction_with_witness_as_output_address(btc_stake, set_candidate
     assert 'delegated' in tx.events
 
 
+def test_btc_transaction_serialize_roundtrip():
+    witness = ['3045022100e32dd040238c19321407b7dfbba957e5988755779030dbcc52e6ae22a2a20884', '0386f359aa5a42d821370bf0']
+    inputs = [TxIn(random_btc_tx_id(), 1, '', witness=witness)] + [TxIn(random_btc_tx_id(), i) for i in range(300)]
+    outputs = [TxOut(BTC_VALUE, LOCK_SCRIPT), TxOut(0, '6a' + '00' * 300)]
+    btc_tx = BtcTransaction(inputs, outputs)
+
+    raw_tx = btc_tx.to_hex()
+    assert raw_tx[8:12] == '0001'
+    parsed = BtcTransaction.deserialize(raw_tx)
+    assert parsed.to_hex() == raw_tx
+    assert parsed.inputs[0].witness == btc_tx.inputs[0].witness
+    assert [tx_in.vout for tx_in in parsed.inputs[1:]] == list(range(300))
+    assert parsed.outputs[1].script_pubkey == btc_tx.outputs[1].script_pubkey
+
+    stripped = remove_witness_data_from_raw_tx(raw_tx)
+    assert stripped == btc_tx.to_hex(with_witness=False)
+    assert get_transaction_txid(stripped) == '0x' + btc_tx.txid.hex()
+    assert build_batch([btc_tx, parsed]) == [(stripped, get_transaction_txid(stripped))] * 2
+
+
 def test_claiming_rewards_after_turn_round_failure(btc_stake, candidate_hub, btc_light_client,
                                                    set_candidate):
     block_times_tamp = 1723122315
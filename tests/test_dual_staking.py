@@ -2,7 +2,8 @@ import pytest
 import rlp
 
 from .calc_reward import set_delegate, parse_delegation, Discount, set_btc_lst_delegate
-from .common import register_candidate, turn_round, stake_hub_claim_reward, set_round_tag, execute_proposal
+from .common import register_candidate, turn_round, stake_hub_claim_reward, set_round_tag, execute_proposal, \
+    get_paid_float_reward
 from .delegate import *
 from .utils import *
 
@@ -225,9 +226,10 @@ def test_btc_reward_discount_by_core_stake_amount(btc_stake, candidate_hub, btc_
         core_reward = TOTAL_REWARD * Utils.CORE_STAKE_DECIMAL // (BTC_VALUE * core_rate) * (
                 BTC_VALUE * core_rate) // Utils.CORE_STAKE_DECIMAL
     reward, unclaimed_reward = __calc_stake_amount_discount(TOTAL_REWARD, BTC_VALUE, BTC_VALUE * core_rate)
+    float_reserve = STAKE_HUB.floatReserve()
     tx = stake_hub_claim_reward(accounts[0])
     if core_rate >= 15000:
-        assert tx.events['rewardTo']['amount'] == (reward - TOTAL_REWARD)
+        assert get_paid_float_reward(tx, float_reserve) == (reward - TOTAL_REWARD)
     assert tracker.delta() == reward + core_reward
     assert STAKE_HUB.surplus() == unclaimed_reward
 
@@ -743,6 +745,7 @@ def test_dual_staking_reward_in_current_round(btc_stake, btc_agent, stake_hub, v
             transfer_btc_success(tx_id, operators[1], accounts[0])
     turn_round(consensuses, round_count=round_count, tx_fee=tx_fee)
     tracker = get_tracker(accounts[0])
+    float_reserve = stake_hub.floatReserve()
     tx = stake_hub_claim_reward(accounts[0])
     if round_count == 0:
         assert tracker.delta() == 0
@@ -754,7 +757,7 @@ def test_dual_staking_reward_in_current_round(btc_stake, btc_agent, stake_hub, v
     else:
         assert tracker.delta() == tests['expect_btc_reward'] + total_reward
         if tests.get('claim_rewards'):
-            assert tx.events['rewardTo']['amount'] == tests['claim_rewards']
+            assert get_paid_float_reward(tx, float_reserve) == tests['claim_rewards']
         assert stake_hub.surplus() == tests['expect_reward_pool']
     turn_round(consensuses, tx_fee=tx_fee)
 
@@ -787,8 +790,9 @@ def test_dual_staking_reward_after_rounds(btc_stake, btc_agent, stake_hub, valid
             transfer_btc_success(tx_id, operators[2], accounts[0])
     turn_round(consensuses, round_count=2, tx_fee=tx_fee)
     tracker = get_tracker(accounts[0])
+    float_reserve = stake_hub.floatReserve()
     tx = stake_hub_claim_reward(accounts[0])
-    assert tx.events['rewardTo']['amount'] == tests['expect_claim_reward']
+    assert get_paid_float_reward(tx, float_reserve) == tests['expect_claim_reward']
     coin_reward = total_reward * 2
     btc_reward = tests['expect_btc_reward']
     assert tracker.delta() == btc_reward + coin_reward
@@ -2183,11 +2187,14 @@ def test_claim_reward_after_refund_surplus(stake_hub, system_reward, set_candida
     stake_hub.updateParam('surplus', hex_value)
     assert system_reward_tracker.delta() == surplus
     turn_round(consensuses, round_count=2)
+    # the extra rewards are pre-funded on turn round
+    assert stake_hub.floatReserve() == TOTAL_REWARD
     tracker = get_tracker(accounts[0])
     system_reward_tracker.update_height()
     tx = stake_hub_claim_reward(accounts[0])
-    assert tx.events['rewardTo']['amount'] == TOTAL_REWARD
-    assert system_reward_tracker.delta() == -TOTAL_REWARD
+    assert 'rewardTo' not in tx.events
+    assert system_reward_tracker.delta() == 0
+    assert stake_hub.floatReserve() == 0
     assert stake_hub.balance() == 0
     assert tracker.delta() == TOTAL_REWARD * 3
 
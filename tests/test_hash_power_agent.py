@@ -82,6 +82,53 @@ def test_distribute_reward_success(hash_power_agent):
     })
 
 
+def test_distribute_reward_with_interleaved_miners(hash_power_agent):
+    # rewards are paid per distinct miner but must add up to the per block split
+    validators = accounts[:2]
+    reward_list = [10001, 30000]
+    block_miners = [
+        [accounts[3], accounts[4], accounts[3], accounts[5], accounts[3], accounts[4], accounts[6]],
+        [accounts[4], accounts[4], accounts[6]]
+    ]
+    expected = {}
+    for v, reward, miners in zip(validators, reward_list, block_miners):
+        BTC_LIGHT_CLIENT.setMiners(1, v, miners)
+        for miner in miners:
+            result = expected.setdefault(miner, {'reward': 0, 'accStakedAmount': 0})
+            result['reward'] += reward // len(miners)
+            result['accStakedAmount'] += 1
+    update_system_contract_address(hash_power_agent, stake_hub=accounts[0])
+    tx = hash_power_agent.distributeReward(validators, reward_list, 8)
+    assert [e['avgReward'] for e in tx.events['validatorAvgReward']] == [
+        reward // len(miners) for reward, miners in zip(reward_list, block_miners)]
+    for miner, result in expected.items():
+        __check_reward_power(miner, result)
+
+
+def test_distribute_reward_with_legacy_and_indexed_power(hash_power_agent):
+    # blocks stored before the distinct miner index and blocks added after it share the round
+    validator = accounts[0]
+    reward = 10001
+    legacy_miners = [accounts[3], accounts[4], accounts[3]]
+    indexed_miners = [accounts[4], accounts[5]]
+    BTC_LIGHT_CLIENT.setLegacyMiners(1, validator, legacy_miners)
+    for miner in indexed_miners:
+        BTC_LIGHT_CLIENT.addCandidatePowerMock(1, validator, miner)
+    block_miners = legacy_miners + indexed_miners
+    assert BTC_LIGHT_CLIENT.getRoundMinerPowers(1, validator) == (accounts[3:6], [2, 2, 1])
+    update_system_contract_address(hash_power_agent, stake_hub=accounts[0])
+    tx = hash_power_agent.distributeReward([validator], [reward], 8)
+    avg_reward = reward // len(block_miners)
+    assert tx.events['validatorAvgReward']['avgReward'] == avg_reward
+    for miner, count in zip(accounts[3:6], [2, 2, 1]):
+        __check_reward_power(miner, {
+            'reward': avg_reward * count,
+            'accStakedAmount': count
+        })
+    total = sum(HASH_POWER_AGENT.rewardMap(miner)['reward'] for miner in accounts[3:6])
+    assert total == avg_reward * len(block_miners)
+
+
 def test_distribute_reward_with_new_validator(hash_power_agent):
     validators = accounts[:3]
     staked_amounts = [6, 12, 15]
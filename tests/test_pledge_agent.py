@@ -1386,6 +1386,72 @@ def test_transfer_and_undelegate_before_upgrade_round(pledge_agent, core_agent,
     assert tracker.delta() == TOTAL_REWARD // 3
 
 
+def test_move_core_data_batch_resumes_from_cursor(pledge_agent, core_agent, set_candidate):
+    operators, consensuses = set_candidate
+    __init_hybrid_score_mock()
+    delegators = [random_address() for _ in range(4)]
+    candidates = [operators[0]] * len(delegators)
+    pledge_agent.setCoinDelegators(operators[0], delegators, DELEGATE_VALUE,
+                                   {'value': DELEGATE_VALUE * len(delegators)})
+    tx = pledge_agent.moveCOREDataBatch(candidates, delegators, 1)
+    expect_event(tx, 'movedCOREDataBatch', {'next': 1, 'size': len(delegators)})
+    # moved pairs before the cursor are skipped when the whole list is resubmitted
+    tx = pledge_agent.moveCOREDataBatch(candidates, delegators, ONE_ETHER)
+    expect_event(tx, 'movedCOREDataBatch', {'next': len(delegators), 'size': len(delegators)})
+    for delegator in delegators:
+        __check_delegate_info(operators[0], delegator, {
+            'stakedAmount': DELEGATE_VALUE,
+            'realtimeAmount': DELEGATE_VALUE,
+            'transferredAmount': 0,
+            'changeRound': get_current_round()
+        })
+        __check_old_delegate_info(operators[0], delegator, {
+            'changeRound': 0
+        })
+    assert pledge_agent.agentsMap(operators[0])['totalDeposit'] == 0
+    with brownie.reverts("the length of candidates and delegators should be equal"):
+        pledge_agent.moveCOREDataBatch(candidates, delegators[:-1], ONE_ETHER)
+
+
+def test_move_core_data_batch_gas_benchmark(pledge_agent, core_agent, set_candidate):
+    # migrates a large legacy delegator base by following the cursor, and reports gas per pair
+    delegator_count = 2000
+    seed_chunk = 200
+    gas_budget = 10000000
+    operators, consensuses = set_candidate
+    __init_hybrid_score_mock()
+    candidates = [operators[i % len(operators)] for i in range(delegator_count)]
+    delegators = [random_address() for _ in range(delegator_count)]
+    for operator in operators:
+        operator_delegators = [d for c, d in zip(candidates, delegators) if c == operator]
+        for i in range(0, len(operator_delegators), seed_chunk):
+            chunk = operator_delegators[i:i + seed_chunk]
+            pledge_agent.setCoinDelegators(operator, chunk, DELEGATE_VALUE, {'value': DELEGATE_VALUE * len(chunk)})
+
+    single_gas = pledge_agent.moveCOREData(candidates[0], delegators[0]).gas_used
+    cursor = 1
+    pair_gas = []
+    total_gas = 0
+    while cursor < delegator_count:
+        tx = pledge_agent.moveCOREDataBatch(candidates[cursor:], delegators[cursor:], gas_budget)
+        moved = tx.events['movedCOREDataBatch']['next']
+        assert moved > 0 and tx.gas_used < gas_budget * 2
+        pair_gas.append(tx.gas_used // moved)
+        total_gas += tx.gas_used
+        cursor += moved
+
+    mean_gas = total_gas // (delegator_count - 1)
+    print(f"moveCOREData single pair gas {single_gas}, batch gas per pair "
+          f"min {min(pair_gas)} max {max(pair_gas)} mean {mean_gas} over {len(pair_gas)} txs")
+    assert mean_gas < single_gas
+    for operator in operators:
+        assert pledge_agent.agentsMap(operator)['totalDeposit'] == 0
+    for i in range(0, delegator_count, delegator_count // 10):
+        __check_delegate_info(candidates[i], delegators[i], {
+            'realtimeAmount': DELEGATE_VALUE
+        })
+
+
 def test_cancel_move_data_after_transfer(pledge_agent, core_agent, set_candidate):
     operators, consensuses = set_candidate
     old_delegate_coin_success(operators[0], accounts[0], MIN_INIT_DELEGATE_VALUE * 2)
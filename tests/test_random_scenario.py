@@ -1,17 +1,53 @@
 import pytest
+from brownie import chain
 from .scenario.scenario_generator import ScenarioGenerator
-from .scenario.scenario import Scenario
+from .scenario.scenario import Scenario, JSONL_EXT
+from .scenario.scenario_shrinker import ScenarioShrinker
+from .scenario.campaign import ShapeDistribution, CampaignResults, run_seed, init_seed_state, generate_shape
 from .scenario.account_mgr import AccountMgr
+from .scenario import key_pool
+import glob
 import os
 
 
-def make_failed_scenario_file_path(start_round, stop_round, candidate_count, delegator_count):
+def make_failed_scenario_file_path(start_round, stop_round, candidate_count, delegator_count, ext=".json"):
     base_dir = os.path.dirname(os.path.abspath(__file__))
-    file_name = f"{start_round}_{stop_round}_{candidate_count}_{delegator_count}_error.json"
+    file_name = f"{start_round}_{stop_round}_{candidate_count}_{delegator_count}_error{ext}"
     file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
     return file_path
 
 
+# a campaign runs one random scenario per seed, e.g.
+#   CAMPAIGN_SEED_FROM=0 CAMPAIGN_SEED_COUNT=20000 brownie test tests/test_random_scenario.py -k campaign -n 16
+# every xdist worker runs its own development chain; outcomes go to CAMPAIGN_DB_FILE
+# and only failed scenarios are kept, named after their seed
+CAMPAIGN_SEED_FROM = int(os.environ.get("CAMPAIGN_SEED_FROM", 0))
+CAMPAIGN_SEED_COUNT = int(os.environ.get("CAMPAIGN_SEED_COUNT", 0))
+CAMPAIGN_DB_FILE = os.environ.get("CAMPAIGN_DB_FILE", "random_scenario_campaign.db")
+CAMPAIGN_KEY_CACHE_DIR = os.environ.get("CAMPAIGN_KEY_CACHE_DIR")
+
+# shrinking replays a failed scenario hundreds of times, so left over failures are only shrunk on request, e.g.
+#   SHRINK_SCENARIOS=1 brownie test tests/test_random_scenario.py -k shrink
+SHRINK_SCENARIOS = os.environ.get("SHRINK_SCENARIOS") == "1"
+
+
+def make_campaign_distribution():
+    distribution = ShapeDistribution()
+    distribution.set_round_count_range(10, 50)
+    distribution.set_candidate_count_range(3, 26)
+    distribution.set_delegator_count_range(5, 60)
+    distribution.set_task_probability_range("StakeCore", 10, 80)
+    distribution.set_task_probability_range("SlashValidator", 0, 20)
+    distribution.set_task_probability_range("RefuseDelegate", 0, 20)
+    return distribution
+
+
+def list_failed_scenario_files():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    pattern = os.path.join(base_dir, 'scenario', 'config', '*_error.json*')
+    return sorted(glob.glob(pattern))
+
+
 @pytest.mark.skip(reason="This test is temporarily skipped")
 @pytest.mark.parametrize("start_round,stop_round,candidate_count,delegator_count", [
     [7, 17, 6, 5],
@@ -36,3 +72,97 @@ def test_random_scenario(
         assert False
 
     print(f"Executed {scenario.get_task_count()} scenario tasks")
+
+
+@pytest.mark.skip(reason="This test is temporarily skipped")
+@pytest.mark.parametrize("pipeline_depth", [0, 4])
+@pytest.mark.parametrize("start_round,stop_round,candidate_count,delegator_count", [
+    [7, 17, 6, 5],
+    [10, 1010, 26, 50]
+])
+def test_random_scenario_lazy(
+        start_round,
+        stop_round,
+        candidate_count,
+        delegator_count,
+        pipeline_depth):
+    AccountMgr.init_account_mgr()
+    generator = ScenarioGenerator()
+    # with pipeline_depth > 0 the next rounds are generated on a worker thread while the current one executes
+    scenario = generator.generate(
+        start_round, stop_round, candidate_count, delegator_count,
+        lazy=True, pipeline_depth=pipeline_depth
+    )
+
+    # rounds are journaled as they execute, the journal is the replayable failed scenario
+    file_path = make_failed_scenario_file_path(start_round, stop_round, candidate_count, delegator_count, JSONL_EXT)
+    try:
+        scenario.execute(journal_file=file_path)
+    except Exception as e:
+        print(f"An random scenario {file_path} executed: {e}")
+        assert False
+
+    os.remove(file_path)
+    print(f"Executed {scenario.get_task_count()} scenario tasks")
+
+
+@pytest.mark.skipif(not SHRINK_SCENARIOS, reason="Shrinking failed random scenarios is not enabled")
+@pytest.mark.skipif(len(list_failed_scenario_files()) == 0, reason="No failed random scenario to shrink")
+@pytest.mark.parametrize("file_path", list_failed_scenario_files() if SHRINK_SCENARIOS else [])
+def test_shrink_failed_scenario(file_path):
+    # writes {start}_{stop}_{cand}_{deleg}_min.json next to the failed scenario
+    shrinker = ScenarioShrinker()
+    write_file = file_path.replace("_error", "_min").replace(JSONL_EXT, ".json")
+    shrunk = shrinker.shrink(file_path, write_file)
+
+    assert shrinker.get_failure() is not None
+    print(f"Shrunk {file_path} to {shrunk.get_task_count()} scenario tasks")
+
+
+@pytest.mark.skipif(CAMPAIGN_SEED_COUNT == 0, reason="No random scenario campaign configured")
+@pytest.mark.parametrize("seed", range(CAMPAIGN_SEED_FROM, CAMPAIGN_SEED_FROM + CAMPAIGN_SEED_COUNT))
+def test_random_scenario_campaign(seed):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    failed_dir = os.path.join(base_dir, 'scenario', 'config')
+    results = CampaignResults(CAMPAIGN_DB_FILE)
+
+    ok, shape = run_seed(seed, make_campaign_distribution(), results, failed_dir, pipeline_depth=4,
+                         key_cache_dir=CAMPAIGN_KEY_CACHE_DIR)
+    assert ok, f"Random scenario {shape} failed"
+
+
+def run_seed_journal(seed, distribution, journal_file, pipeline_depth):
+    shape = distribution.draw(seed)
+    init_seed_state(seed)
+    error = None
+    try:
+        scenario = generate_shape(shape, pipeline_depth)
+        try:
+            scenario.execute(journal_file=journal_file)
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+    finally:
+        key_pool.close_key_pool()
+
+    with open(journal_file, 'r') as file:
+        return file.read(), error
+
+
+def test_random_scenario_seed_replays(tmp_path):
+    # the same seed gives the same journal with and without the generation pipeline
+    distribution = ShapeDistribution()
+    distribution.set_round_count_range(3, 3)
+    distribution.set_candidate_count_range(3, 3)
+    distribution.set_delegator_count_range(5, 5)
+    seed = 7
+
+    chain.snapshot()
+    runs = []
+    for i, pipeline_depth in enumerate([4, 4, 0]):
+        chain.revert()
+        journal_file = str(tmp_path / f"seed_{seed}_{i}{JSONL_EXT}")
+        runs.append(run_seed_journal(seed, distribution, journal_file, pipeline_depth))
+
+    assert runs[0][0].count("\n") > 1
+    assert runs[1] == runs[0]
+    assert runs[2] == runs[0]
@@ -2,8 +2,12 @@ import pytest
 from brownie import *
 import os
 
-from .scenario.scenario import Scenario
+from .scenario.scenario import Scenario, JSONL_EXT
+from .scenario.task_profiler import TaskProfiler
+from .scenario.key_pool import KeyPool, init_key_pool, close_key_pool
 from .scenario.account_mgr import AccountMgr
+from .scenario.payment import P2TR_SCRIPT
+from .scenario.taproot import TapTree, verify_script_path, template_pool
 
 init_account_mgr = AccountMgr.init_account_mgr
 
@@ -22,3 +26,96 @@ def test_scenario(file_name):
 
     scenario.load(file_path)
     scenario.execute()
+
+
+@pytest.mark.parametrize("file_name", [
+    'example_scenario.json',
+    'btcfi_scenario.json'
+])
+def test_scenario_jsonl(file_name, tmp_path):
+    init_account_mgr()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
+
+    scenario = Scenario()
+    scenario.load(file_path)
+    jsonl_path = str(tmp_path / file_name.replace('.json', JSONL_EXT))
+    scenario.dump_jsonl(jsonl_path)
+
+    lazy_scenario = Scenario()
+    lazy_scenario.load(jsonl_path)
+    assert lazy_scenario.init_round == scenario.init_round
+    assert [[int(k), v] for k, v in scenario.iter_round_tasks()] == [list(r) for r in lazy_scenario.iter_round_tasks()]
+
+    lazy_scenario.execute()
+    assert lazy_scenario.get_task_count() == scenario.get_task_count()
+
+
+def test_scenario_profile(tmp_path):
+    init_account_mgr()
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', 'example_scenario.json')
+    scenario.load(file_path)
+
+    report_prefix = str(tmp_path / 'example_scenario_profile')
+    profiler = TaskProfiler(report_prefix, flame=True)
+    scenario.set_profiler(profiler)
+    scenario.execute()
+
+    task_stats = profiler.get_task_stats()
+    assert sum(stats.count for stats in task_stats.values()) >= scenario.get_task_count()
+    assert task_stats['TurnRound'].tx_count > 0
+    assert task_stats['TurnRound'].gas_used > 0
+    for ext in ['json', 'csv', 'folded']:
+        assert os.path.isfile(f"{report_prefix}.{ext}")
+
+
+def test_key_pool(tmp_path):
+    pool = KeyPool(7, cache_dir=str(tmp_path), batch_size=8)
+    key_pairs = [pool.next_key_pair() for _ in range(20)]
+    pool.close()
+    assert len(set(key_pairs)) == 20
+
+    # the cached pairs are handed out again without being derived
+    cached_pool = KeyPool(7, cache_dir=str(tmp_path), batch_size=8)
+    assert len(cached_pool) >= 20
+    assert [cached_pool.next_key_pair() for _ in range(20)] == key_pairs
+    cached_pool.close()
+
+    other_pool = KeyPool(8, batch_size=8)
+    assert other_pool.next_key_pair() != key_pairs[0]
+    other_pool.close()
+
+
+def test_scenario_key_pool():
+    init_account_mgr()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', 'btcfi_scenario.json')
+
+    pool = init_key_pool(7)
+    try:
+        scenario = Scenario()
+        scenario.load(file_path)
+        scenario.execute()
+        assert pool.get_used_count() > 0
+    finally:
+        close_key_pool()
+
+
+@pytest.mark.parametrize("leaf_count", [1, 2, 3, 5, 8])
+def test_p2tr_script_path(leaf_count):
+    payments = P2TR_SCRIPT.build_many(4, template_pool.draw(leaf_count))
+    assert len({p.get_hash() for p in payments}) == 4
+    for p in payments:
+        assert len(p.get_script_pubkey()) == 34
+        for index, script in enumerate(p.scripts):
+            witness = p.get_script_path_witness(index)
+            assert witness[-2] == script
+            assert verify_script_path(p.get_hash(), script, witness[-1])
+        assert not verify_script_path(p.get_hash(), b'\x51', p.get_control_block(0))
+
+    # an unpaired leaf is carried up without being hashed with itself
+    tree = TapTree(template_pool.draw(3))
+    assert tree.levels[1][1] == tree.levels[0][2]
+    assert tree.get_proof(2) == [tree.levels[1][0]]
@@ -623,6 +623,22 @@ def test_onStakeChange_success(stake_hub, set_candidate, btc_lst_stake):
     assert tracker0.delta() == TOTAL_REWARD + TOTAL_REWARD // 2
 
 
+def test_stake_change_defers_hash_power_settlement(stake_hub, core_agent, hash_power_agent):
+    accounts[3].transfer(stake_hub, Web3.to_wei(1, 'ether'))
+    reward = 10000
+    core_agent.setCoreRewardMap(accounts[0], reward, 0)
+    hash_power_agent.setPowerRewardMap(accounts[0], reward, 10)
+    tx = stake_hub.onStakeChange(accounts[0])
+    assert 'storedHashReward' not in tx.events
+    assert stake_hub.getDelegatorMap(accounts[0])[1] == [reward, 0, 0]
+    assert hash_power_agent.rewardMap(accounts[0]) == [reward, 10]
+    tracker = get_tracker(accounts[0])
+    tx = stake_hub_claim_reward(accounts[0])
+    assert 'claimedHashReward' in tx.events
+    assert tracker.delta() == reward * 2
+    assert hash_power_agent.rewardMap(accounts[0]) == [0, 0]
+
+
 @pytest.mark.parametrize("onStakeChange", [True, False])
 def test_calculateReward_invalid_after_operation(stake_hub, set_candidate, onStakeChange):
     stake_manager.set_lp_rates([[0, 1000], [2500, 2500], [5000, 5000], [5001, 20000]])
@@ -758,10 +774,12 @@ def test_return_all_surplus_and_claim_reward(stake_hub, set_candidate, system_re
     assert stake_hub.surplus() == 0
     stake_manager.set_is_stake_hub_active(1)
     stake_manager.set_lp_rates([[0, 20000]])
-    turn_round(consensuses)
-    tx = stake_hub_claim_reward(accounts[2])
+    tx = turn_round(consensuses)
     assert tx.events['rewardTo']['amount'] == BLOCK_REWARD // 2
     assert tx.events['rewardTo']['to'] == stake_hub.address
+    tx = stake_hub_claim_reward(accounts[2])
+    assert 'rewardTo' not in tx.events
+    assert stake_hub.floatReserve() == 0
     assert tracker2.delta() == BLOCK_REWARD // 2 * 3
 
 
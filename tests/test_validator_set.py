@@ -2,6 +2,7 @@ import pytest
 import brownie
 from web3 import Web3, constants
 from brownie import *
+from . import utils
 from .utils import expect_event, get_tracker, AccountTracker, update_system_contract_address
 from eth_abi import encode
 
@@ -258,6 +259,17 @@ def test_update_success():
     assert validator_set_instance.getValidators() == [accounts[1]]
 
 
+def test_update_failed_with_duplicate_consensus_address_in_large_set():
+    __fake_validator_set()
+    consensus_addresses = [utils.random_address() for _ in range(100)]
+    consensus_addresses.append(consensus_addresses[0])
+    size = len(consensus_addresses)
+    with brownie.reverts("duplicate consensus address"):
+        validator_set_instance.updateValidatorSet([accounts[0]] * size, consensus_addresses, [accounts[2]] * size,
+                                                  [100] * size)
+    assert validator_set_instance.getValidators() == init_validators
+
+
 @pytest.mark.parametrize("fake,key,value,err", [
     (False, "blockReward", "0x0000000000000000000000000000000000000000000000000000000000000001",
      "the msg sender must be governance contract"),
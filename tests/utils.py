@@ -12,6 +12,7 @@ from eth_abi import encode
 from brownie import *
 from Crypto.Hash import keccak
 from tests.constant import *
+from tests.btc_tx import strip_witness
 
 
 def random_address():
@@ -143,13 +144,9 @@ def reverse_by_bytes(value: str) -> str:
     return "".join(reversed([value[i: i + 2] for i in range(0, len(value), 2)]))
 
 
-def remove_witness_data_from_raw_tx(btc_tx_hex, script_pubkey) -> str:
-    raw_tx: str = btc_tx_hex
-    if raw_tx[8:12] == '0001':
-        raw_tx = raw_tx[:8] + raw_tx[12:]
-        witness_data = raw_tx[raw_tx.index(script_pubkey) + len(script_pubkey): -8]
-        raw_tx = raw_tx.replace(witness_data, '')
-    return raw_tx
+def remove_witness_data_from_raw_tx(btc_tx_hex, script_pubkey=None) -> str:
+    # script_pubkey is no longer needed, the witness is located by parsing the tx
+    return strip_witness(btc_tx_hex).hex()
 
 
 def get_block_info(height='latest'):